@@ -1,6 +1,7 @@
 import os
 import json
 from dataclasses import asdict, is_dataclass
+from collections import OrderedDict
 from datetime import datetime
 from enum import Enum
 from typing import Any, Optional
@@ -12,7 +13,15 @@ from fastapi import FastAPI, File, Form, HTTPException, Query, UploadFile
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr
+from clause_diff import PreviousAnalysis, clause_from_dict
+from drf_cache import get_drf_cache
+from http_client import get_http_client
+from llm_rate_limiter import get_rate_limiter
+from openai_client import close_clients, latency_stats
 from pipeline import ContractAnalysisPipeline
+from reference_store import get_reference_store
+from single_flight import get_single_flight
+from upload_store import UploadStore, UploadTooLargeError
 class UTF8JSONResponse(JSONResponse):
     media_type = "application/json; charset=utf-8"
 
@@ -22,7 +31,22 @@ pipeline = ContractAnalysisPipeline()
 ANALYSIS_STORE: dict[str, dict[str, Any]] = {}
 ANALYSIS_LOCK = Lock()
 ANALYSIS_TTL_SECONDS = int(os.getenv("ANALYSIS_TTL_SECONDS", "3600"))
+# analysis_history 행은 저장 후 바뀌지 않으므로 조항 인덱스를 LRU로 재사용한다.
+DB_CLAUSE_INDEX: "OrderedDict[str, dict[str, Any]]" = OrderedDict()
+DB_CLAUSE_INDEX_MAX = int(os.getenv("DB_CLAUSE_INDEX_MAX", "256"))
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/app/uploads/user_files")
+# 1이면 analyze_async로 이벤트 루프를 막지 않고 여러 분석을 동시에 처리한다.
+PIPELINE_ASYNC = os.getenv("PIPELINE_ASYNC", "").lower() in ("1", "true", "yes", "y")
+upload_store = UploadStore(UPLOAD_DIR)
+
+@app.on_event("startup")
+def _start_upload_cleaner():
+    upload_store.start_cleaner()
+
+@app.on_event("shutdown")
+def _stop_upload_cleaner():
+    upload_store.stop_cleaner()
+    close_clients()
 
 def _get_db_conn():
     return mysql.connector.connect(
@@ -150,6 +174,7 @@ def _store_result(result: Any) -> str:
         _prune_store()
         ANALYSIS_STORE[analysis_id] = {
             "result": result,
+            "clause_index": _build_clause_index(result.risky_clauses, result.clauses),
             "created_at": datetime.utcnow(),
             "debate_by_clause": {},
             "debate_summary": {},
@@ -164,15 +189,80 @@ def _get_entry(analysis_id: str) -> dict[str, Any]:
         raise HTTPException(status_code=404, detail="Analysis not found")
     return entry
 
-def _find_clause(result: Any, clause_id: str):
-    target = _normalize_clause_key(clause_id)
-    for clause in result.risky_clauses or []:
-        if _clause_matches(clause, clause_id, target):
-            return clause
-    for clause in result.clauses or []:
-        if _clause_matches(clause, clause_id, target):
-            return clause
-    return None
+def _load_previous_analysis(previous_analysis_id: str):
+    """
+    증분 재분석 기준 결과를 찾는다.
+    메모리 저장소(analysis_id)를 먼저 보고, 없으면 analysis_history(id)의 clauses_json을 사용한다.
+    """
+    with ANALYSIS_LOCK:
+        _prune_store()
+        entry = ANALYSIS_STORE.get(previous_analysis_id)
+    if entry:
+        result = entry["result"]
+        previous = PreviousAnalysis(
+            analysis_id=previous_analysis_id,
+            clauses=list(result.clauses or []),
+            llm_summary=result.llm_summary,
+            debate_transcript=result.debate_transcript,
+        )
+        return previous, entry
+    if not previous_analysis_id.isdigit():
+        raise HTTPException(status_code=404, detail="Previous analysis not found")
+
+    conn = None
+    cur = None
+    try:
+        conn = _get_db_conn()
+        cur = conn.cursor(dictionary=True)
+        cur.execute(
+            """
+            SELECT clauses_json, summary
+            FROM analysis_history
+            WHERE id=%s
+            """,
+            (int(previous_analysis_id),),
+        )
+        row = cur.fetchone()
+    finally:
+        try:
+            if cur is not None:
+                cur.close()
+            if conn is not None:
+                conn.close()
+        except Exception:
+            pass
+    if not row:
+        raise HTTPException(status_code=404, detail="Previous analysis not found")
+    try:
+        clauses = json.loads(row.get("clauses_json") or "[]")
+    except (TypeError, json.JSONDecodeError):
+        clauses = []
+    previous = PreviousAnalysis(
+        analysis_id=previous_analysis_id,
+        clauses=[clause_from_dict(item) for item in clauses if isinstance(item, dict)],
+        llm_summary=row.get("summary"),
+    )
+    return previous, None
+
+def _carry_debate_cache(previous_entry: dict[str, Any], analysis_id: str, incremental: dict) -> None:
+    """유지된 조항의 조항별 토론/요약 캐시를 새 분석으로 옮긴다."""
+    with ANALYSIS_LOCK:
+        entry = ANALYSIS_STORE.get(analysis_id)
+    if not entry:
+        return
+    for new_id, old_id in (incremental.get("unchanged_clause_ids") or {}).items():
+        for cache_name in ("debate_by_clause", "debate_summary"):
+            cached = previous_entry[cache_name].get(old_id)
+            if cached is not None:
+                entry[cache_name][new_id] = cached
+
+def _find_clause(entry: dict[str, Any], clause_id: str):
+    index = entry.get("clause_index")
+    if index is None:
+        result = entry["result"]
+        index = _build_clause_index(result.risky_clauses, result.clauses)
+        entry["clause_index"] = index
+    return _lookup_clause(index, clause_id)
 
 
 def _normalize_clause_key(value: Optional[str]) -> str:
@@ -184,26 +274,81 @@ def _normalize_clause_key(value: Optional[str]) -> str:
     return normalized.lower()
 
 
-def _clause_matches(clause: Any, raw_id: str, normalized_target: str) -> bool:
-    clause_id = getattr(clause, "id", None)
-    article_num = getattr(clause, "article_num", None)
-    title = getattr(clause, "title", None)
+def _clause_keys_from_obj(clause: Any) -> list[str]:
+    values = (
+        getattr(clause, "id", None),
+        getattr(clause, "article_num", None),
+        getattr(clause, "title", None),
+    )
+    return [str(value) for value in values if value]
+
+
+def _clause_keys_from_dict(clause: Any) -> list[str]:
+    if not isinstance(clause, dict):
+        return []
+    values = (
+        str(clause.get("id", "")).strip(),
+        str(clause.get("article_num", "")).strip(),
+        str(clause.get("title", "")).strip(),
+    )
+    return [value for value in values if value]
+
+
+def _build_clause_index(*groups: Optional[list], keys=_clause_keys_from_obj) -> dict[str, Any]:
+    """
+    id/article_num/title의 원본 키와 정규화 키를 조항에 매핑한다.
+    groups 순서(위험 조항 → 전체 조항)대로 먼저 나온 조항이 우선한다.
+    """
+    raw: dict[str, tuple[int, Any]] = {}
+    normalized: dict[str, tuple[int, Any]] = {}
+    position = 0
+    for group in groups:
+        for clause in group or []:
+            for value in keys(clause):
+                raw.setdefault(value, (position, clause))
+                key = _normalize_clause_key(value)
+                if key:
+                    normalized.setdefault(key, (position, clause))
+            position += 1
+    return {"raw": raw, "normalized": normalized}
+
 
-    if clause_id and str(clause_id) == raw_id:
-        return True
-    if article_num and str(article_num) == raw_id:
-        return True
-    if title and str(title) == raw_id:
-        return True
+def _lookup_clause(index: dict[str, Any], clause_id: str):
+    hits = [index["raw"].get(clause_id)]
+    target = _normalize_clause_key(clause_id)
+    if target:
+        hits.append(index["normalized"].get(target))
+    hits = [hit for hit in hits if hit is not None]
+    if not hits:
+        return None
+    return min(hits, key=lambda hit: hit[0])[1]
 
-    if normalized_target:
-        if clause_id and _normalize_clause_key(str(clause_id)) == normalized_target:
-            return True
-        if article_num and _normalize_clause_key(str(article_num)) == normalized_target:
-            return True
-        if title and _normalize_clause_key(str(title)) == normalized_target:
-            return True
-    return False
+
+def _cached_db_clause_index(analysis_id: str) -> Optional[dict[str, Any]]:
+    with ANALYSIS_LOCK:
+        index = DB_CLAUSE_INDEX.get(analysis_id)
+        if index is not None:
+            DB_CLAUSE_INDEX.move_to_end(analysis_id)
+        return index
+
+
+def _db_clause_index(analysis_id: str, clauses_raw: Any, risky_raw: Any) -> dict[str, Any]:
+    clauses = []
+    try:
+        clauses = json.loads(clauses_raw) if clauses_raw else []
+    except (TypeError, json.JSONDecodeError):
+        clauses = []
+    risky_clauses = []
+    try:
+        risky_clauses = json.loads(risky_raw) if risky_raw else []
+    except (TypeError, json.JSONDecodeError):
+        risky_clauses = []
+    index = _build_clause_index(risky_clauses, clauses, keys=_clause_keys_from_dict)
+    with ANALYSIS_LOCK:
+        DB_CLAUSE_INDEX[analysis_id] = index
+        while len(DB_CLAUSE_INDEX) > DB_CLAUSE_INDEX_MAX:
+            DB_CLAUSE_INDEX.popitem(last=False)
+    return index
 
 
 def _clause_detail_from_obj(clause: Any) -> dict[str, Any]:
@@ -290,6 +435,20 @@ def read_root():
 @app.get("/health")
 def health():
     return {"status": "ok"}
+@app.get("/metrics/llm")
+def llm_metrics():
+    return {"latency": latency_stats(), "rate_limiter": get_rate_limiter().stats()}
+@app.get("/metrics/references")
+def reference_metrics():
+    drf_cache = get_drf_cache()
+    store = get_reference_store()
+    flights = get_single_flight()
+    return {
+        "reference_store": store.stats() if store is not None else None,
+        "drf_cache": drf_cache.stats() if drf_cache is not None else None,
+        "single_flight": flights.stats() if flights is not None else None,
+        "http": get_http_client().stats(),
+    }
 
 def _format_transcript_text(transcript: list[dict]) -> str:
     if not transcript:
@@ -306,25 +465,36 @@ async def analyze_file(
     user_id: Optional[int] = Form(None),
     email: Optional[EmailStr] = Form(None),
     original_name: Optional[str] = Form(None),
+    previous_analysis_id: Optional[str] = Form(None),
 ) -> UTF8JSONResponse:
     if not file.filename:
         raise HTTPException(status_code=400, detail="File name is required.")
+    previous = None
+    previous_entry = None
+    if previous_analysis_id and previous_analysis_id.strip():
+        previous, previous_entry = _load_previous_analysis(previous_analysis_id.strip())
     suffix = os.path.splitext(file.filename)[1] or ".dat"
     display_name = _normalize_filename(original_name) or _normalize_filename(file.filename) or file.filename
-    saved_path = None
+    stored = None
+    keep_reference = False
     conn = None
     cur = None
     try:
-        contents = await file.read()
-        size_bytes = len(contents)
+        try:
+            stored = await upload_store.save_upload(file, suffix.lower())
+        except UploadTooLargeError as exc:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File is too large (max {exc.max_bytes} bytes).",
+            )
+        saved_path = stored.path
+        size_bytes = stored.size_bytes
         content_type = file.content_type or "application/octet-stream"
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        saved_filename = f"{uuid4().hex}{suffix}"
-        saved_path = os.path.join(UPLOAD_DIR, saved_filename)
-        with open(saved_path, "wb") as out:
-            out.write(contents)
 
-        result = pipeline.analyze(saved_path)
+        if PIPELINE_ASYNC:
+            result = await pipeline.analyze_async(saved_path, previous=previous)
+        else:
+            result = pipeline.analyze(saved_path, previous=previous)
         raw_text = (result.raw_text or "").strip()
         if raw_text == "api필요":
             raise HTTPException(
@@ -342,6 +512,8 @@ async def analyze_file(
                 detail="Clause splitting fallback requires OPENAI_API_KEY.",
             )
         analysis_id = _store_result(result)
+        if previous_entry is not None and result.incremental:
+            _carry_debate_cache(previous_entry, analysis_id, result.incremental)
 
         risky_count = len(result.risky_clauses or [])
         risk_level = _max_risk_level(result.risky_clauses or [])
@@ -401,6 +573,7 @@ async def analyze_file(
                 ),
             )
             conn.commit()
+            keep_reference = True
 
         return UTF8JSONResponse(
             content={
@@ -410,12 +583,15 @@ async def analyze_file(
                 "email": str(email) if email else None,
                 "original_name": display_name,
                 "raw_text": result.raw_text,
+                "ocr_path": result.ocr_path,
                 "risky_count": risky_count,
                 "risk_level": risk_level,
                 "summary": summary,
                 "llm_summary": summary,
                 "clauses": _serialize(result.clauses),
                 "risky_clauses": _serialize(result.risky_clauses),
+                "incremental": result.incremental,
+                "metrics": _serialize(result.metrics),
             }
         )
     finally:
@@ -426,8 +602,9 @@ async def analyze_file(
                 conn.close()
         except Exception:
             pass
-        if saved_path and not os.path.exists(saved_path):
-            saved_path = None
+        # user_files에 기록되지 않은 업로드는 참조를 반납하고 정리 작업에 맡긴다.
+        if stored is not None and not keep_reference:
+            upload_store.release(stored.sha256)
 
 @app.get("/history")
 def get_history(user_id: int = Query(...)) -> UTF8JSONResponse:
@@ -555,8 +732,7 @@ def get_files(user_id: int = Query(...)) -> UTF8JSONResponse:
 @app.get("/analysis/{analysis_id}/clauses/{clause_id}/debate/summary")
 def get_clause_debate_summary(analysis_id: str, clause_id: str) -> UTF8JSONResponse:
     entry = _get_entry(analysis_id)
-    result = entry["result"]
-    clause = _find_clause(result, clause_id)
+    clause = _find_clause(entry, clause_id)
     if not clause:
         raise HTTPException(status_code=404, detail="Clause not found")
     summary_cache = entry["debate_summary"]
@@ -572,6 +748,7 @@ def get_clause_debate_summary(analysis_id: str, clause_id: str) -> UTF8JSONRespo
     transcript_cache = entry["debate_by_clause"]
     transcript = transcript_cache.get(clause_id)
     if transcript is None:
+        result = entry["result"]
         transcript = pipeline.debate_agents.run(
             [clause],
             raw_text=result.raw_text,
@@ -594,8 +771,7 @@ def get_clause_debate_summary(analysis_id: str, clause_id: str) -> UTF8JSONRespo
 def get_clause_detail(analysis_id: str, clause_id: str) -> UTF8JSONResponse:
     try:
         entry = _get_entry(analysis_id)
-        result = entry["result"]
-        clause = _find_clause(result, clause_id)
+        clause = _find_clause(entry, clause_id)
         if not clause:
             raise HTTPException(status_code=404, detail="Clause not found")
         return UTF8JSONResponse(content=_clause_detail_from_obj(clause))
@@ -605,6 +781,13 @@ def get_clause_detail(analysis_id: str, clause_id: str) -> UTF8JSONResponse:
     except Exception:
         raise
 
+    index = _cached_db_clause_index(analysis_id)
+    if index is not None:
+        clause = _lookup_clause(index, clause_id)
+        if clause is None:
+            raise HTTPException(status_code=404, detail="Clause not found")
+        return UTF8JSONResponse(content=_clause_detail_from_dict(clause))
+
     conn = None
     cur = None
     try:
@@ -621,48 +804,12 @@ def get_clause_detail(analysis_id: str, clause_id: str) -> UTF8JSONResponse:
         row = cur.fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Analysis not found")
-        clauses_raw = row.get("clauses_json")
-        risky_raw = row.get("risky_clauses_json")
-        clauses = []
-        try:
-            clauses = json.loads(clauses_raw) if clauses_raw else []
-        except (TypeError, json.JSONDecodeError):
-            clauses = []
-        risky_clauses = []
-        try:
-            risky_clauses = json.loads(risky_raw) if risky_raw else []
-        except (TypeError, json.JSONDecodeError):
-            risky_clauses = []
-
-        normalized_target = _normalize_clause_key(clause_id)
-
-        def matches(target: dict[str, Any]) -> bool:
-            raw_id = str(target.get("id", "")).strip()
-            article_num = str(target.get("article_num", "")).strip()
-            title = str(target.get("title", "")).strip()
-
-            if raw_id and raw_id == clause_id:
-                return True
-            if article_num and article_num == clause_id:
-                return True
-            if title and title == clause_id:
-                return True
-
-            if normalized_target:
-                if raw_id and _normalize_clause_key(raw_id) == normalized_target:
-                    return True
-                if article_num and _normalize_clause_key(article_num) == normalized_target:
-                    return True
-                if title and _normalize_clause_key(title) == normalized_target:
-                    return True
-            return False
-
-        for clause in risky_clauses:
-            if isinstance(clause, dict) and matches(clause):
-                return UTF8JSONResponse(content=_clause_detail_from_dict(clause))
-        for clause in clauses:
-            if isinstance(clause, dict) and matches(clause):
-                return UTF8JSONResponse(content=_clause_detail_from_dict(clause))
+        index = _db_clause_index(
+            analysis_id, row.get("clauses_json"), row.get("risky_clauses_json")
+        )
+        clause = _lookup_clause(index, clause_id)
+        if clause is not None:
+            return UTF8JSONResponse(content=_clause_detail_from_dict(clause))
 
         raise HTTPException(status_code=404, detail="Clause not found")
     except HTTPException:
@@ -682,13 +829,13 @@ def get_clause_detail(analysis_id: str, clause_id: str) -> UTF8JSONResponse:
 @app.get("/analysis/{analysis_id}/clauses/{clause_id}/debate/transcript")
 def get_clause_debate_transcript(analysis_id: str, clause_id: str) -> UTF8JSONResponse:
     entry = _get_entry(analysis_id)
-    result = entry["result"]
-    clause = _find_clause(result, clause_id)
+    clause = _find_clause(entry, clause_id)
     if not clause:
         raise HTTPException(status_code=404, detail="Clause not found")
     transcript_cache = entry["debate_by_clause"]
     transcript = transcript_cache.get(clause_id)
     if transcript is None:
+        result = entry["result"]
         transcript = pipeline.debate_agents.run(
             [clause],
             raw_text=result.raw_text,
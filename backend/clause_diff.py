@@ -0,0 +1,122 @@
+"""
+증분 재분석: 이전 분석의 조항과 새 조항을 정규화된 내용 해시로 비교
+"""
+
+import hashlib
+import re
+import unicodedata
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import Clause, Law, Precedent, RiskType
+
+RISKY_LEVELS = (RiskType.MEDIUM, RiskType.HIGH, RiskType.CRITICAL)
+
+
+@dataclass
+class PreviousAnalysis:
+    """증분 재분석에 쓰는 이전 분석 결과 (메모리 저장소 또는 analysis_history)"""
+    analysis_id: str
+    clauses: List[Clause]
+    llm_summary: Optional[str] = None
+    debate_transcript: Optional[List[dict]] = None
+
+
+@dataclass
+class ClauseDiff:
+    """새 조항 기준 비교 결과"""
+    # (새 조항, 이전 조항) 쌍. 조항 ID가 중복될 수 있으므로 ID가 아니라 조항 객체로 짝짓는다.
+    unchanged: List[Tuple[Clause, Clause]] = field(default_factory=list)
+    changed: List[Clause] = field(default_factory=list)          # 추가/수정된 새 조항
+    removed: List[Clause] = field(default_factory=list)          # 새 계약서에 없는 이전 조항
+
+    def stats(self, previous_analysis_id: str) -> Dict[str, Any]:
+        return {
+            "previous_analysis_id": previous_analysis_id,
+            "unchanged": len(self.unchanged),
+            "unchanged_clause_ids": {new.id: old.id for new, old in self.unchanged},
+            "changed": len(self.changed),
+            "removed": len(self.removed),
+        }
+
+
+def normalize_clause_text(value: Optional[str]) -> str:
+    value = unicodedata.normalize("NFKC", value or "")
+    return re.sub(r"\s+", "", value)
+
+
+def clause_content_hash(clause: Clause) -> str:
+    """
+    조 번호/ID는 제외하고 제목과 내용만 해시한다.
+    (조항이 추가되어 번호가 밀려도 같은 내용이면 같은 조항으로 본다)
+    """
+    key = f"{normalize_clause_text(clause.title)}\n{normalize_clause_text(clause.content)}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def diff_clauses(previous: List[Clause], current: List[Clause]) -> ClauseDiff:
+    by_hash: Dict[str, List[Clause]] = {}
+    for clause in previous:
+        by_hash.setdefault(clause_content_hash(clause), []).append(clause)
+    diff = ClauseDiff()
+    for clause in current:
+        candidates = by_hash.get(clause_content_hash(clause))
+        if candidates:
+            diff.unchanged.append((clause, candidates.pop(0)))
+        else:
+            diff.changed.append(clause)
+    diff.removed = [clause for items in by_hash.values() for clause in items]
+    return diff
+
+
+def carry_forward(clause: Clause, previous: Clause) -> Clause:
+    """내용이 같은 이전 조항의 위험도/근거/관련 판례·법령을 새 조항에 복사한다."""
+    clause.risk_level = previous.risk_level
+    clause.risk_reason = previous.risk_reason
+    clause.related_precedents = _copy_related(previous.related_precedents)
+    clause.related_laws = _copy_related(previous.related_laws)
+    return clause
+
+
+def _copy_related(value: Any) -> Any:
+    # 임베딩 키가 없으면 "api필요" 문자열이 들어 있으므로 그대로 둔다.
+    return list(value) if isinstance(value, list) else value
+
+
+def is_risky(clause: Clause) -> bool:
+    return clause.risk_level in RISKY_LEVELS
+
+
+def clause_from_dict(data: Dict[str, Any]) -> Clause:
+    """clauses_json(asdict 직렬화) 항목을 Clause로 복원한다."""
+    risk_raw = data.get("risk_level")
+    try:
+        risk_level = RiskType(risk_raw) if risk_raw else None
+    except ValueError:
+        risk_level = None
+    return Clause(
+        id=str(data.get("id") or ""),
+        article_num=str(data.get("article_num") or ""),
+        title=str(data.get("title") or ""),
+        content=str(data.get("content") or ""),
+        risk_level=risk_level,
+        risk_reason=data.get("risk_reason"),
+        related_precedents=_restore_items(data.get("related_precedents"), Precedent),
+        related_laws=_restore_items(data.get("related_laws"), Law),
+    )
+
+
+def _restore_items(items: Any, model) -> List:
+    if not isinstance(items, list):
+        return []
+    names = {item.name for item in fields(model)}
+    restored = []
+    for item in items:
+        if isinstance(item, model):
+            restored.append(item)
+        elif isinstance(item, dict):
+            try:
+                restored.append(model(**{k: v for k, v in item.items() if k in names}))
+            except TypeError:
+                continue
+    return restored
@@ -0,0 +1,197 @@
+"""
+2단계: 단일 패스 계층형 조항 토크나이저 (조 → 항 → 호, 문자 오프셋 포함)
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from models import Clause
+
+
+@dataclass
+class ItemNode:
+    """호 (예: "1.", "2)")"""
+    marker: str
+    start: int
+    end: int
+
+
+@dataclass
+class ParagraphNode:
+    """항 (예: "①"). 항 표기 없이 호만 있는 경우 marker는 빈 문자열"""
+    marker: str
+    start: int
+    end: int
+    items: List[ItemNode] = field(default_factory=list)
+
+
+@dataclass
+class ArticleNode:
+    """조 (예: "제3조", "제3조의2")"""
+    number: int
+    sub_number: Optional[int]
+    title: str
+    start: int                          # "제" 위치
+    body_start: int                     # 제목 다음 본문 시작 위치
+    end: int
+    paragraphs: List[ParagraphNode] = field(default_factory=list)
+
+    @property
+    def article_num(self) -> str:
+        if self.sub_number is not None:
+            return f"제{self.number}조의{self.sub_number}"
+        return f"제{self.number}조"
+
+    @property
+    def clause_id(self) -> str:
+        if self.sub_number is not None:
+            return f"clause_{self.number}_{self.sub_number}"
+        return f"clause_{self.number}"
+
+
+class ClauseTokenizer:
+    """
+    하나의 정규식으로 텍스트를 한 번만 훑어 조/항/호 표기를 찾고 트리를 만든다.
+    역참조 없이 각 위치를 한 번씩만 검사하므로 입력 길이에 선형으로 동작한다.
+
+    - 조: 줄 머리의 "제n조", 또는 괄호 제목이 바로 붙은 "제n조(제목)"
+      (본문 속 "제3조에 위반" 같은 인용은 조 경계로 보지 않는다)
+    - 항: ①~⑳
+    - 호: 줄 머리 또는 조 제목 괄호 바로 뒤의 "1." / "1)"
+    """
+
+    TOKEN_PATTERN = re.compile(
+        r"(?P<article>(?P<lead>^[ \t]*)?제[ \t]*(?P<num>\d{1,4})[ \t]*조"
+        r"(?:[ \t]*의[ \t]*(?P<sub>\d{1,3}))?(?P<bracket>[ \t]*[\(（〔\[【])?)"
+        r"|(?P<para>[①-⑳])"
+        r"|(?:^[ \t]*|(?<=[\)）〕\]】]))(?P<item>\d{1,2}[.)])(?!\d)",
+        re.MULTILINE,
+    )
+    CLOSING_BRACKETS = ")）〕]】"
+    MAX_TITLE_CHARS = 60
+    # 줄 머리에 있어도 뒤에 조사가 붙으면 다른 조항을 인용한 것으로 본다.
+    REFERENCE_SUFFIXES = ("에", "의", "를", "을", "및", "과", "와", "은", "는", "로", "부터", "까지", "내지", "또는")
+
+    def tokenize(self, text: str) -> List[ArticleNode]:
+        articles: List[ArticleNode] = []
+        article: Optional[ArticleNode] = None
+        paragraph: Optional[ParagraphNode] = None
+        item: Optional[ItemNode] = None
+        skip_until = 0
+
+        for match in self.TOKEN_PATTERN.finditer(text):
+            pos = match.start()
+            if pos < skip_until:
+                continue
+            if match.group("article"):
+                if not self._is_article_start(text, match):
+                    continue
+                pos = match.start("article") + len(match.group("lead") or "")
+                self._close(article, paragraph, item, pos)
+                article = self._open_article(text, match, pos)
+                articles.append(article)
+                paragraph = None
+                item = None
+                skip_until = article.body_start
+            elif article is None:
+                continue
+            elif match.group("para"):
+                self._close(None, paragraph, item, pos)
+                paragraph = ParagraphNode(marker=match.group("para"), start=pos, end=pos)
+                article.paragraphs.append(paragraph)
+                item = None
+            else:
+                pos = match.start("item")
+                if item is not None:
+                    item.end = pos
+                if paragraph is None:
+                    paragraph = ParagraphNode(marker="", start=pos, end=pos)
+                    article.paragraphs.append(paragraph)
+                item = ItemNode(marker=match.group("item"), start=pos, end=pos)
+                paragraph.items.append(item)
+
+        self._close(article, paragraph, item, len(text))
+        return articles
+
+    def to_clauses(self, text: str, articles: Optional[List[ArticleNode]] = None) -> List[Clause]:
+        if articles is None:
+            articles = self.tokenize(text)
+        clauses: List[Clause] = []
+        for node in articles:
+            title = node.title
+            content = text[node.body_start : node.end].strip()
+            if not title:
+                lines = content.split("\n", 1)
+                title = lines[0].strip()
+                content = lines[1].strip() if len(lines) > 1 else ""
+            clauses.append(
+                Clause(
+                    id=node.clause_id,
+                    article_num=node.article_num,
+                    title=title,
+                    content=content,
+                )
+            )
+        return ensure_unique_ids(clauses)
+
+    def _is_article_start(self, text: str, match: re.Match) -> bool:
+        if match.group("bracket"):
+            return True
+        if match.group("lead") is None:
+            return False
+        following = text[match.end() : match.end() + 3].lstrip(" \t")
+        return not following.startswith(self.REFERENCE_SUFFIXES)
+
+    def _open_article(self, text: str, match: re.Match, start: int) -> ArticleNode:
+        title = ""
+        body_start = match.end()
+        if match.group("bracket"):
+            limit = min(len(text), body_start + self.MAX_TITLE_CHARS)
+            close = -1
+            for idx in range(body_start, limit):
+                char = text[idx]
+                if char in self.CLOSING_BRACKETS:
+                    close = idx
+                    break
+                if char == "\n":
+                    break
+            if close >= 0:
+                title = text[body_start:close].strip()
+                body_start = close + 1
+            else:
+                body_start = match.start("bracket")
+        sub = match.group("sub")
+        return ArticleNode(
+            number=int(match.group("num")),
+            sub_number=int(sub) if sub else None,
+            title=title,
+            start=start,
+            body_start=body_start,
+            end=body_start,
+        )
+
+    @staticmethod
+    def _close(
+        article: Optional[ArticleNode],
+        paragraph: Optional[ParagraphNode],
+        item: Optional[ItemNode],
+        pos: int,
+    ) -> None:
+        if item is not None:
+            item.end = pos
+        if paragraph is not None:
+            paragraph.end = pos
+        if article is not None:
+            article.end = pos
+
+
+def ensure_unique_ids(clauses: List[Clause]) -> List[Clause]:
+    """같은 조 번호가 반복되면(예: 제13조 두 번) 두 번째부터 ID에 _dupN을 붙인다."""
+    seen: dict = {}
+    for clause in clauses:
+        count = seen.get(clause.id, 0)
+        seen[clause.id] = count + 1
+        if count:
+            clause.id = f"{clause.id}_dup{count}"
+    return clauses
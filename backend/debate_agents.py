@@ -4,10 +4,10 @@
 
 import math
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from models import Clause
-from openai_client import chat_completion
+from openai_client import chat_completion, chat_completion_async
 
 
 # 임대인 측 변호사 시스템 프롬프트 (부동산 계약서 검토용)
@@ -47,8 +47,10 @@ MEDIATOR_SYSTEM_PROMPT = (
 )
 
 class DebateAgents:
-    def __init__(self, model: str | None = None) -> None:
+    def __init__(self, model: str | None = None, priority: str = "debate") -> None:
         self.model = model or os.getenv("OPENAI_DEBATE_MODEL") or "gpt-4o"
+        # 요청 제한기 우선순위 (분석 요청보다 뒤에 처리된다)
+        self.priority = priority
 
     def run(
         self,
@@ -60,25 +62,10 @@ class DebateAgents:
     ) -> List[Dict[str, str]]:
         if not os.getenv("OPENAI_API_KEY"):
             return [{"speaker": "system", "content": "API 키가 필요합니다."}]
-        env_max_rounds = os.getenv("DEBATE_MAX_ROUNDS")
-        if env_max_rounds:
-            try:
-                max_rounds = int(env_max_rounds)
-            except ValueError:
-                pass
-
-
-        if not contract_type:
-            contract_type = self._detect_contract_type(raw_text or "")
-        context = self._format_clauses(clauses)
+        contract_type, context, loop_limit, use_mediator = self._plan(
+            clauses, raw_text, rounds, max_rounds, contract_type
+        )
         transcript: List[Dict[str, str]] = []
-        # rounds가 주어지면(>0) 그대로 사용하고, 아니면 중재자 기반 루프를 max_rounds까지 수행합니다.
-        if rounds and rounds > 0:
-            loop_limit = rounds
-            use_mediator = False
-        else:
-            loop_limit = max_rounds
-            use_mediator = True
 
         for _ in range(loop_limit):
             landlord_reply = self._reply(
@@ -108,6 +95,29 @@ class DebateAgents:
                     break
         return transcript
 
+    def _plan(
+        self,
+        clauses: List[Clause],
+        raw_text: Optional[str],
+        rounds: int,
+        max_rounds: int,
+        contract_type: Optional[str],
+    ) -> Tuple[str, str, int, bool]:
+        env_max_rounds = os.getenv("DEBATE_MAX_ROUNDS")
+        if env_max_rounds:
+            try:
+                max_rounds = int(env_max_rounds)
+            except ValueError:
+                pass
+
+        if not contract_type:
+            contract_type = self._detect_contract_type(raw_text or "")
+        context = self._format_clauses(clauses)
+        # rounds가 주어지면(>0) 그대로 사용하고, 아니면 중재자 기반 루프를 max_rounds까지 수행합니다.
+        if rounds and rounds > 0:
+            return contract_type, context, rounds, False
+        return contract_type, context, max_rounds, True
+
     def _reply(
         self,
         role: str,
@@ -115,9 +125,36 @@ class DebateAgents:
         contract_type: str,
         context: str,
         transcript: List[Dict[str, str]],
+    ) -> str:
+        return chat_completion(
+            prompt=self._reply_prompt(role, contract_type, context, transcript),
+            model=self.model,
+            system_prompt=system_prompt,
+            priority=self.priority,
+        )
+
+    def _mediator_reply(
+        self,
+        contract_type: str,
+        context: str,
+        transcript: List[Dict[str, str]],
+    ) -> str:
+        return chat_completion(
+            prompt=self._mediator_prompt(contract_type, context, transcript),
+            model=self.model,
+            system_prompt=MEDIATOR_SYSTEM_PROMPT,
+            priority=self.priority,
+        )
+
+    def _reply_prompt(
+        self,
+        role: str,
+        contract_type: str,
+        context: str,
+        transcript: List[Dict[str, str]],
     ) -> str:
         history = self._format_history(transcript)
-        prompt = (
+        return (
             f"Contract type: {contract_type}\n"
             "Below is a summary of risky clauses in a real estate contract.\n"
             f"{context}\n\n"
@@ -127,16 +164,15 @@ class DebateAgents:
             "Address or refute the other side and propose concrete revisions in 3-5 sentences. "
             "Respond in Korean."
         )
-        return chat_completion(prompt=prompt, model=self.model, system_prompt=system_prompt)
 
-    def _mediator_reply(
+    def _mediator_prompt(
         self,
         contract_type: str,
         context: str,
         transcript: List[Dict[str, str]],
     ) -> str:
         history = self._format_history(transcript)
-        prompt = (
+        return (
             f"Contract type: {contract_type}\n"
             "Below is a summary of risky clauses in a real estate contract.\n"
             f"{context}\n\n"
@@ -144,11 +180,6 @@ class DebateAgents:
             f"{history}\n\n"
             "Analyze the debate and return the JSON only."
         )
-        return chat_completion(
-            prompt=prompt,
-            model=self.model,
-            system_prompt=MEDIATOR_SYSTEM_PROMPT,
-        )
 
     @staticmethod
     def _should_terminate(mediator_reply: str) -> bool:
@@ -220,3 +251,81 @@ class DebateAgents:
 
     def detect_contract_type(self, raw_text: str) -> str:
         return self._detect_contract_type(raw_text)
+
+
+class AsyncDebateAgents(DebateAgents):
+    """
+    DebateAgents의 asyncio 버전 (AsyncOpenAI 기반).
+    턴은 앞 발언을 참고하므로 순서대로 진행하고, 대기 중에는 이벤트 루프를 양보한다.
+    """
+
+    async def run(
+        self,
+        clauses: List[Clause],
+        raw_text: Optional[str] = None,
+        rounds: int = 0,
+        max_rounds: int = 3,
+        contract_type: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
+        if not os.getenv("OPENAI_API_KEY"):
+            return [{"speaker": "system", "content": "API 키가 필요합니다."}]
+        contract_type, context, loop_limit, use_mediator = self._plan(
+            clauses, raw_text, rounds, max_rounds, contract_type
+        )
+        transcript: List[Dict[str, str]] = []
+
+        for _ in range(loop_limit):
+            landlord_reply = await self._reply(
+                "임대인 변호사",
+                LANDLORD_LAWYER_SYSTEM_PROMPT,
+                contract_type,
+                context,
+                transcript,
+            )
+            transcript.append({"speaker": "임대인 변호사", "content": landlord_reply})
+            tenant_reply = await self._reply(
+                "임차인 변호사",
+                TENANT_LAWYER_SYSTEM_PROMPT,
+                contract_type,
+                context,
+                transcript,
+            )
+            transcript.append({"speaker": "임차인 변호사", "content": tenant_reply})
+            if use_mediator:
+                mediator_reply = await self._mediator_reply(
+                    contract_type,
+                    context,
+                    transcript,
+                )
+                transcript.append({"speaker": "판사", "content": mediator_reply})
+                if self._should_terminate(mediator_reply):
+                    break
+        return transcript
+
+    async def _reply(
+        self,
+        role: str,
+        system_prompt: str,
+        contract_type: str,
+        context: str,
+        transcript: List[Dict[str, str]],
+    ) -> str:
+        return await chat_completion_async(
+            prompt=self._reply_prompt(role, contract_type, context, transcript),
+            model=self.model,
+            system_prompt=system_prompt,
+            priority=self.priority,
+        )
+
+    async def _mediator_reply(
+        self,
+        contract_type: str,
+        context: str,
+        transcript: List[Dict[str, str]],
+    ) -> str:
+        return await chat_completion_async(
+            prompt=self._mediator_prompt(contract_type, context, transcript),
+            model=self.model,
+            system_prompt=MEDIATOR_SYSTEM_PROMPT,
+            priority=self.priority,
+        )
@@ -0,0 +1,137 @@
+"""
+판례/법령 상세 조회 범위 (한 번의 분석 안에서 문서 키별 중복 제거 + 동시 실행 제한)
+분석별 검색어 병합(single-flight) 건수와 순위 기반 상세 조회 절감량도 함께 센다.
+"""
+
+import asyncio
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # 모든 분석이 하나의 스레드 풀을 나눠 써서 law.go.kr 동시 상세 요청 수를 제한한다.
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("DRF_DETAIL_WORKERS") or "8"),
+                    thread_name_prefix="drf-detail",
+                )
+    return _EXECUTOR
+
+
+class DetailHydrationScope:
+    """
+    분석 하나에서 (문서 종류, ID)별 상세 조회를 한 번만 실행한다.
+    같은 문서를 동시에 요청하면 진행 중인 조회 하나를 함께 기다린다.
+    """
+
+    def __init__(self, max_concurrency: int | None = None) -> None:
+        self.max_concurrency = max_concurrency or int(os.getenv("DRF_DETAIL_WORKERS") or "8")
+        self.requested = 0
+        self.fetched = 0
+        self.failed = 0
+        self.queries = 0
+        self.coalesced_queries = 0
+        self.ranked_searches = 0
+        self.baseline_requests = 0
+        self.ranked_requests = 0
+        self._baseline_keys: Set[Hashable] = set()
+        self._ranked_keys: Set[Hashable] = set()
+        self._futures: Dict[Hashable, Future] = {}
+        self._tasks: Dict[Hashable, "asyncio.Task"] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = Lock()
+
+    def submit(self, key: Hashable, fetch: Callable[[], Any]) -> Future:
+        with self._lock:
+            self.requested += 1
+            future = self._futures.get(key)
+            if future is None:
+                self.fetched += 1
+                future = _get_executor().submit(self._run, fetch)
+                self._futures[key] = future
+        return future
+
+    def fetch_async(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> "asyncio.Task":
+        """submit의 asyncio 버전. 반환된 태스크를 await하면 결과를 받는다."""
+        with self._lock:
+            self.requested += 1
+            task = self._tasks.get(key)
+            if task is None:
+                self.fetched += 1
+                task = asyncio.ensure_future(self._run_async(fetch))
+                self._tasks[key] = task
+        return task
+
+    def _run(self, fetch: Callable[[], Any]) -> Any:
+        try:
+            return fetch()
+        except Exception as exc:
+            # 상세 조회 하나가 실패해도 검색 결과(목록 정보)는 그대로 사용한다.
+            print("DETAIL ERROR >>>", exc)
+            with self._lock:
+                self.failed += 1
+            return None
+
+    async def _run_async(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            try:
+                return await fetch()
+            except Exception as exc:
+                print("DETAIL ERROR >>>", exc)
+                with self._lock:
+                    self.failed += 1
+                return None
+
+    def record_query(self, coalesced: bool) -> None:
+        with self._lock:
+            self.queries += 1
+            if coalesced:
+                self.coalesced_queries += 1
+
+    def query_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"queries": self.queries, "coalesced": self.coalesced_queries}
+
+    def record_ranking(self, baseline_keys: List[Hashable], ranked_keys: List[Hashable]) -> None:
+        """검색 순서대로 상세 조회했을 문서(baseline)와 순위로 고른 문서(ranked)를 기록한다."""
+        with self._lock:
+            self.ranked_searches += 1
+            self.baseline_requests += len(baseline_keys)
+            self.ranked_requests += len(ranked_keys)
+            self._baseline_keys.update(baseline_keys)
+            self._ranked_keys.update(ranked_keys)
+
+    def ranking_stats(self) -> Dict[str, int]:
+        # requests: 검색마다 상세 조회하던 기존 방식 기준, documents: 분석 전체 중복 제거 후 문서 수
+        with self._lock:
+            baseline_documents = len(self._baseline_keys)
+            ranked_documents = len(self._ranked_keys)
+            return {
+                "searches": self.ranked_searches,
+                "baseline_requests": self.baseline_requests,
+                "ranked_requests": self.ranked_requests,
+                "saved_requests": self.baseline_requests - self.ranked_requests,
+                "baseline_documents": baseline_documents,
+                "ranked_documents": ranked_documents,
+                "saved_documents": baseline_documents - ranked_documents,
+            }
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requested": self.requested,
+                "fetched": self.fetched,
+                "shared": self.requested - self.fetched,
+                "failed": self.failed,
+            }
@@ -0,0 +1,317 @@
+"""
+law.go.kr DRF 검색/상세 응답 캐시 (메모리 LRU + SQLite 2단계, target별 TTL, stale-while-revalidate)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+
+# (payload, fetched_at)
+Entry = Tuple[dict, float]
+
+
+class DRFResponseCache:
+    """
+    DRF 응답 payload(JSON)를 요청 URL + 파라미터(OC 제외) 기준으로 저장한다.
+
+    - TTL 안: 캐시에서 바로 반환
+    - TTL이 지났지만 stale 기간 안: 캐시 값을 반환하고 백그라운드에서 갱신
+    - 그보다 오래됐거나 없음: DRF를 호출하고, 실패하면(연결 오류/4xx/5xx) 남아 있는 캐시 값을 반환
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        memory_entries: int | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self.path = path or os.getenv("DRF_CACHE_PATH") or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "cache", "drf_cache.sqlite3"
+        )
+        self.memory_entries = (
+            memory_entries
+            if memory_entries is not None
+            else int(os.getenv("DRF_CACHE_MEMORY_ENTRIES") or "512")
+        )
+        self.max_entries = (
+            max_entries
+            if max_entries is not None
+            else int(os.getenv("DRF_CACHE_MAX_ENTRIES") or "20000")
+        )
+        self.default_ttl = float(os.getenv("DRF_CACHE_TTL_SEC") or "86400")
+        self.ttls = self._parse_ttls(
+            os.getenv("DRF_CACHE_TTLS") or "prec=604800,law=86400,ordin=86400,admrul=86400"
+        )
+        self.stale_seconds = float(os.getenv("DRF_CACHE_STALE_SEC") or "604800")
+        self.counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "fallbacks": 0,
+        }
+        self._memory: "OrderedDict[str, Entry]" = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("DRF_CACHE_REFRESH_WORKERS") or "2"),
+            thread_name_prefix="drf-refresh",
+        )
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS drf_cache (
+              cache_key TEXT PRIMARY KEY,
+              payload TEXT NOT NULL,
+              fetched_at REAL NOT NULL,
+              last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_drf_cache_access ON drf_cache (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _parse_ttls(raw: str) -> Dict[str, float]:
+        ttls: Dict[str, float] = {}
+        for part in raw.split(","):
+            target, _, value = part.partition("=")
+            if target.strip() and value.strip():
+                ttls[target.strip()] = float(value)
+        return ttls
+
+    @staticmethod
+    def build_key(url: str, params: dict) -> str:
+        # OC(API 키)는 응답 내용과 무관하므로 키에서 뺀다.
+        items = sorted((str(k), str(v)) for k, v in params.items() if k != "OC")
+        raw = "\x1f".join([url, *[f"{k}={v}" for k, v in items]])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, target: str) -> float:
+        return self.ttls.get(target, self.default_ttl)
+
+    # ---------- 조회 ----------
+
+    def get_or_fetch(
+        self,
+        url: str,
+        params: dict,
+        fetch: Callable[[], Optional[dict]],
+    ) -> Optional[dict]:
+        key = self.build_key(url, params)
+        entry = self._lookup(key)
+        state = self._state(entry, params)
+        if state == "fresh":
+            return entry[0]
+        if state == "stale":
+            if self._start_refresh(key):
+                self._executor.submit(self._refresh, key, fetch)
+            return entry[0]
+        try:
+            payload = fetch()
+        except Exception:
+            if entry is None:
+                raise
+            payload = None
+        return self._store_or_fallback(key, payload, entry)
+
+    async def get_or_fetch_async(
+        self,
+        url: str,
+        params: dict,
+        fetch: Callable[[], Awaitable[Optional[dict]]],
+    ) -> Optional[dict]:
+        """get_or_fetch의 asyncio 버전. 백그라운드 갱신은 이벤트 루프의 태스크로 실행한다."""
+        key = self.build_key(url, params)
+        entry = self._lookup(key)
+        state = self._state(entry, params)
+        if state == "fresh":
+            return entry[0]
+        if state == "stale":
+            if self._start_refresh(key):
+                task = asyncio.create_task(self._refresh_async(key, fetch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return entry[0]
+        try:
+            payload = await fetch()
+        except Exception:
+            if entry is None:
+                raise
+            payload = None
+        return self._store_or_fallback(key, payload, entry)
+
+    def _state(self, entry: Optional[Entry], params: dict) -> str:
+        if entry is None:
+            with self._lock:
+                self.counters["misses"] += 1
+            return "miss"
+        age = time.time() - entry[1]
+        ttl = self.ttl_for(str(params.get("target", "")))
+        with self._lock:
+            if age <= ttl:
+                self.counters["hits"] += 1
+                return "fresh"
+            if age <= ttl + self.stale_seconds:
+                self.counters["stale_hits"] += 1
+                return "stale"
+            self.counters["misses"] += 1
+        return "expired"
+
+    def _store_or_fallback(
+        self, key: str, payload: Optional[dict], entry: Optional[Entry]
+    ) -> Optional[dict]:
+        if payload is not None:
+            self._put(key, payload)
+            return payload
+        if entry is not None:
+            # law.go.kr 장애 시에는 기간과 관계없이 마지막으로 받은 응답을 쓴다.
+            with self._lock:
+                self.counters["fallbacks"] += 1
+            return entry[0]
+        return None
+
+    # ---------- 백그라운드 갱신 ----------
+
+    def _start_refresh(self, key: str) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.counters["refreshes"] += 1
+            return True
+
+    def _finish_refresh(self, key: str, payload: Optional[dict]) -> None:
+        if payload is not None:
+            self._put(key, payload)
+        with self._lock:
+            self._refreshing.discard(key)
+            if payload is None:
+                self.counters["refresh_errors"] += 1
+
+    def _refresh(self, key: str, fetch: Callable[[], Optional[dict]]) -> None:
+        payload = None
+        try:
+            payload = fetch()
+        except Exception as exc:
+            print("DRF CACHE REFRESH ERROR >>>", exc)
+        self._finish_refresh(key, payload)
+
+    async def _refresh_async(
+        self, key: str, fetch: Callable[[], Awaitable[Optional[dict]]]
+    ) -> None:
+        payload = None
+        try:
+            payload = await fetch()
+        except Exception as exc:
+            print("DRF CACHE REFRESH ERROR >>>", exc)
+        finally:
+            # 이벤트 루프 종료(asyncio.run)로 취소되어도 키를 풀어 다음 stale 조회에서 다시 갱신한다.
+            self._finish_refresh(key, payload)
+
+    # ---------- 저장소 ----------
+
+    def _lookup(self, key: str) -> Optional[Entry]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM drf_cache WHERE cache_key=?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE drf_cache SET last_access=? WHERE cache_key=?", (now, key)
+            )
+            self._conn.commit()
+            entry = (json.loads(row[0]), row[1])
+            self._remember(key, entry)
+            return entry
+
+    def _put(self, key: str, payload: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, (payload, now))
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO drf_cache (cache_key, payload, fetched_at, last_access)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _remember(self, key: str, entry: Entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > max(0, self.memory_entries):
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        if self.max_entries <= 0:
+            return
+        total = self._conn.execute("SELECT COUNT(*) FROM drf_cache").fetchone()[0]
+        if total <= self.max_entries:
+            return
+        self._conn.execute(
+            """
+            DELETE FROM drf_cache WHERE cache_key IN (
+              SELECT cache_key FROM drf_cache ORDER BY last_access ASC LIMIT ?
+            )
+            """,
+            (total - self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM drf_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM drf_cache").fetchone()[0]
+            counters = dict(self.counters)
+            memory = len(self._memory)
+        lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": (counters["hits"] + counters["stale_hits"]) / lookups if lookups else 0.0,
+            "memory_entries": memory,
+            "disk_entries": entries,
+        }
+
+
+_CACHE: Optional[DRFResponseCache] = None
+_CACHE_LOCK = Lock()
+
+
+def get_drf_cache() -> Optional[DRFResponseCache]:
+    """프로세스 전체에서 하나의 캐시를 공유한다. DRF_CACHE_ENABLED=0이면 None."""
+    global _CACHE
+    if (os.getenv("DRF_CACHE_ENABLED") or "1").lower() not in ("1", "true", "yes", "y"):
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = DRFResponseCache()
+    return _CACHE
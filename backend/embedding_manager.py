@@ -1,27 +1,30 @@
-﻿import math
+﻿import asyncio
+import math
 import os
 from typing import List, Optional
 
-try:
-    from openai import OpenAI
-except ImportError as exc:
-    raise ImportError(
-        "필수 패키지가 없습니다: openai. `pip install openai`로 설치하세요."
-    ) from exc
-
+from llm_rate_limiter import estimate_tokens
 from models import Precedent, Law
+from openai_client import call_openai, call_openai_async, get_async_openai_client, get_openai_client
 
 
 class EmbeddingManager:
-    def __init__(self, model: Optional[str] = None) -> None:
+    def __init__(self, model: Optional[str] = None, priority: str = "interactive") -> None:
         self.model = model or os.getenv("OPENAI_EMBEDDING_MODEL") or "text-embedding-3-small"
+        self.priority = priority
         self.api_key = os.getenv("OPENAI_API_KEY") or "api필요"
-        self._client = OpenAI(api_key=self.api_key) if self.api_key != "api필요" else None
+        self._client = get_openai_client(self.api_key) if self.api_key != "api필요" else None
 
     def generate_embedding(self, text: str) -> List[float] | str:
         if self.api_key == "api필요":
             return "api필요"
-        response = self._client.embeddings.create(model=self.model, input=text)
+        response = call_openai(
+            self._client.embeddings,
+            model=self.model,
+            tokens=estimate_tokens(text),
+            priority=self.priority,
+            input=text,
+        )
         return response.data[0].embedding
 
     def calculate_similarity(self, vector_a: List[float], vector_b: List[float]) -> float:
@@ -64,6 +67,9 @@ class EmbeddingManager:
         target_embedding = self.generate_embedding(target_text)
         if target_embedding == "api필요":
             return "api필요"
+        return self._rank(target_embedding, items, top_k)
+
+    def _rank(self, target_embedding: List[float], items: List[object], top_k: int) -> List[object]:
         scored: List[tuple[float, object]] = []
         for item in items:
             embedding = getattr(item, "embedding", None)
@@ -73,3 +79,56 @@ class EmbeddingManager:
             scored.append((score, item))
         scored.sort(key=lambda item: item[0], reverse=True)
         return [item[1] for item in scored[:top_k]]
+
+
+class AsyncEmbeddingManager(EmbeddingManager):
+    """
+    EmbeddingManager의 asyncio 버전 (AsyncOpenAI 기반).
+    attach_embeddings는 항목별 임베딩 요청을 동시에 보내며, 속도는 공용 요청 제한기가 조절한다.
+    """
+
+    def __init__(self, model: Optional[str] = None, priority: str = "interactive") -> None:
+        super().__init__(model=model, priority=priority)
+        # AsyncOpenAI 클라이언트는 호출 시점의 이벤트 루프에서 가져온다.
+        self._client = None
+
+    async def generate_embedding(self, text: str) -> List[float] | str:
+        if self.api_key == "api필요":
+            return "api필요"
+        response = await call_openai_async(
+            get_async_openai_client(self.api_key).embeddings,
+            model=self.model,
+            tokens=estimate_tokens(text),
+            priority=self.priority,
+            input=text,
+        )
+        return response.data[0].embedding
+
+    async def find_similar_precedents(
+        self, target_text: str, precedents: List[Precedent], top_k: int = 3
+    ) -> List[Precedent] | str:
+        return await self._find_similar_items(target_text, precedents, top_k)
+
+    async def find_similar_laws(
+        self, target_text: str, laws: List[Law], top_k: int = 3
+    ) -> List[Law] | str:
+        return await self._find_similar_items(target_text, laws, top_k)
+
+    async def attach_embeddings(self, items: List[object], text_getter, max_items: Optional[int] = None):
+        if not items:
+            return []
+        if self.api_key == "api필요":
+            return "api필요"
+        limit = max_items if max_items is not None else len(items)
+        pending = [(item, text_getter(item)) for item in items[:limit]]
+        pending = [(item, text) for item, text in pending if text]
+        embeddings = await asyncio.gather(*[self.generate_embedding(text) for _, text in pending])
+        for (item, _), embedding in zip(pending, embeddings):
+            setattr(item, "embedding", embedding)
+        return items
+
+    async def _find_similar_items(self, target_text: str, items: List[object], top_k: int):
+        target_embedding = await self.generate_embedding(target_text)
+        if target_embedding == "api필요":
+            return "api필요"
+        return self._rank(target_embedding, items, top_k)
@@ -0,0 +1,278 @@
+"""
+공용 HTTP 클라이언트 (호스트별 keep-alive 커넥션 풀, 재시도, 호스트별 통계)
+"""
+
+import asyncio
+import os
+import random
+import time
+import weakref
+from threading import Lock
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError as exc:
+    raise ImportError(
+        "필수 패키지가 없습니다: requests. `pip install requests`로 설치하세요."
+    ) from exc
+
+try:
+    import httpx
+except ImportError:  # AsyncHttpClient 사용 시에만 필요
+    httpx = None
+
+
+RETRY_STATUS_CODES = {500, 502, 503, 504}
+# 자동 재시도는 멱등 요청만. POST(OCR 업로드 등 과금 요청)는 retry=True로 명시해야 재시도한다.
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+
+def _allowed_retries(method: str, retry: bool | None, max_retries: int) -> int:
+    """retry를 지정하지 않으면 멱등 메서드만 재시도한다."""
+    if retry is None:
+        retry = method.upper() in IDEMPOTENT_METHODS
+    return max_retries if retry else 0
+
+
+class HostStats:
+    """호스트별 요청/지연 통계"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, latency: float, failed: bool) -> None:
+        self.requests += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        if failed:
+            self.errors += 1
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_latency": self.total_latency / self.requests if self.requests else 0.0,
+            "max_latency": self.max_latency,
+        }
+
+
+class HttpClient:
+    """
+    호스트마다 requests.Session을 하나씩 두고 커넥션을 재사용한다.
+    연결 오류/타임아웃/5xx 응답은 지터가 섞인 지수 백오프로 재시도한다 (GET/HEAD 또는 retry=True일 때만).
+    """
+
+    def __init__(
+        self,
+        pool_connections: int | None = None,
+        pool_maxsize: int | None = None,
+        timeout: float | None = None,
+        max_retries: int | None = None,
+        backoff: float | None = None,
+        backoff_max: float | None = None,
+    ) -> None:
+        self.pool_connections = pool_connections or int(os.getenv("HTTP_POOL_CONNECTIONS") or "10")
+        self.pool_maxsize = pool_maxsize or int(os.getenv("HTTP_POOL_MAXSIZE") or "20")
+        self.timeout = timeout or float(os.getenv("HTTP_TIMEOUT_SEC") or "30")
+        self.max_retries = (
+            max_retries if max_retries is not None else int(os.getenv("HTTP_MAX_RETRIES") or "2")
+        )
+        self.backoff = backoff if backoff is not None else float(os.getenv("HTTP_BACKOFF_SEC") or "0.5")
+        self.backoff_max = backoff_max or float(os.getenv("HTTP_BACKOFF_MAX_SEC") or "8")
+        self._sessions: Dict[str, requests.Session] = {}
+        self._stats: Dict[str, HostStats] = {}
+        self._lock = Lock()
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(
+        self, method: str, url: str, retry: bool | None = None, **kwargs: Any
+    ) -> requests.Response:
+        host = urlsplit(url).netloc
+        session = self._session_for(host)
+        stats = self._stats[host]
+        kwargs.setdefault("timeout", self.timeout)
+        max_retries = _allowed_retries(method, retry, self.max_retries)
+        attempt = 0
+        while True:
+            self._rewind_files(kwargs.get("files"))
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                with self._lock:
+                    stats.record(time.perf_counter() - start, failed=True)
+                if attempt >= max_retries:
+                    raise
+            else:
+                failed = response.status_code in RETRY_STATUS_CODES
+                with self._lock:
+                    stats.record(time.perf_counter() - start, failed=failed)
+                if not failed or attempt >= max_retries:
+                    return response
+                response.close()
+            with self._lock:
+                stats.retries += 1
+            time.sleep(self._backoff_delay(attempt))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {host: stats.as_dict() for host, stats in self._stats.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _session_for(self, host: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._stats[host] = HostStats()
+            return session
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Full jitter: [0, min(max, base * 2^attempt)]
+        ceiling = min(self.backoff_max, self.backoff * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def _rewind_files(files: Any) -> None:
+        if not isinstance(files, dict):
+            return
+        for value in files.values():
+            handle = value[1] if isinstance(value, tuple) and len(value) > 1 else value
+            if hasattr(handle, "seek"):
+                try:
+                    handle.seek(0)
+                except (OSError, ValueError):
+                    pass
+
+
+class AsyncHttpClient:
+    """
+    HttpClient의 asyncio 버전 (httpx.AsyncClient 기반).
+    이벤트 루프마다 AsyncClient를 하나 두고, 세마포어로 동시 요청 수를 제한한다.
+    """
+
+    def __init__(
+        self,
+        max_connections: int | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        max_retries: int | None = None,
+        backoff: float | None = None,
+        backoff_max: float | None = None,
+    ) -> None:
+        self.max_connections = max_connections or int(os.getenv("HTTP_POOL_MAXSIZE") or "20")
+        self.max_concurrency = max_concurrency or int(os.getenv("HTTP_ASYNC_CONCURRENCY") or "32")
+        self.timeout = timeout or float(os.getenv("HTTP_TIMEOUT_SEC") or "30")
+        self.max_retries = (
+            max_retries if max_retries is not None else int(os.getenv("HTTP_MAX_RETRIES") or "2")
+        )
+        self.backoff = backoff if backoff is not None else float(os.getenv("HTTP_BACKOFF_SEC") or "0.5")
+        self.backoff_max = backoff_max or float(os.getenv("HTTP_BACKOFF_MAX_SEC") or "8")
+        # 이벤트 루프가 사라지면 항목은 빠지지만 커넥션은 닫히지 않으므로, 루프를 끝내기 전에 aclose()를 호출한다.
+        self._clients: "weakref.WeakKeyDictionary[Any, tuple]" = weakref.WeakKeyDictionary()
+        self._stats: Dict[str, HostStats] = {}
+
+    async def get(self, url: str, **kwargs: Any):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any):
+        return await self.request("POST", url, **kwargs)
+
+    async def request(self, method: str, url: str, retry: bool | None = None, **kwargs: Any):
+        client, semaphore = self._client_for_loop()
+        stats = self._stats.setdefault(urlsplit(url).netloc, HostStats())
+        kwargs.setdefault("timeout", self.timeout)
+        max_retries = _allowed_retries(method, retry, self.max_retries)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                async with semaphore:
+                    response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                stats.record(time.perf_counter() - start, failed=True)
+                if attempt >= max_retries:
+                    raise
+            else:
+                failed = response.status_code in RETRY_STATUS_CODES
+                stats.record(time.perf_counter() - start, failed=failed)
+                if not failed or attempt >= max_retries:
+                    return response
+            stats.retries += 1
+            ceiling = min(self.backoff_max, self.backoff * (2 ** attempt))
+            await asyncio.sleep(random.uniform(0, ceiling))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {host: stats.as_dict() for host, stats in self._stats.items()}
+
+    async def aclose(self) -> None:
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[0].aclose()
+
+    def _client_for_loop(self):
+        if httpx is None:
+            raise RuntimeError("httpx 패키지가 없습니다. `pip install httpx`로 설치하세요.")
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None or entry[0].is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=self.timeout,
+            )
+            entry = (client, asyncio.Semaphore(self.max_concurrency))
+            self._clients[loop] = entry
+        return entry
+
+
+_CLIENT: Optional[HttpClient] = None
+_ASYNC_CLIENT: Optional[AsyncHttpClient] = None
+_CLIENT_LOCK = Lock()
+
+
+def get_http_client() -> HttpClient:
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = HttpClient()
+    return _CLIENT
+
+
+def get_async_http_client() -> AsyncHttpClient:
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _ASYNC_CLIENT is None:
+                _ASYNC_CLIENT = AsyncHttpClient()
+    return _ASYNC_CLIENT
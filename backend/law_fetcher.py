@@ -1,15 +1,36 @@
+import asyncio
 import os
 import re
-from typing import List, Optional
-
-try:
-    import requests
-except ImportError as exc:
-    raise ImportError(
-        "필수 패키지가 없습니다: requests. `pip install requests`로 설치하세요."
-    ) from exc
+import time
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from detail_hydration import DetailHydrationScope
+from drf_cache import DRFResponseCache, get_drf_cache
+from http_client import AsyncHttpClient, HttpClient, get_async_http_client, get_http_client
 from models import Law
+from reference_ranker import rank_candidates
+from reference_store import ReferenceStore, get_reference_store
+from single_flight import get_single_flight
+
+
+# api_url -> 조문 코퍼스를 마지막으로 만들지 못한 시각 (요청 경로에서 재시도 간격을 두기 위함)
+_ARTICLE_BUILD_FAILURES: Dict[str, float] = {}
+
+# 상세 본문으로 모을 DRF 필드
+_DETAIL_TEXT_KEYS = frozenset(
+    {
+        "조문내용",
+        "내용",
+        "본문",
+        "조문제목",
+        "법령명",
+        "법령명한글",
+        "행정규칙명",
+        "자치법규명",
+        "규칙명",
+    }
+)
 
 
 class LawFetcher:
@@ -18,6 +39,9 @@ class LawFetcher:
         api_url: str | None = None,
         api_key: str | None = None,
         targets: Optional[List[str]] = None,
+        http_client: HttpClient | None = None,
+        store: ReferenceStore | None = None,
+        response_cache: DRFResponseCache | None = None,
     ) -> None:
         self.api_url = (
             api_url
@@ -32,30 +56,294 @@ class LawFetcher:
         self.targets = targets or [t.strip() for t in target_env.split(",") if t.strip()]
         self.detail_limit = int(os.getenv("LAW_DETAIL_LIMIT") or "10")
         self.max_text_chars = int(os.getenv("LAW_DETAIL_TEXT_LIMIT") or "4000")
+        self.http = http_client or get_http_client()
+        # 로컬 FTS 저장소 (tools/sync_reference_store.py로 채운다)
+        self.store = store if store is not None else get_reference_store()
+        self.local_limit = int(os.getenv("REFERENCE_STORE_LIMIT") or "10")
+        self.local_min_hits = int(os.getenv("REFERENCE_STORE_MIN_HITS") or "1")
+        # DRF 검색/상세 응답 캐시 (메모리 LRU + SQLite)
+        self.response_cache = response_cache if response_cache is not None else get_drf_cache()
+        # 같은 검색어의 동시 호출은 프로세스 전체에서 하나로 합친다.
+        self.flights = get_single_flight()
+        # 순위 후 상세 조회: 검색 목록을 조항과 비교해 상위 N건만 본문을 조회한다.
+        self.rank_then_hydrate = (os.getenv("REFERENCE_RANK_THEN_HYDRATE") or "").lower() in ("1", "true", "yes", "y")
+        self.hydrate_top_n = int(os.getenv("REFERENCE_HYDRATE_TOP_N") or "5")
+        # 조문 단위 코퍼스: LAW_TITLE_MUST_KEYWORDS 법령을 한 번 받아 조문별로 저장/색인한다.
+        self.article_corpus = (os.getenv("LAW_ARTICLE_CORPUS_ENABLED") or "1").lower() in ("1", "true", "yes", "y")
+        self.article_top_k = int(os.getenv("LAW_ARTICLE_TOP_K") or "5")
+        self.article_retry_sec = float(os.getenv("LAW_ARTICLE_RETRY_SEC") or "600")
 
-    def fetch_laws(self, keyword: str, targets: Optional[List[str]] = None) -> List[Law] | str:
-        include_terms = self._get_include_terms()
-        must_title_terms = self._get_must_title_terms()
-        base_query = self._get_base_query()
+    def fetch_laws(
+        self,
+        keyword: str,
+        targets: Optional[List[str]] = None,
+        hydration: DetailHydrationScope | None = None,
+        rank_text: str | None = None,
+    ) -> List[Law] | str:
+        """
+        hydration을 넘기면 같은 분석의 다른 검색과 법령 본문 조회를 공유한다.
+        rank_text(조항 텍스트)를 넘기고 REFERENCE_RANK_THEN_HYDRATE=1이면 상위 후보만 본문을 조회한다.
+        """
+        if self.flights is None:
+            return self._fetch_laws(keyword, targets, hydration, rank_text)
+        result, coalesced = self.flights.do(
+            self._flight_key(keyword, targets, rank_text),
+            partial(self._fetch_laws, keyword, targets, hydration, rank_text),
+        )
+        if hydration is not None:
+            hydration.record_query(coalesced)
+        return result
+
+    def _flight_key(
+        self, keyword: str, targets: Optional[List[str]], rank_text: str | None
+    ) -> tuple:
+        use_targets = tuple(targets or self.targets or ["law"])
+        # 순위 후 상세 조회나 조문 코퍼스 검색은 rank_text로 결과 순서가 달라지므로 키에 포함한다.
+        ranked = self.rank_then_hydrate or self._article_corpus_enabled(list(use_targets))
+        return ("law", self.api_url, keyword, use_targets, rank_text if ranked else None)
+
+    def _fetch_laws(
+        self,
+        keyword: str,
+        targets: Optional[List[str]],
+        hydration: DetailHydrationScope | None,
+        rank_text: str | None,
+    ) -> List[Law] | str:
+        use_targets = targets or self.targets or ["law"]
+        if self._article_corpus_enabled(use_targets):
+            self._ensure_article_corpus()
+            articles = self._search_articles(keyword, rank_text)
+            if articles is not None:
+                return articles
+        local = self._search_local(keyword, use_targets)
+        if local is not None:
+            return local
         if self.api_key == "api필요":
             return "api필요"
         if not self.api_url:
             return []
-        use_targets = targets or self.targets or ["law"]
         laws: List[Law] = []
+        for target, query in self._primary_queries(use_targets, keyword):
+            laws.extend(self._search_target(target, query))
+        if not laws:
+            for target, query in self._fallback_queries(use_targets, keyword):
+                laws.extend(self._search_target(target, query))
+        laws = self._rank_for_hydration(self._filter_search_results(laws), rank_text, hydration)
+        self._hydrate_law_details(laws, hydration)
+        return self._remember(self._select_detailed(laws))
+
+    def _rank_for_hydration(
+        self, laws: List[Law], rank_text: str | None, hydration: DetailHydrationScope | None
+    ) -> List[Law]:
+        """검색 목록(법령명/제개정구분)을 조항과 비교해 상위 hydrate_top_n건만 남긴다."""
+        if not (self.rank_then_hydrate and rank_text):
+            return laws
+        ranked = rank_candidates(
+            rank_text, laws, lambda law: f"{law.title} {law.summary}", self.hydrate_top_n
+        )
+        if hydration is not None:
+            hydration.record_ranking(
+                [(law.doc_type, law.doc_id) for law in self._laws_to_hydrate(laws)],
+                [(law.doc_type, law.doc_id) for law in self._laws_to_hydrate(ranked)],
+            )
+        return ranked
+
+    def _search_local(self, keyword: str, use_targets: List[str]) -> Optional[List[Law]]:
+        """
+        동기화 명령으로 모든 target에 대해 받은 검색어만 로컬 저장소에서 찾는다.
+        결과가 local_min_hits 이상이면 반환하고, 아니면 None(DRF 조회).
+        """
+        if self.store is None:
+            return None
+        if not all(self.store.is_synced("law", target, keyword) for target in use_targets):
+            self.store.record_lookup(False)
+            return None
+        # DRF 조회와 같이 기본 조회어(LAW_BASE_QUERY)를 함께 찾고 같은 필터를 적용한다.
+        query = " ".join(q for q in [self._get_base_query(), keyword] if q)
+        laws = self._filter_search_results(
+            self.store.search_laws(query, use_targets, self.local_limit)
+        )
+        hit = len(laws) >= max(1, self.local_min_hits)
+        self.store.record_lookup(hit)
+        return self._select_detailed(laws) if hit else None
+
+    # ---------- 조문 단위 코퍼스 ----------
+
+    def _article_corpus_enabled(self, use_targets: List[str]) -> bool:
+        return self.article_corpus and self.store is not None and "law" in use_targets
+
+    def _pending_article_terms(self) -> List[str]:
+        return [
+            term
+            for term in self._get_must_title_terms()
+            if self.store.last_synced("articles", "law", term) is None
+        ]
+
+    def _can_build_articles(self) -> bool:
+        if not self.api_url or self.api_key == "api필요":
+            return False
+        # 실패한 뒤에는 article_retry_sec 동안 요청 경로에서 다시 만들지 않는다.
+        failed_at = _ARTICLE_BUILD_FAILURES.get(self.api_url)
+        if failed_at is not None and time.monotonic() - failed_at < self.article_retry_sec:
+            return False
+        return bool(self._pending_article_terms())
+
+    def _finish_article_build(self) -> None:
+        if self._pending_article_terms():
+            _ARTICLE_BUILD_FAILURES[self.api_url] = time.monotonic()
+        else:
+            _ARTICLE_BUILD_FAILURES.pop(self.api_url, None)
+
+    def _ensure_article_corpus(self) -> None:
+        # 아직 받지 않은 법령이 있으면 처음 한 번만 만든다 (동시 요청은 single-flight로 합친다).
+        if not self._can_build_articles():
+            return
+        try:
+            if self.flights is None:
+                self.build_article_corpus()
+            else:
+                self.flights.do(("law_articles", self.api_url), self.build_article_corpus)
+        except Exception as exc:
+            print("LAW ARTICLE ERROR >>>", exc)
+        self._finish_article_build()
+
+    def build_article_corpus(self, force: bool = False) -> int:
+        """
+        LAW_TITLE_MUST_KEYWORDS 법령(시행령/시행규칙 포함)의 본문을 받아 조문 레코드로 나눠 저장한다.
+        force=False면 이미 받은 법령명은 건너뛴다. 저장한 조문 수를 반환한다.
+        """
+        if self.store is None:
+            return 0
+        terms = self._get_must_title_terms() if force else self._pending_article_terms()
+        stored = 0
+        for term in terms:
+            statutes = self._article_statutes(term, self._search_target("law", term))
+            counts = [
+                self._store_articles(law, self._fetch_law_detail(law.doc_type, law.doc_id))
+                for law in statutes
+            ]
+            stored += sum(counts)
+            self._mark_articles_synced(term, counts)
+        return stored
+
+    def _mark_articles_synced(self, term: str, counts: List[int]) -> None:
+        # 모든 법령의 조문을 저장했을 때만 완료로 기록한다 (상세 조회 실패 시 다음에 다시 받는다).
+        if counts and all(counts):
+            self.store.mark_synced("articles", "law", term, len(counts))
+
+    def _article_statutes(self, term: str, laws: List[Law]) -> List[Law]:
+        return [law for law in self._dedupe_laws(laws) if law.doc_id and term in (law.title or "")]
+
+    def _store_articles(self, law: Law, payload: Optional[dict]) -> int:
+        articles = self._split_articles(law, payload) if payload else []
+        if not articles:
+            return 0
+        return self.store.replace_law_articles(law, articles)
+
+    def _split_articles(self, law: Law, payload: dict) -> List[Law]:
+        """법령 상세 payload의 조문단위를 조문(제N조, 제N조의M)별 Law 레코드로 나눈다."""
+        units = self._find_article_units(payload)
+        articles: List[Law] = []
+        for unit in units:
+            if not isinstance(unit, dict) or unit.get("조문여부") == "전문":
+                continue
+            number = str(unit.get("조문번호") or "").strip()
+            if not number:
+                continue
+            branch = str(unit.get("조문가지번호") or "").strip()
+            label = f"제{number}조" + (f"의{branch}" if branch and branch != "0" else "")
+            heading = str(unit.get("조문제목") or "").strip()
+            texts: List[str] = []
+            self._collect_article_texts(unit, texts)
+            content = self._clean_text("\n".join(t.strip() for t in texts if t and t.strip()))
+            if not content:
+                continue
+            articles.append(
+                Law(
+                    doc_id=f"{law.doc_id}-{number}" + (f"-{branch}" if branch and branch != "0" else ""),
+                    doc_type=law.doc_type,
+                    title=f"{law.title} {label}" + (f"({heading})" if heading else ""),
+                    content=content,
+                    date=law.date,
+                    org=law.org,
+                    url=law.url,
+                )
+            )
+        return articles
+
+    @staticmethod
+    def _find_article_units(payload: object) -> list:
+        stack = [payload]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, dict):
+                units = obj.get("조문단위")
+                if isinstance(units, list):
+                    return units
+                if isinstance(units, dict):
+                    return [units]
+                stack.extend(obj.values())
+            elif isinstance(obj, list):
+                stack.extend(obj)
+        return []
+
+    @classmethod
+    def _collect_article_texts(cls, obj: object, texts: List[str]) -> None:
+        # 조문내용 → 항내용 → 호내용 → 목내용 순서(문서 순서)로 모은다.
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                if key in {"조문내용", "항내용", "호내용", "목내용"}:
+                    if isinstance(value, str):
+                        texts.append(value)
+                    elif isinstance(value, list):
+                        texts.extend(v for v in value if isinstance(v, str))
+                        cls._collect_article_texts([v for v in value if not isinstance(v, str)], texts)
+                elif isinstance(value, (dict, list)):
+                    cls._collect_article_texts(value, texts)
+        elif isinstance(obj, list):
+            for item in obj:
+                cls._collect_article_texts(item, texts)
+
+    def _search_articles(self, keyword: str, rank_text: str | None) -> Optional[List[Law]]:
+        """조항과 맞는 조문 상위 article_top_k건. 코퍼스가 비었거나 맞는 조문이 없으면 None"""
+        query = " ".join(q for q in [keyword, rank_text] if q)
+        articles = self.store.search_law_articles(query, self.article_top_k)
+        if not articles:
+            return None
+        self.store.record_lookup(True)
+        return articles
+
+    def _remember(self, laws: List[Law]) -> List[Law]:
+        # 본문까지 받은 결과만 저장해 두면 동기화 명령이 같은 법령의 상세 조회를 건너뛴다.
+        if self.store is not None:
+            detailed = [law for law in laws if law.content and law.content.strip()]
+            if detailed:
+                self.store.upsert_laws(detailed)
+        return laws
+
+    def _primary_queries(self, use_targets: List[str], keyword: str) -> List[tuple[str, str]]:
+        base_query = self._get_base_query()
+        queries: List[tuple[str, str]] = []
         if "law" in use_targets:
             if base_query:
-                laws.extend(self._search_target("law", base_query))
+                queries.append(("law", base_query))
             if keyword and keyword != base_query:
-                laws.extend(self._search_target("law", keyword))
-        remaining_targets = [t for t in use_targets if t != "law"]
-        if not laws and remaining_targets:
-            for target in remaining_targets:
-                laws.extend(self._search_target(target, keyword))
-        laws = self._dedupe_laws(laws)
-        laws = self._filter_by_terms(laws, include_terms, must_title_terms)
+                queries.append(("law", keyword))
+        return queries
+
+    @staticmethod
+    def _fallback_queries(use_targets: List[str], keyword: str) -> List[tuple[str, str]]:
+        return [(target, keyword) for target in use_targets if target != "law"]
+
+    def _filter_search_results(self, laws: List[Law]) -> List[Law]:
         laws = self._dedupe_laws(laws)
-        self._hydrate_law_details(laws)
+        laws = self._filter_by_terms(
+            laws, self._get_include_terms(), self._get_must_title_terms()
+        )
+        return self._dedupe_laws(laws)
+
+    @staticmethod
+    def _select_detailed(laws: List[Law]) -> List[Law]:
         detailed = [
             law
             for law in laws
@@ -63,19 +351,26 @@ class LawFetcher:
         ]
         return detailed or laws
 
+    def _search_params(self, target: str, keyword: str) -> dict:
+        return {"OC": self.api_key, "target": target, "type": "JSON", "query": keyword}
+
     def _search_target(self, target: str, keyword: str) -> List[Law]:
-        response = requests.get(
-            self.api_url,
-            params={"OC": self.api_key, "target": target, "type": "JSON", "query": keyword},
-            timeout=30,
-        )
-        try:
-            response.raise_for_status()
-        except requests.HTTPError:
-            return []
-        try:
-            payload = response.json() or {}
-        except ValueError:
+        payload = self._get_payload(self.api_url, self._search_params(target, keyword))
+        return self._parse_search_payload(payload, target)
+
+    def _get_payload(self, url: str, params: dict) -> Optional[dict]:
+        def fetch() -> Optional[dict]:
+            return self._payload_from_response(self.http.get(url, params=params, timeout=30))
+
+        if self.response_cache is None:
+            return fetch()
+        return self.response_cache.get_or_fetch(url, params, fetch)
+
+    def _parse_search_response(self, response, target: str) -> List[Law]:
+        return self._parse_search_payload(self._payload_from_response(response), target)
+
+    def _parse_search_payload(self, payload: Optional[dict], target: str) -> List[Law]:
+        if payload is None:
             return []
         items = self._extract_items(payload, target)
         laws: List[Law] = []
@@ -85,6 +380,16 @@ class LawFetcher:
             laws.append(self._build_law_from_item(target, item))
         return laws
 
+    @staticmethod
+    def _payload_from_response(response) -> Optional[dict]:
+        # requests/httpx 응답 모두 지원: 4xx/5xx 또는 JSON 파싱 실패 시 None
+        if response.status_code >= 400:
+            return None
+        try:
+            return response.json() or {}
+        except ValueError:
+            return None
+
     def _build_law_from_item(self, target: str, item: dict) -> Law:
         if target == "law":
             doc_id = self._get_first(item, ["법령ID", "법령일련번호", "ID", "MST"])
@@ -147,67 +452,79 @@ class LawFetcher:
             return self.api_url.replace("lawSearch.do", "lawService.do")
         return self.api_url.rstrip("/") + "/lawService.do"
 
+    def _detail_params(self, target: str, doc_id: str) -> dict:
+        return {"OC": self.api_key, "target": target, "type": "JSON", "ID": doc_id}
+
     def _fetch_law_detail(self, target: str, doc_id: str) -> Optional[dict]:
         if not doc_id:
             return None
-        response = requests.get(
-            self._detail_base_url(),
-            params={"OC": self.api_key, "target": target, "type": "JSON", "ID": doc_id},
-            timeout=30,
-        )
-        try:
-            response.raise_for_status()
-        except requests.HTTPError:
-            return None
-        try:
-            payload = response.json() or {}
-        except ValueError:
-            return None
-        return payload
+        return self._get_payload(self._detail_base_url(), self._detail_params(target, doc_id))
 
-    def _hydrate_law_details(self, laws: List[Law]) -> None:
+    def _laws_to_hydrate(self, laws: List[Law]) -> List[Law]:
         if self.detail_limit <= 0:
-            return
-        for law in laws[: self.detail_limit]:
-            if law.content and law.content.strip():
-                continue
-            detail = self._fetch_law_detail(law.doc_type, law.doc_id)
-            if not detail:
-                continue
-            detail_text = self._extract_detail_text(detail)
+            return []
+        return [
+            law for law in laws[: self.detail_limit] if not (law.content and law.content.strip())
+        ]
+
+    def _fetch_law_detail_text(self, target: str, doc_id: str) -> str:
+        detail = self._fetch_law_detail(target, doc_id)
+        return self._extract_detail_text(detail) if detail else ""
+
+    def _hydrate_law_details(
+        self, laws: List[Law], hydration: DetailHydrationScope | None = None
+    ) -> None:
+        # 같은 문서는 본문 추출까지 한 번만 하고 결과 문자열을 공유한다.
+        hydration = hydration or DetailHydrationScope()
+        pending = self._laws_to_hydrate(laws)
+        futures = [
+            hydration.submit(
+                (law.doc_type, law.doc_id),
+                partial(self._fetch_law_detail_text, law.doc_type, law.doc_id),
+            )
+            for law in pending
+        ]
+        for law, future in zip(pending, futures):
+            detail_text = future.result()
             if detail_text:
                 law.content = detail_text
 
     def _extract_detail_text(self, payload: dict) -> str:
-        texts: List[str] = []
-
-        def walk(obj: object) -> None:
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if key in {
-                        "조문내용",
-                        "내용",
-                        "본문",
-                        "조문제목",
-                        "법령명",
-                        "법령명한글",
-                        "행정규칙명",
-                        "자치법규명",
-                        "규칙명",
-                    } and isinstance(value, str):
-                        texts.append(value)
-                    else:
-                        walk(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    walk(item)
-
-        walk(payload)
-        merged = "\n".join([t.strip() for t in texts if t and t.strip()])
-        merged = self._clean_text(merged)
-        if self.max_text_chars > 0 and len(merged) > self.max_text_chars:
-            return merged[: self.max_text_chars]
-        return merged
+        """
+        상세 payload에서 본문 문자열을 문서 순서대로 모은다.
+        명시적 스택으로 순회하고 max_text_chars를 채우면 바로 멈춰, 큰 법령도 필요한 앞부분만 읽는다.
+        """
+        budget = self.max_text_chars if self.max_text_chars > 0 else None
+        parts: List[str] = []
+        size = 0
+        # (반복자, dict 여부) 스택: dict/list를 복사하지 않고 재귀 순회와 같은 순서로 방문한다.
+        stack: List[Tuple[Iterator, bool]] = [(iter(payload.items()), True)]
+        while stack:
+            iterator, keyed = stack[-1]
+            for entry in iterator:
+                key, value = entry if keyed else (None, entry)
+                if isinstance(value, dict):
+                    stack.append((iter(value.items()), True))
+                    break
+                if isinstance(value, list):
+                    stack.append((iter(value), False))
+                    break
+                if key not in _DETAIL_TEXT_KEYS or not isinstance(value, str):
+                    continue
+                text = value.strip()
+                if "<" in text:
+                    text = self._clean_text(text)
+                if not text:
+                    continue
+                size += len(text) + (1 if parts else 0)
+                parts.append(text)
+                if budget is not None and size >= budget:
+                    stack.clear()
+                    break
+            else:
+                stack.pop()
+        merged = "\n".join(parts)
+        return merged[:budget] if budget is not None else merged
 
     @staticmethod
     def _get_include_terms() -> List[str]:
@@ -278,3 +595,146 @@ class LawFetcher:
             if value:
                 return value
         return ""
+
+
+class AsyncLawFetcher(LawFetcher):
+    """
+    LawFetcher의 asyncio 버전.
+    검색/상세 호출을 하나의 이벤트 루프에서 동시에 실행하며, 동시 요청 수는
+    AsyncHttpClient의 세마포어(HTTP_ASYNC_CONCURRENCY)로 제한된다.
+    """
+
+    def __init__(
+        self,
+        api_url: str | None = None,
+        api_key: str | None = None,
+        targets: Optional[List[str]] = None,
+        http_client: AsyncHttpClient | None = None,
+        store: ReferenceStore | None = None,
+        response_cache: DRFResponseCache | None = None,
+    ) -> None:
+        super().__init__(
+            api_url=api_url,
+            api_key=api_key,
+            targets=targets,
+            store=store,
+            response_cache=response_cache,
+        )
+        self.http = http_client or get_async_http_client()
+
+    async def fetch_laws(
+        self,
+        keyword: str,
+        targets: Optional[List[str]] = None,
+        hydration: DetailHydrationScope | None = None,
+        rank_text: str | None = None,
+    ) -> List[Law] | str:
+        if self.flights is None:
+            return await self._fetch_laws(keyword, targets, hydration, rank_text)
+        result, coalesced = await self.flights.do_async(
+            self._flight_key(keyword, targets, rank_text),
+            partial(self._fetch_laws, keyword, targets, hydration, rank_text),
+        )
+        if hydration is not None:
+            hydration.record_query(coalesced)
+        return result
+
+    async def _fetch_laws(
+        self,
+        keyword: str,
+        targets: Optional[List[str]],
+        hydration: DetailHydrationScope | None,
+        rank_text: str | None,
+    ) -> List[Law] | str:
+        use_targets = targets or self.targets or ["law"]
+        if self._article_corpus_enabled(use_targets):
+            await self._ensure_article_corpus()
+            articles = self._search_articles(keyword, rank_text)
+            if articles is not None:
+                return articles
+        # 로컬 조회는 밀리초 단위라 이벤트 루프에서 바로 실행한다.
+        local = self._search_local(keyword, use_targets)
+        if local is not None:
+            return local
+        if self.api_key == "api필요":
+            return "api필요"
+        if not self.api_url:
+            return []
+        laws = await self._search_many(self._primary_queries(use_targets, keyword))
+        if not laws:
+            laws = await self._search_many(self._fallback_queries(use_targets, keyword))
+        laws = self._rank_for_hydration(self._filter_search_results(laws), rank_text, hydration)
+        await self._hydrate_law_details(laws, hydration)
+        return self._remember(self._select_detailed(laws))
+
+    async def _ensure_article_corpus(self) -> None:
+        if not self._can_build_articles():
+            return
+        try:
+            if self.flights is None:
+                await self.build_article_corpus()
+            else:
+                await self.flights.do_async(("law_articles", self.api_url), self.build_article_corpus)
+        except Exception as exc:
+            print("LAW ARTICLE ERROR >>>", exc)
+        self._finish_article_build()
+
+    async def build_article_corpus(self, force: bool = False) -> int:
+        if self.store is None:
+            return 0
+        terms = self._get_must_title_terms() if force else self._pending_article_terms()
+        stored = 0
+        for term in terms:
+            statutes = self._article_statutes(term, await self._search_target("law", term))
+            payloads = await asyncio.gather(
+                *[self._fetch_law_detail(law.doc_type, law.doc_id) for law in statutes]
+            )
+            counts = [self._store_articles(law, payload) for law, payload in zip(statutes, payloads)]
+            stored += sum(counts)
+            self._mark_articles_synced(term, counts)
+        return stored
+
+    async def _search_many(self, queries: List[tuple[str, str]]) -> List[Law]:
+        results = await asyncio.gather(
+            *[self._search_target(target, query) for target, query in queries]
+        )
+        return [law for laws in results for law in laws]
+
+    async def _search_target(self, target: str, keyword: str) -> List[Law]:
+        payload = await self._get_payload(self.api_url, self._search_params(target, keyword))
+        return self._parse_search_payload(payload, target)
+
+    async def _get_payload(self, url: str, params: dict) -> Optional[dict]:
+        async def fetch() -> Optional[dict]:
+            return self._payload_from_response(await self.http.get(url, params=params, timeout=30))
+
+        if self.response_cache is None:
+            return await fetch()
+        return await self.response_cache.get_or_fetch_async(url, params, fetch)
+
+    async def _fetch_law_detail(self, target: str, doc_id: str) -> Optional[dict]:
+        if not doc_id:
+            return None
+        return await self._get_payload(self._detail_base_url(), self._detail_params(target, doc_id))
+
+    async def _fetch_law_detail_text(self, target: str, doc_id: str) -> str:
+        detail = await self._fetch_law_detail(target, doc_id)
+        return self._extract_detail_text(detail) if detail else ""
+
+    async def _hydrate_law_details(
+        self, laws: List[Law], hydration: DetailHydrationScope | None = None
+    ) -> None:
+        hydration = hydration or DetailHydrationScope()
+        pending = self._laws_to_hydrate(laws)
+        texts = await asyncio.gather(
+            *[
+                hydration.fetch_async(
+                    (law.doc_type, law.doc_id),
+                    partial(self._fetch_law_detail_text, law.doc_type, law.doc_id),
+                )
+                for law in pending
+            ]
+        )
+        for law, detail_text in zip(pending, texts):
+            if detail_text:
+                law.content = detail_text
@@ -0,0 +1,231 @@
+"""
+2단계 보조: Upstage Document Parse 결과(HTML/요소 좌표) 기반 조항 분리
+"""
+
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import List, Optional
+
+from clause_tokenizer import ensure_unique_ids
+from models import Clause
+
+
+@dataclass
+class LayoutElement:
+    """Document Parse 요소 (읽기 순서대로 정렬됨)"""
+    category: str                       # heading | paragraph | table | list | header | footer ...
+    lines: List[str] = field(default_factory=list)
+    element_id: int = 0
+    page: int = 1
+
+
+class _DocumentParseHTMLParser(HTMLParser):
+    """Document Parse HTML을 최상위 요소 단위로 나누고 <br>/표 행을 줄로 변환한다."""
+
+    BLOCK_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6", "p", "table", "ul", "ol", "header",
+                  "footer", "figure", "caption", "blockquote", "div"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.elements: List[LayoutElement] = []
+        self._current: Optional[LayoutElement] = None
+        self._depth = 0
+        self._line: List[str] = []
+        self._cells: List[str] = []
+        self._in_cell = False
+
+    def handle_starttag(self, tag, attrs):
+        attr_map = dict(attrs)
+        if self._current is None:
+            if tag not in self.BLOCK_TAGS:
+                return
+            category = attr_map.get("data-category") or self._category_for_tag(tag)
+            try:
+                element_id = int(attr_map.get("id") or len(self.elements))
+            except ValueError:
+                element_id = len(self.elements)
+            self._current = LayoutElement(category=category, element_id=element_id)
+            self._depth = 1
+            return
+        if tag == "br":
+            self._flush_line()
+        elif tag in ("td", "th"):
+            self._in_cell = True
+            self._line = []
+        elif tag == "li":
+            self._flush_line()
+        if tag not in ("br", "img"):
+            self._depth += 1
+
+    def handle_endtag(self, tag):
+        if self._current is None:
+            return
+        if tag in ("td", "th"):
+            self._cells.append("".join(self._line).strip())
+            self._line = []
+            self._in_cell = False
+        elif tag == "tr":
+            row = " | ".join([cell for cell in self._cells if cell])
+            if row:
+                self._current.lines.append(row)
+            self._cells = []
+        elif tag == "li":
+            self._flush_line()
+        self._depth -= 1
+        if self._depth <= 0:
+            self._flush_line()
+            self.elements.append(self._current)
+            self._current = None
+
+    def handle_data(self, data):
+        if self._current is not None:
+            self._line.append(data)
+
+    def _flush_line(self) -> None:
+        if self._in_cell or self._current is None:
+            return
+        line = "".join(self._line).strip()
+        if line:
+            self._current.lines.append(line)
+        self._line = []
+
+    @staticmethod
+    def _category_for_tag(tag: str) -> str:
+        if tag.startswith("h") and len(tag) == 2:
+            return "heading1"
+        if tag in ("ul", "ol"):
+            return "list"
+        return tag
+
+
+class LayoutClauseExtractor:
+    """
+    Document Parse 요소 트리(제목/문단/표, 읽기 순서)로 조항을 구성한다.
+    - "제n조" 표기가 줄 머리에 있으면 그 줄에서 새 조항을 시작한다.
+    - 표기가 없으면 heading 요소를 조항 경계로 사용한다.
+    - 표는 직전 조항의 내용에 행 단위 텍스트로 붙인다.
+    """
+
+    ARTICLE_PATTERN = re.compile(
+        r"^\s*제\s*(\d+)\s*조(?:\s*의\s*(\d+))?\s*"
+        r"(?:[\(（〔\[【]\s*([^\)）〕\]】]*?)\s*[\)）〕\]】])?\s*(.*)$"
+    )
+    SKIP_CATEGORIES = {"header", "footer", "figure", "caption", "equation"}
+
+    def extract_from_html(self, html: str) -> List[Clause]:
+        if not html or not html.strip():
+            return []
+        parser = _DocumentParseHTMLParser()
+        parser.feed(html)
+        parser.close()
+        elements = sorted(parser.elements, key=lambda e: e.element_id)
+        return self.extract_from_elements(elements)
+
+    def extract_from_payload(self, payload: dict) -> List[Clause]:
+        """
+        Document Parse 응답 JSON의 elements(페이지/좌표 포함)를 읽기 순서로 정렬해 사용한다.
+        """
+        raw_elements = payload.get("elements") if isinstance(payload, dict) else None
+        if not isinstance(raw_elements, list):
+            content = payload.get("content") if isinstance(payload, dict) else None
+            html = content.get("html") if isinstance(content, dict) else None
+            return self.extract_from_html(html or "")
+
+        def order_key(item: dict):
+            coords = item.get("coordinates") or []
+            top = min((c.get("y", 0.0) for c in coords), default=0.0)
+            left = min((c.get("x", 0.0) for c in coords), default=0.0)
+            return (item.get("page") or 1, round(top, 3), left)
+
+        elements: List[LayoutElement] = []
+        for item in sorted([e for e in raw_elements if isinstance(e, dict)], key=order_key):
+            content = item.get("content") or {}
+            parser = _DocumentParseHTMLParser()
+            parser.feed(content.get("html") or "")
+            parser.close()
+            for element in parser.elements:
+                element.category = item.get("category") or element.category
+                element.page = item.get("page") or 1
+                elements.append(element)
+        return self.extract_from_elements(elements)
+
+    def extract_from_elements(self, elements: List[LayoutElement]) -> List[Clause]:
+        elements = [e for e in elements if e.category not in self.SKIP_CATEGORIES]
+        has_articles = any(
+            self.ARTICLE_PATTERN.match(line)
+            for element in elements
+            if element.category != "table"
+            for line in element.lines
+        )
+        if has_articles:
+            clauses = self._split_by_articles(elements)
+        else:
+            clauses = self._split_by_headings(elements)
+        # OCR 오인식으로 같은 조 번호가 반복될 수 있다 (예: 제13조 두 번).
+        return ensure_unique_ids(clauses)
+
+    def _split_by_articles(self, elements: List[LayoutElement]) -> List[Clause]:
+        clauses: List[Clause] = []
+        current: Optional[dict] = None
+        for element in elements:
+            for line in element.lines:
+                match = self.ARTICLE_PATTERN.match(line) if element.category != "table" else None
+                if match:
+                    if current:
+                        clauses.append(self._build_clause(current))
+                    num, sub, title, rest = match.groups()
+                    current = {
+                        "num": num,
+                        "sub": sub,
+                        "title": (title or "").strip(),
+                        "lines": [rest.strip()] if rest and rest.strip() else [],
+                    }
+                elif current is not None:
+                    current["lines"].append(line)
+        if current:
+            clauses.append(self._build_clause(current))
+        return clauses
+
+    def _split_by_headings(self, elements: List[LayoutElement]) -> List[Clause]:
+        clauses: List[Clause] = []
+        title: Optional[str] = None
+        lines: List[str] = []
+        for element in elements:
+            if element.category.startswith("heading"):
+                if title is not None and lines:
+                    clauses.append(self._build_heading_clause(len(clauses) + 1, title, lines))
+                title = " ".join(element.lines).strip()
+                lines = []
+            elif title is not None:
+                lines.extend(element.lines)
+        if title is not None and lines:
+            clauses.append(self._build_heading_clause(len(clauses) + 1, title, lines))
+        return clauses
+
+    @staticmethod
+    def _build_clause(current: dict) -> Clause:
+        num = current["num"]
+        sub = current["sub"]
+        article_num = f"제{num}조의{sub}" if sub else f"제{num}조"
+        clause_id = f"clause_{num}_{sub}" if sub else f"clause_{num}"
+        lines = current["lines"]
+        title = current["title"]
+        if not title and lines:
+            title = lines[0]
+            lines = lines[1:]
+        return Clause(
+            id=clause_id,
+            article_num=article_num,
+            title=title,
+            content="\n".join(lines).strip(),
+        )
+
+    @staticmethod
+    def _build_heading_clause(idx: int, title: str, lines: List[str]) -> Clause:
+        return Clause(
+            id=f"clause_{idx}",
+            article_num=f"조항{idx}",
+            title=title,
+            content="\n".join(lines).strip(),
+        )
@@ -0,0 +1,249 @@
+"""
+2단계 보조: 긴 계약서를 겹치는 청크로 나눠 병렬로 LLM 조항 분리
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from models import Clause
+from openai_client import chat_completion
+
+
+@dataclass
+class TextChunk:
+    """원문 [start, end) 구간"""
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+class LLMClauseSplitter:
+    """
+    - 조 표기 → 빈 줄 → 줄바꿈 → 문장 끝 순으로 안전한 경계를 찾아 청크를 자른다.
+    - 이웃 청크는 overlap 글자만큼 겹치고, 청크들은 동시에 분리한다.
+    - 파싱에 실패한 청크만 다시 요청한다.
+    - 경계에서 두 번 나온 조항은 조 번호나 내용 포함 관계로 하나만 남긴다.
+    """
+
+    ARTICLE_BOUNDARY = re.compile(r"\n[ \t]*제[ \t]*\d{1,4}[ \t]*조")
+    SENTENCE_END = re.compile(r"(?:다\.|\.|\?|!)[ \t]")
+    ARTICLE_NUM = re.compile(r"^제\s*(\d+)\s*조(?:\s*의\s*(\d+))?")
+    PROMPT = (
+        "Split the following Korean contract excerpt into clauses. "
+        "Return JSON only as a list of objects with keys: article_num, title, content. "
+        "article_num should be like '제1조' if present, otherwise use '조항N'. "
+        "The excerpt may start or end in the middle of a clause; include those partial clauses as well. "
+        "Copy the content verbatim and do not omit any content. Respond in Korean.\n\n"
+    )
+
+    def __init__(
+        self,
+        model: str | None = None,
+        chunk_chars: int | None = None,
+        overlap_chars: int | None = None,
+        max_workers: int | None = None,
+        max_retries: int | None = None,
+        priority: str = "interactive",
+    ) -> None:
+        self.model = model or os.getenv("CLAUSE_LLM_MODEL") or "gpt-4o"
+        self.priority = priority
+        self.chunk_chars = chunk_chars or int(os.getenv("CLAUSE_LLM_CHUNK_CHARS") or "6000")
+        self.overlap_chars = (
+            overlap_chars
+            if overlap_chars is not None
+            else int(os.getenv("CLAUSE_LLM_CHUNK_OVERLAP") or "400")
+        )
+        self.max_workers = max_workers or int(os.getenv("CLAUSE_LLM_WORKERS") or "4")
+        self.max_retries = (
+            max_retries if max_retries is not None else int(os.getenv("CLAUSE_LLM_RETRIES") or "1")
+        )
+
+    def split(self, text: str) -> List[Clause]:
+        """
+        모든 청크가 끝내 실패하면 빈 리스트를 반환한다.
+        일부 청크만 실패하면 해당 구간은 하나의 조항으로 남겨 내용이 빠지지 않게 한다.
+        """
+        chunks = self.chunk_text(text)
+        if not chunks:
+            return []
+        results: Dict[int, List[dict]] = {}
+        pending = chunks
+        for attempt in range(self.max_retries + 1):
+            results.update(self._split_chunks(pending))
+            pending = [chunk for chunk in chunks if chunk.index not in results]
+            if not pending:
+                break
+            print(f"CLAUSE LLM SPLIT RETRY >>> attempt={attempt + 1} chunks={[c.index for c in pending]}")
+        if not results:
+            return []
+        for chunk in pending:
+            results[chunk.index] = [self._raw_chunk_item(chunks, chunk)]
+        merged = self._merge([results[chunk.index] for chunk in chunks])
+        return [
+            Clause(
+                id=f"clause_{idx}",
+                article_num=item["article_num"] or f"조항{idx}",
+                title=item["title"] or "무제",
+                content=item["content"],
+            )
+            for idx, item in enumerate(merged, start=1)
+        ]
+
+    def chunk_text(self, text: str) -> List[TextChunk]:
+        text = text or ""
+        if not text.strip():
+            return []
+        chunks: List[TextChunk] = []
+        start = 0
+        length = len(text)
+        while start < length:
+            end = length if length - start <= self.chunk_chars else self._safe_boundary(text, start)
+            chunks.append(TextChunk(index=len(chunks), start=start, end=end, text=text[start:end]))
+            if end >= length:
+                break
+            next_start = self._overlap_start(text, end)
+            start = next_start if next_start > start else end
+        return chunks
+
+    def _safe_boundary(self, text: str, start: int) -> int:
+        limit = start + self.chunk_chars
+        floor = start + self.chunk_chars // 2
+        window = text[floor:limit]
+        for finder in (
+            lambda: self._last_match(self.ARTICLE_BOUNDARY, window, offset=1),
+            lambda: self._last_index(window, "\n\n", offset=2),
+            lambda: self._last_index(window, "\n", offset=1),
+            lambda: self._last_match(self.SENTENCE_END, window, offset=None),
+        ):
+            pos = finder()
+            if pos is not None and pos > 0:
+                return floor + pos
+        return limit
+
+    def _overlap_start(self, text: str, end: int) -> int:
+        # 겹침 구간도 줄 머리에서 시작하도록 맞춘다.
+        start = max(0, end - self.overlap_chars)
+        newline = text.find("\n", start, end)
+        return newline + 1 if newline >= 0 else start
+
+    @staticmethod
+    def _last_match(pattern: re.Pattern, window: str, offset: Optional[int]) -> Optional[int]:
+        last = None
+        for match in pattern.finditer(window):
+            last = match
+        if last is None:
+            return None
+        return last.start() + offset if offset is not None else last.end()
+
+    @staticmethod
+    def _last_index(window: str, token: str, offset: int) -> Optional[int]:
+        pos = window.rfind(token)
+        return pos + offset if pos >= 0 else None
+
+    def _split_chunks(self, chunks: List[TextChunk]) -> Dict[int, List[dict]]:
+        results: Dict[int, List[dict]] = {}
+        workers = max(1, min(self.max_workers, len(chunks)))
+        if workers <= 1:
+            for chunk in chunks:
+                items = self._split_chunk(chunk)
+                if items is not None:
+                    results[chunk.index] = items
+            return results
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            future_map = {executor.submit(self._split_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(future_map):
+                items = future.result()
+                if items is not None:
+                    results[future_map[future].index] = items
+        return results
+
+    def _split_chunk(self, chunk: TextChunk) -> Optional[List[dict]]:
+        try:
+            content = chat_completion(
+                prompt=f"{self.PROMPT}{chunk.text}", model=self.model, priority=self.priority
+            )
+        except Exception as exc:
+            print(f"CLAUSE LLM SPLIT ERROR >>> chunk={chunk.index}", repr(exc))
+            return None
+        return self._parse_items(content)
+
+    @staticmethod
+    def _parse_items(content: str) -> Optional[List[dict]]:
+        raw = (content or "").strip()
+        if raw.startswith("```"):
+            raw = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", raw)
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            return None
+        if isinstance(payload, dict):
+            payload = payload.get("clauses")
+        if not isinstance(payload, list):
+            return None
+        items: List[dict] = []
+        for item in payload:
+            if not isinstance(item, dict):
+                return None
+            body = str(item.get("content") or "").strip()
+            if not body:
+                continue
+            items.append(
+                {
+                    "article_num": str(item.get("article_num") or "").strip(),
+                    "title": str(item.get("title") or "").strip(),
+                    "content": body,
+                }
+            )
+        return items
+
+    def _raw_chunk_item(self, chunks: List[TextChunk], chunk: TextChunk) -> dict:
+        # 실패한 청크는 앞 청크와 겹치지 않는 부분만 하나의 조항으로 남긴다.
+        start = chunks[chunk.index - 1].end if chunk.index > 0 else chunk.start
+        offset = max(0, start - chunk.start)
+        return {"article_num": "", "title": "", "content": chunk.text[offset:].strip()}
+
+    def _merge(self, chunk_items: List[List[dict]]) -> List[dict]:
+        merged: List[dict] = []
+        previous_start = 0
+        for items in chunk_items:
+            # 겹침 구간의 중복은 직전 청크가 만든 조항과만 비교하면 된다.
+            previous = merged[previous_start:]
+            previous_start = len(merged)
+            for item in items:
+                duplicate = self._find_duplicate(previous, item)
+                if duplicate is None:
+                    merged.append(item)
+                    continue
+                if len(self._normalize(item["content"])) > len(self._normalize(duplicate["content"])):
+                    duplicate["content"] = item["content"]
+                if not duplicate["title"]:
+                    duplicate["title"] = item["title"]
+                if not duplicate["article_num"]:
+                    duplicate["article_num"] = item["article_num"]
+        return merged
+
+    def _find_duplicate(self, candidates: List[dict], item: dict) -> Optional[dict]:
+        article_key = self._article_key(item["article_num"])
+        content_key = self._normalize(item["content"])
+        for candidate in candidates:
+            if article_key and article_key == self._article_key(candidate["article_num"]):
+                return candidate
+            other = self._normalize(candidate["content"])
+            if content_key and other and (content_key in other or other in content_key):
+                return candidate
+        return None
+
+    def _article_key(self, article_num: str) -> Optional[str]:
+        match = self.ARTICLE_NUM.match(article_num or "")
+        if not match:
+            return None
+        return f"{match.group(1)}_{match.group(2)}" if match.group(2) else match.group(1)
+
+    @staticmethod
+    def _normalize(value: str) -> str:
+        return re.sub(r"\s+", "", value or "")
@@ -0,0 +1,446 @@
+"""
+프로세스 공용 OpenAI 요청 제한기 (모델별 RPM/TPM 버킷, 응답 헤더 기반 초기화, 429 시 AIMD, 우선순위 대기열)
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+from threading import Condition, Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 숫자가 작을수록 먼저 처리한다.
+PRIORITIES = {"interactive": 0, "debate": 1, "batch": 2}
+
+# 일시적 오류로 보고 백오프 후 재시도하는 OpenAI SDK 예외 (APITimeoutError는 APIConnectionError의 하위 클래스)
+_TRANSIENT_ERRORS = {"APIConnectionError", "APITimeoutError", "InternalServerError"}
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """연결 오류/타임아웃/408/409/5xx 여부 (openai를 import하지 않고 예외 이름과 상태 코드로 판단)"""
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int) and (status in (408, 409) or status >= 500):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERRORS for cls in type(exc).__mro__)
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """'1s', '6m0s', '20ms', '0.5' 형식의 x-ratelimit-reset-* 값을 초로 변환한다."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total = 0.0
+    number = ""
+    idx = 0
+    while idx < len(value):
+        char = value[idx]
+        if char.isdigit() or char == ".":
+            number += char
+            idx += 1
+            continue
+        unit = "ms" if value.startswith("ms", idx) else char
+        idx += len(unit)
+        if not number:
+            return None
+        total += float(number) * {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}.get(unit, 0.0)
+        number = ""
+    return total
+
+
+class RateBucket:
+    """
+    분당 한도(ceiling) 안에서 현재 허용 속도(rate)로 채워지는 토큰 버킷.
+    429가 나면 rate를 절반으로 줄이고, 성공할 때마다 ceiling의 일정 비율만큼 늘린다.
+    """
+
+    def __init__(self, ceiling: float, min_rate: float, increase_ratio: float, decrease_factor: float) -> None:
+        self.ceiling = ceiling
+        self.rate = ceiling
+        self.min_rate = min_rate
+        self.increase_ratio = increase_ratio
+        self.decrease_factor = decrease_factor
+        self.level = ceiling
+        self.updated = time.monotonic()
+        self.seeded = False
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.rate, self.level + (now - self.updated) * self.rate / 60.0)
+        self.updated = now
+
+    def delay_for(self, amount: float) -> float:
+        # 한 번에 rate보다 큰 요청은 버킷이 가득 찼을 때 보낸다.
+        need = min(amount, self.rate)
+        if self.level >= need:
+            return 0.0
+        return (need - self.level) * 60.0 / self.rate
+
+    def seed(self, limit: Optional[float], remaining: Optional[float]) -> None:
+        if limit and limit > 0:
+            # 첫 헤더를 받기 전에 429로 줄어든 속도는 유지한다.
+            if not self.seeded and self.rate >= self.ceiling:
+                self.rate = limit
+            self.ceiling = limit
+            self.rate = min(self.rate, limit)
+            self.seeded = True
+        if remaining is not None:
+            self.level = min(self.level, remaining)
+
+    def increase(self) -> None:
+        self.rate = min(self.ceiling, self.rate + self.ceiling * self.increase_ratio)
+
+    def decrease(self) -> None:
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.level = min(self.level, 0.0)
+
+
+class ModelLimits:
+    """모델 하나의 RPM/TPM 버킷, 대기열, 통계"""
+
+    def __init__(self, rpm: RateBucket, tpm: RateBucket) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self.waiters: List[Tuple[int, int]] = []
+        self.paused_until = 0.0
+        self.requests: Dict[str, int] = {}
+        self.wait_seconds: Dict[str, float] = {}
+        self.rate_limited = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rpm": {"rate": self.rpm.rate, "ceiling": self.rpm.ceiling, "seeded": self.rpm.seeded},
+            "tpm": {"rate": self.tpm.rate, "ceiling": self.tpm.ceiling, "seeded": self.tpm.seeded},
+            "requests": dict(self.requests),
+            "wait_seconds": dict(self.wait_seconds),
+            "rate_limited": self.rate_limited,
+            "queued": len(self.waiters),
+        }
+
+
+class AdaptiveRateLimiter:
+    """
+    - 모델별로 RPM/TPM 버킷을 두고, 응답의 x-ratelimit-* 헤더로 한도를 맞춘다.
+    - 대기 중인 요청은 (우선순위, 도착 순서) 순으로 하나씩 통과한다.
+      interactive(분석 요청)가 debate/batch보다 항상 먼저 나간다.
+    - 429가 나면 두 버킷의 속도를 곱셈으로 줄이고 retry-after 동안 해당 모델을 멈춘다.
+    - 켜져 있으면 SDK 재시도 대신 연결 오류/타임아웃/5xx도 지터 지수 백오프로 재시도한다.
+    """
+
+    def __init__(
+        self,
+        enabled: bool | None = None,
+        default_rpm: float | None = None,
+        default_tpm: float | None = None,
+        increase_ratio: float | None = None,
+        decrease_factor: float | None = None,
+        max_retries: int | None = None,
+    ) -> None:
+        self.enabled = (
+            enabled
+            if enabled is not None
+            else (os.getenv("LLM_RATE_LIMIT_ENABLED") or "1").lower() in ("1", "true", "yes", "y")
+        )
+        self.default_rpm = default_rpm or float(os.getenv("LLM_RATE_DEFAULT_RPM") or "500")
+        self.default_tpm = default_tpm or float(os.getenv("LLM_RATE_DEFAULT_TPM") or "30000")
+        self.increase_ratio = increase_ratio or float(os.getenv("LLM_RATE_INCREASE_RATIO") or "0.05")
+        self.decrease_factor = decrease_factor or float(os.getenv("LLM_RATE_DECREASE_FACTOR") or "0.5")
+        self.max_retries = (
+            max_retries if max_retries is not None else int(os.getenv("LLM_RATE_MAX_RETRIES") or "4")
+        )
+        self.transient_retries = int(os.getenv("LLM_TRANSIENT_MAX_RETRIES") or "2")
+        self.backoff = float(os.getenv("LLM_RETRY_BACKOFF_SEC") or "0.5")
+        self.backoff_max = float(os.getenv("LLM_RETRY_BACKOFF_MAX_SEC") or "8")
+        self._models: Dict[str, ModelLimits] = {}
+        self._cond = Condition()
+        self._seq = itertools.count()
+
+    def acquire(self, model: str, tokens: int, priority: str = "interactive") -> float:
+        """요청을 보내도 될 때까지 기다리고, 기다린 시간(초)을 반환한다."""
+        if not self.enabled:
+            return 0.0
+        start = time.monotonic()
+        with self._cond:
+            limits, ticket = self._enqueue(model, priority)
+            try:
+                while True:
+                    delay = self._try_take(limits, ticket, tokens)
+                    if delay == 0.0:
+                        break
+                    self._cond.wait(delay)
+            finally:
+                waited = self._dequeue(limits, ticket, priority, start)
+        return waited
+
+    async def acquire_async(self, model: str, tokens: int, priority: str = "interactive") -> float:
+        """acquire의 asyncio 버전. 이벤트 루프를 막지 않도록 잠금 밖에서 잠든다."""
+        if not self.enabled:
+            return 0.0
+        start = time.monotonic()
+        with self._cond:
+            limits, ticket = self._enqueue(model, priority)
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_take(limits, ticket, tokens)
+                if delay == 0.0:
+                    break
+                # 앞선 요청이 빠질 때를 알 수 없으므로 짧게 나눠서 다시 확인한다.
+                await asyncio.sleep(min(delay, 0.05) if delay is not None else 0.05)
+        finally:
+            with self._cond:
+                waited = self._dequeue(limits, ticket, priority, start)
+        return waited
+
+    def _enqueue(self, model: str, priority: str) -> Tuple[ModelLimits, Tuple[int, int]]:
+        limits = self._limits_for(model)
+        ticket = (PRIORITIES.get(priority, PRIORITIES["batch"]), next(self._seq))
+        heapq.heappush(limits.waiters, ticket)
+        return limits, ticket
+
+    def _try_take(self, limits: ModelLimits, ticket: Tuple[int, int], tokens: int) -> Optional[float]:
+        """
+        대기열 맨 앞이고 버킷에 여유가 있으면 차감하고 0.0을 반환한다.
+        맨 앞이 아니면 None, 버킷이 부족하면 기다릴 시간(초)을 반환한다.
+        """
+        if limits.waiters[0] != ticket:
+            return None
+        now = time.monotonic()
+        limits.rpm.refill(now)
+        limits.tpm.refill(now)
+        delay = max(
+            limits.paused_until - now,
+            limits.rpm.delay_for(1),
+            limits.tpm.delay_for(tokens),
+        )
+        if delay > 0:
+            return delay
+        limits.rpm.level -= 1
+        limits.tpm.level -= min(tokens, limits.tpm.rate)
+        return 0.0
+
+    def _dequeue(self, limits: ModelLimits, ticket: Tuple[int, int], priority: str, start: float) -> float:
+        limits.waiters.remove(ticket)
+        heapq.heapify(limits.waiters)
+        waited = time.monotonic() - start
+        limits.requests[priority] = limits.requests.get(priority, 0) + 1
+        limits.wait_seconds[priority] = limits.wait_seconds.get(priority, 0.0) + waited
+        self._cond.notify_all()
+        return waited
+
+    def record_usage(self, model: str, estimated: int, actual: Optional[int]) -> None:
+        """추정 토큰과 실제 사용량(usage.total_tokens)의 차이를 TPM 버킷에 반영한다."""
+        if not self.enabled or actual is None:
+            return
+        with self._cond:
+            self._limits_for(model).tpm.level -= actual - estimated
+
+    def on_success(self, model: str, headers: Any = None) -> None:
+        if not self.enabled:
+            return
+        with self._cond:
+            limits = self._limits_for(model)
+            if headers is not None:
+                self._seed(limits, headers)
+            limits.rpm.increase()
+            limits.tpm.increase()
+            self._cond.notify_all()
+
+    def on_rate_limited(self, model: str, headers: Any = None, attempt: int = 0) -> float:
+        """
+        AIMD 감소 후 해당 모델이 멈춰 있을 시간(초)을 반환한다.
+        꺼져 있으면 acquire가 기다리지 않으므로, 호출부가 직접 기다릴 시간(retry-after 또는 지수 백오프)을 반환한다.
+        """
+        if not self.enabled:
+            pause = self._retry_after(headers)
+            if pause is None:
+                pause = min(self.backoff_max, 2 ** attempt) * random.uniform(1.0, 2.0)
+            return pause
+        with self._cond:
+            limits = self._limits_for(model)
+            limits.rate_limited += 1
+            if headers is not None:
+                self._seed(limits, headers)
+            limits.rpm.decrease()
+            limits.tpm.decrease()
+            pause = self._retry_after(headers)
+            if pause is None:
+                pause = random.uniform(1.0, 2.0)
+            limits.paused_until = max(limits.paused_until, time.monotonic() + pause)
+            self._cond.notify_all()
+            return pause
+
+    def transient_delay(self, exc: BaseException, attempt: int) -> Optional[float]:
+        """일시적 오류면 다음 시도까지 기다릴 시간(초), 재시도하지 않으면 None"""
+        if not self.enabled or attempt >= self.transient_retries or not is_transient_error(exc):
+            return None
+        return min(self.backoff_max, self.backoff * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            return {model: limits.as_dict() for model, limits in self._models.items()}
+
+    def _limits_for(self, model: str) -> ModelLimits:
+        limits = self._models.get(model)
+        if limits is None:
+            limits = ModelLimits(
+                rpm=RateBucket(self.default_rpm, 1.0, self.increase_ratio, self.decrease_factor),
+                tpm=RateBucket(self.default_tpm, 1000.0, self.increase_ratio, self.decrease_factor),
+            )
+            self._models[model] = limits
+        return limits
+
+    @staticmethod
+    def _seed(limits: ModelLimits, headers: Any) -> None:
+        def _number(name: str) -> Optional[float]:
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        limits.rpm.seed(_number("x-ratelimit-limit-requests"), _number("x-ratelimit-remaining-requests"))
+        limits.tpm.seed(_number("x-ratelimit-limit-tokens"), _number("x-ratelimit-remaining-tokens"))
+
+    @staticmethod
+    def _retry_after(headers: Any) -> Optional[float]:
+        if headers is not None:
+            for name in ("retry-after-ms", "retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+                value = _parse_reset(headers.get(name))
+                if value is not None:
+                    return value / 1000.0 if name == "retry-after-ms" else value
+        return None
+
+
+def estimate_tokens(*texts: str) -> int:
+    # 한글은 대략 글자당 1토큰으로 보수적으로 계산한다.
+    return max(1, sum(len(text or "") for text in texts))
+
+
+def call_with_rate_limit(
+    resource: Any,
+    model: str,
+    tokens: int,
+    priority: str = "interactive",
+    limiter: Optional[AdaptiveRateLimiter] = None,
+    observer: Optional[Callable[[str, float, bool], None]] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    resource(client.chat.completions / client.embeddings)의 create를 제한기를 거쳐 호출한다.
+    with_raw_response가 있으면 응답 헤더로 한도를 갱신하고, 429는 AIMD 감소 후 다시 시도한다.
+    연결 오류/타임아웃/5xx는 속도를 줄이지 않고 백오프 후 다시 시도한다.
+    observer(model, latency, failed)는 대기 시간을 뺀 요청 시도마다 호출된다.
+    """
+    limiter = limiter or get_rate_limiter()
+    raw_api = getattr(resource, "with_raw_response", None)
+    attempt = 0
+    transient_attempt = 0
+    while True:
+        limiter.acquire(model, tokens, priority)
+        start = time.perf_counter()
+        try:
+            if raw_api is not None:
+                raw = raw_api.create(model=model, **kwargs)
+                headers = raw.headers
+                response = raw.parse()
+            else:
+                headers = None
+                response = resource.create(model=model, **kwargs)
+        except Exception as exc:
+            if observer is not None:
+                observer(model, time.perf_counter() - start, True)
+            if getattr(exc, "status_code", None) != 429:
+                delay = limiter.transient_delay(exc, transient_attempt)
+                if delay is None:
+                    raise
+                print(f"LLM TRANSIENT ERROR >>> model={model} retry in {delay:.1f}s: {exc}")
+                transient_attempt += 1
+                time.sleep(delay)
+                continue
+            if attempt >= limiter.max_retries:
+                raise
+            pause = limiter.on_rate_limited(
+                model, getattr(getattr(exc, "response", None), "headers", None), attempt
+            )
+            print(f"LLM RATE LIMITED >>> model={model} priority={priority} pause={pause:.1f}s")
+            attempt += 1
+            if not limiter.enabled:
+                time.sleep(pause)
+            continue
+        if observer is not None:
+            observer(model, time.perf_counter() - start, False)
+        limiter.on_success(model, headers)
+        usage = getattr(response, "usage", None)
+        limiter.record_usage(model, tokens, getattr(usage, "total_tokens", None))
+        return response
+
+
+async def call_with_rate_limit_async(
+    resource: Any,
+    model: str,
+    tokens: int,
+    priority: str = "interactive",
+    limiter: Optional[AdaptiveRateLimiter] = None,
+    observer: Optional[Callable[[str, float, bool], None]] = None,
+    **kwargs: Any,
+) -> Any:
+    """call_with_rate_limit의 asyncio 버전 (AsyncOpenAI 리소스용)"""
+    limiter = limiter or get_rate_limiter()
+    raw_api = getattr(resource, "with_raw_response", None)
+    attempt = 0
+    transient_attempt = 0
+    while True:
+        await limiter.acquire_async(model, tokens, priority)
+        start = time.perf_counter()
+        try:
+            if raw_api is not None:
+                raw = await raw_api.create(model=model, **kwargs)
+                headers = raw.headers
+                response = raw.parse()
+            else:
+                headers = None
+                response = await resource.create(model=model, **kwargs)
+        except Exception as exc:
+            if observer is not None:
+                observer(model, time.perf_counter() - start, True)
+            if getattr(exc, "status_code", None) != 429:
+                delay = limiter.transient_delay(exc, transient_attempt)
+                if delay is None:
+                    raise
+                print(f"LLM TRANSIENT ERROR >>> model={model} retry in {delay:.1f}s: {exc}")
+                transient_attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            if attempt >= limiter.max_retries:
+                raise
+            pause = limiter.on_rate_limited(
+                model, getattr(getattr(exc, "response", None), "headers", None), attempt
+            )
+            print(f"LLM RATE LIMITED >>> model={model} priority={priority} pause={pause:.1f}s")
+            attempt += 1
+            if not limiter.enabled:
+                await asyncio.sleep(pause)
+            continue
+        if observer is not None:
+            observer(model, time.perf_counter() - start, False)
+        limiter.on_success(model, headers)
+        usage = getattr(response, "usage", None)
+        limiter.record_usage(model, tokens, getattr(usage, "total_tokens", None))
+        return response
+
+
+_LIMITER: Optional[AdaptiveRateLimiter] = None
+_LIMITER_LOCK = Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    global _LIMITER
+    if _LIMITER is None:
+        with _LIMITER_LOCK:
+            if _LIMITER is None:
+                _LIMITER = AdaptiveRateLimiter()
+    return _LIMITER
@@ -1,52 +1,82 @@
 ﻿import os
 from typing import Optional
 
+from llm_rate_limiter import estimate_tokens
+from openai_client import call_openai, call_openai_async, get_async_openai_client, get_openai_client
 
 
+SUMMARY_PROMPT = (
+    "Summarize the contract clauses concisely, focusing on key obligations and risks. "
+    "Respond in Korean."
+)
+
+REPORT_PROMPT = (
+    "Create a comprehensive report with sections: overview, key clauses, risks, and recommendations. "
+    "Respond in Korean."
+)
+
 
 class LLMSummarizer:
-    def __init__(self, model: Optional[str] = None) -> None:
+    def __init__(self, model: Optional[str] = None, priority: str = "interactive") -> None:
         self.model = model or os.getenv("OPENAI_SUMMARY_MODEL") or "gpt-4o"
+        self.priority = priority
         self.api_key = os.getenv("OPENAI_API_KEY") or "api필요"
         self._client = self._build_client() if self.api_key != "api필요" else None
 
     def _build_client(self):
-        try:
-            from openai import OpenAI
-        except ImportError as exc:
-            raise RuntimeError(
-                "openai 패키지가 없습니다. `pip install openai`로 설치하세요."
-            ) from exc
-        return OpenAI(api_key=self.api_key)
+        return get_openai_client(self.api_key)
 
     def generate_summary(self, text: str) -> str:
         if self.api_key == "api필요":
             return "api필요"
-        prompt = (
-            "Summarize the contract clauses concisely, focusing on key obligations and risks. "
-            "Respond in Korean."
-        )
-        response = self._client.chat.completions.create(
+        return self._complete(SUMMARY_PROMPT, text)
+
+    def generate_comprehensive_report(self, text: str) -> str:
+        if self.api_key == "api필요":
+            return "api필요"
+        return self._complete(REPORT_PROMPT, text)
+
+    def _complete(self, prompt: str, text: str) -> str:
+        response = call_openai(
+            self._client.chat.completions,
             model=self.model,
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": text},
-            ],
+            tokens=estimate_tokens(prompt, text),
+            priority=self.priority,
+            messages=self._messages(prompt, text),
         )
         return response.choices[0].message.content or ""
 
-    def generate_comprehensive_report(self, text: str) -> str:
+    @staticmethod
+    def _messages(prompt: str, text: str) -> list:
+        return [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": text},
+        ]
+
+
+class AsyncLLMSummarizer(LLMSummarizer):
+    """LLMSummarizer의 asyncio 버전 (AsyncOpenAI 기반)"""
+
+    def _build_client(self):
+        # AsyncOpenAI 클라이언트는 호출 시점의 이벤트 루프에서 가져온다.
+        return None
+
+    async def generate_summary(self, text: str) -> str:
         if self.api_key == "api필요":
             return "api필요"
-        prompt = (
-            "Create a comprehensive report with sections: overview, key clauses, risks, and recommendations. "
-            "Respond in Korean."
-        )
-        response = self._client.chat.completions.create(
+        return await self._complete(SUMMARY_PROMPT, text)
+
+    async def generate_comprehensive_report(self, text: str) -> str:
+        if self.api_key == "api필요":
+            return "api필요"
+        return await self._complete(REPORT_PROMPT, text)
+
+    async def _complete(self, prompt: str, text: str) -> str:
+        response = await call_openai_async(
+            get_async_openai_client(self.api_key).chat.completions,
             model=self.model,
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": text},
-            ],
+            tokens=estimate_tokens(prompt, text),
+            priority=self.priority,
+            messages=self._messages(prompt, text),
         )
         return response.choices[0].message.content or ""
@@ -67,3 +67,6 @@ class ContractAnalysisResult:
     llm_summary: Optional[str] = None
     debate_transcript: Optional[List[dict]] = None
     contract_type: Optional[str] = None
+    ocr_path: Optional[str] = None      # text_layer | mixed | upstage
+    incremental: Optional[dict] = None  # 증분 재분석 통계 (유지/추가·수정/삭제 조항 수)
+    metrics: dict = field(default_factory=dict)  # 단계별 통계 (사전 필터/캐시 등)
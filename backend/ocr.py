@@ -1,6 +1,11 @@
-﻿import json
+﻿import asyncio
+import hashlib
+import io
+import json
 import os
-from typing import Any, Dict
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Awaitable, Callable, Dict, List
 
 try:
     import requests
@@ -9,9 +14,24 @@ except ImportError as exc:
         "필수 패키지가 없습니다: requests. `pip install requests`로 설치하세요."
     ) from exc
 
+try:
+    import httpx
+except ImportError:  # AsyncUpstageOCR에서만 사용
+    httpx = None
+
+from http_client import AsyncHttpClient, HttpClient, get_async_http_client, get_http_client
+from ocr_cache import OCRResultCache
+from text_layer import TextLayerExtractor
+
 
 class UpstageOCR:
-    def __init__(self, api_key: str | None = None, api_url: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_url: str | None = None,
+        cache: OCRResultCache | None = None,
+        http_client: HttpClient | None = None,
+    ) -> None:
         self.api_key = api_key or os.getenv("UPSTAGE_API_KEY") or "api필요"
         self.api_url = (
             api_url or os.getenv("UPSTAGE_OCR_URL") or "https://api.upstage.ai/v1/document-ai/ocr"
@@ -22,6 +42,15 @@ class UpstageOCR:
         )
         self.doc_parse_model = os.getenv("UPSTAGE_DOC_PARSE_MODEL") or "document-parse"
         self.doc_parse_mode = os.getenv("UPSTAGE_DOC_PARSE_MODE") or "auto"
+        cache_enabled = (os.getenv("OCR_CACHE_ENABLED") or "1").lower() in ("1", "true", "yes", "y")
+        self.cache = cache if cache is not None else (OCRResultCache() if cache_enabled else None)
+        self.page_parallel = (os.getenv("OCR_PAGE_PARALLEL") or "").lower() in ("1", "true", "yes", "y")
+        self.pages_per_chunk = int(os.getenv("OCR_PAGES_PER_CHUNK") or "2")
+        self.page_workers = int(os.getenv("OCR_PAGE_WORKERS") or "4")
+        self.page_retries = int(os.getenv("OCR_PAGE_RETRIES") or "2")
+        self.page_retry_backoff = float(os.getenv("OCR_PAGE_RETRY_BACKOFF_SEC") or "1")
+        self.text_layer = TextLayerExtractor()
+        self.http = http_client or get_http_client()
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -31,41 +60,248 @@ class UpstageOCR:
     def extract_text_from_file(self, file_path: str) -> str:
         if self.api_key == "api필요":
             return "api필요"
-        with open(file_path, "rb") as file_handle:
-            response = requests.post(
-                self.api_url,
-                files={"document": file_handle},
-                headers=self._headers(),
-                timeout=60,
-            )
-        response.raise_for_status()
-        return self._extract_text(self._json_from_response(response))
+        return self._cached(
+            file_path,
+            ("text", self.api_url),
+            lambda: self._request_text_from_file(file_path),
+        )
 
     def extract_html_from_file(self, file_path: str) -> str:
         if self.api_key == "api필요":
             return "api필요"
+        return self._cached(
+            file_path,
+            ("html", self.doc_parse_url, self.doc_parse_model, self.doc_parse_mode),
+            lambda: self._request_html_from_file(file_path),
+        )
+
+    def cache_stats(self) -> Dict[str, int]:
+        if self.cache is None:
+            return {}
+        return self.cache.stats()
+
+    def _cached(self, file_path: str, key_parts: tuple, fetch: Callable[[], str]) -> str:
+        if self.cache is None:
+            return fetch()
+        return self._cached_hash(self.cache.hash_file(file_path), key_parts, fetch)
+
+    def _cached_bytes(self, data: bytes, key_parts: tuple, fetch: Callable[[], str]) -> str:
+        if self.cache is None:
+            return fetch()
+        return self._cached_hash(hashlib.sha256(data).hexdigest(), key_parts, fetch)
+
+    def _cached_hash(self, content_hash: str, key_parts: tuple, fetch: Callable[[], str]) -> str:
+        key = self.cache.build_key(content_hash, *key_parts)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        value = fetch()
+        # 빈 결과는 일시적 실패일 수 있으므로 저장하지 않는다.
+        if value:
+            self.cache.set(key, value)
+        return value
+
+    def extract_document(self, source: str | List[str]) -> Dict[str, Any]:
+        """
+        OCR 진입점
+        - PDF에 쓸 만한 텍스트 레이어가 있으면 로컬에서 추출하고,
+          스캔/이미지 페이지만 Upstage로 보낸다.
+        - 파일 경로 목록: 촬영한 여러 페이지를 하나의 문서로 병렬 OCR
+        - PDF + OCR_PAGE_PARALLEL: 페이지 구간별 병렬 OCR
+        - 그 외: 파일 전체를 한 번에 OCR
+
+        Returns:
+            {"text": 추출 텍스트, "ocr_path": "text_layer" | "mixed" | "upstage",
+             "text_layer_pages": 로컬 추출 페이지 수, "ocr_pages": OCR 페이지 수}
+        """
+        if isinstance(source, (list, tuple)):
+            return self._upstage_result(self.extract_text_from_pages(list(source)), len(source))
+        pages = self.text_layer.extract_pages(source)
+        pending = self._pending_ocr_pages(pages)
+        if pending is not None:
+            ocr_texts = self._request_text_for_pdf_pages(source, pending) if pending else {}
+            return self._text_layer_result(pages, pending, ocr_texts)
+        return self._upstage_result(self.extract_document_text(source), len(pages) if pages else None)
+
+    def _pending_ocr_pages(self, pages: list) -> List[int] | None:
+        """텍스트 레이어 경로에서 OCR할 페이지 번호 목록. 텍스트 레이어를 쓸 수 없으면 None"""
+        if not pages or not any(page.usable for page in pages):
+            return None
+        # 짧기만 하고 이미지가 없는 페이지(서명란 등)는 텍스트 레이어를 그대로 쓴다.
+        pending = [
+            page.index
+            for page in pages
+            if not page.usable and (page.has_images or page.reason != "too_short")
+        ]
+        if pending and self.api_key == "api필요":
+            return None
+        return pending
+
+    @staticmethod
+    def _text_layer_result(pages: list, pending: List[int], ocr_texts: Dict[int, str]) -> Dict[str, Any]:
+        texts = [ocr_texts.get(page.index, page.text) for page in pages]
+        return {
+            "text": "\n\n".join([t.strip() for t in texts if t and t.strip()]),
+            "ocr_path": "mixed" if pending else "text_layer",
+            "text_layer_pages": len(pages) - len(pending),
+            "ocr_pages": len(pending),
+        }
+
+    @staticmethod
+    def _upstage_result(text: str, ocr_pages: int | None) -> Dict[str, Any]:
+        return {
+            "text": text,
+            "ocr_path": "upstage",
+            "text_layer_pages": 0,
+            "ocr_pages": ocr_pages,
+        }
+
+    def extract_document_text(self, source: str | List[str]) -> str:
+        if isinstance(source, (list, tuple)):
+            return self.extract_text_from_pages(list(source))
+        if self.page_parallel and source.lower().endswith(".pdf"):
+            return self.extract_text_from_pdf_pages(source)
+        return self.extract_text_from_file(source)
+
+    def extract_text_from_pages(self, file_paths: List[str]) -> str:
+        if self.api_key == "api필요":
+            return "api필요"
+        tasks = [
+            (lambda path=path: self.extract_text_from_file(path)) for path in file_paths
+        ]
+        return self._run_chunks(tasks)
+
+    def extract_text_from_pdf_pages(self, file_path: str) -> str:
+        if self.api_key == "api필요":
+            return "api필요"
+        return self._cached(
+            file_path,
+            ("text-pages", self.api_url, str(self.pages_per_chunk)),
+            lambda: self._request_text_from_pdf_pages(file_path),
+        )
+
+    def _request_text_from_pdf_pages(self, file_path: str) -> str:
+        chunks = self._split_pdf(file_path, self.pages_per_chunk)
+        if len(chunks) <= 1:
+            return self._request_text_from_file(file_path)
+        tasks = [
+            (lambda idx=idx, data=data: self._post_text_document((f"pages_{idx}.pdf", data)))
+            for idx, data in enumerate(chunks)
+        ]
+        return self._run_chunks(tasks)
+
+    def _run_chunks(self, tasks: List[Callable[[], str]]) -> str:
+        """청크별 OCR을 동시에 실행하고 원래 순서대로 이어 붙인다."""
+        results = self._run_tasks(tasks)
+        return "\n\n".join([text.strip() for text in results if text and text.strip()])
+
+    def _run_tasks(self, tasks: List[Callable[[], str]]) -> List[str]:
+        """실패한 청크만 개별적으로 재시도하며, 결과는 입력 순서를 유지한다."""
+        if not tasks:
+            return []
+        results: List[str] = [""] * len(tasks)
+        workers = max(1, min(self.page_workers, len(tasks)))
+        if workers <= 1:
+            for idx, task in enumerate(tasks):
+                results[idx] = self._run_with_retry(task)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                future_map = {
+                    executor.submit(self._run_with_retry, task): idx
+                    for idx, task in enumerate(tasks)
+                }
+                for future in as_completed(future_map):
+                    results[future_map[future]] = future.result()
+        return results
+
+    def _run_with_retry(self, task: Callable[[], str]) -> str:
+        attempt = 0
+        while True:
+            try:
+                return task()
+            except requests.RequestException:
+                if attempt >= self.page_retries:
+                    raise
+                time.sleep(self.page_retry_backoff * (2 ** attempt))
+                attempt += 1
+
+    def _request_text_for_pdf_pages(self, file_path: str, page_indexes: List[int]) -> Dict[int, str]:
+        page_bytes = self._split_pdf(file_path, 1, page_indexes)
+        tasks = [
+            (lambda idx=idx, data=data: self._cached_bytes(
+                data,
+                ("text", self.api_url),
+                lambda: self._post_text_document((f"page_{idx}.pdf", data)),
+            ))
+            for idx, data in zip(page_indexes, page_bytes)
+        ]
+        return dict(zip(page_indexes, self._run_tasks(tasks)))
+
+    @staticmethod
+    def _split_pdf(
+        file_path: str,
+        pages_per_chunk: int,
+        page_indexes: List[int] | None = None,
+    ) -> List[bytes]:
+        try:
+            from pypdf import PdfReader, PdfWriter
+        except ImportError as exc:
+            raise RuntimeError(
+                "pypdf 패키지가 없습니다. `pip install pypdf`로 설치하세요."
+            ) from exc
+        reader = PdfReader(file_path)
+        indexes = page_indexes if page_indexes is not None else list(range(len(reader.pages)))
+        step = max(1, pages_per_chunk)
+        chunks: List[bytes] = []
+        for start in range(0, len(indexes), step):
+            writer = PdfWriter()
+            for page_index in indexes[start : start + step]:
+                writer.add_page(reader.pages[page_index])
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            chunks.append(buffer.getvalue())
+        return chunks
+
+    def _request_text_from_file(self, file_path: str) -> str:
         with open(file_path, "rb") as file_handle:
-            response = requests.post(
+            return self._post_text_document(file_handle)
+
+    def _post_text_document(self, document: Any) -> str:
+        response = self.http.post(
+            self.api_url,
+            files={"document": document},
+            headers=self._headers(),
+            timeout=60,
+        )
+        response.raise_for_status()
+        return self._extract_text(self._json_from_response(response))
+
+    def _request_html_from_file(self, file_path: str) -> str:
+        with open(file_path, "rb") as file_handle:
+            response = self.http.post(
                 self.doc_parse_url,
                 files={"document": file_handle},
                 headers=self._headers(),
-                data={
-                    "ocr": "force",
-                    "output_formats": '["html"]',
-                    "coordinates": "true",
-                    "model": self.doc_parse_model,
-                    "mode": self.doc_parse_mode,
-                },
+                data=self._doc_parse_form(),
                 timeout=120,
             )
         response.raise_for_status()
         return self._extract_html(self._json_from_response(response))
 
+    def _doc_parse_form(self) -> Dict[str, str]:
+        return {
+            "ocr": "force",
+            "output_formats": '["html"]',
+            "coordinates": "true",
+            "model": self.doc_parse_model,
+            "mode": self.doc_parse_mode,
+        }
+
     def extract_text_from_url(self, url: str) -> str:
         if self.api_key == "api필요":
             return "api필요"
         payload = {"url": url}
-        response = requests.post(
+        response = self.http.post(
             self.api_url,
             json=payload,
             headers=self._headers(),
@@ -78,7 +314,7 @@ class UpstageOCR:
         if self.api_key == "api필요":
             return "api필요"
         payload = {"base64": base64_data}
-        response = requests.post(
+        response = self.http.post(
             self.api_url,
             json=payload,
             headers=self._headers(),
@@ -88,10 +324,14 @@ class UpstageOCR:
         return self._extract_text(self._json_from_response(response))
 
     @staticmethod
-    def _json_from_response(response: requests.Response) -> Dict[str, Any]:
+    def _json_from_response(response: Any) -> Dict[str, Any]:
         # Try to decode response bytes robustly; some OCR responses have encoding issues.
         content = response.content
-        for encoding in ("utf-8", "euc-kr", response.apparent_encoding):
+        # requests는 apparent_encoding, httpx는 encoding 속성을 제공한다.
+        fallback_encoding = getattr(response, "apparent_encoding", None) or getattr(
+            response, "encoding", None
+        )
+        for encoding in ("utf-8", "euc-kr", fallback_encoding):
             if not encoding:
                 continue
             try:
@@ -119,6 +359,219 @@ class UpstageOCR:
         return ""
 
 
+
+class AsyncUpstageOCR(UpstageOCR):
+    """
+    UpstageOCR의 asyncio 버전 (AsyncHttpClient 기반).
+    결과 캐시, 텍스트 레이어 판정, 페이지 구간 분할과 응답 파싱은 동기 버전과 공유하고,
+    Upstage 요청과 구간별 재시도만 이벤트 루프에서 실행한다. 모든 공개 메서드는 코루틴이다.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_url: str | None = None,
+        cache: OCRResultCache | None = None,
+        http_client: AsyncHttpClient | None = None,
+    ) -> None:
+        super().__init__(api_key=api_key, api_url=api_url, cache=cache)
+        self.http = http_client or get_async_http_client()
+
+    async def extract_document(self, source: str | List[str]) -> Dict[str, Any]:
+        if isinstance(source, (list, tuple)):
+            return self._upstage_result(await self.extract_text_from_pages(list(source)), len(source))
+        pages = await asyncio.to_thread(self.text_layer.extract_pages, source)
+        pending = self._pending_ocr_pages(pages)
+        if pending is not None:
+            ocr_texts = await self._request_text_for_pdf_pages(source, pending) if pending else {}
+            return self._text_layer_result(pages, pending, ocr_texts)
+        return self._upstage_result(
+            await self.extract_document_text(source), len(pages) if pages else None
+        )
+
+    async def extract_document_text(self, source: str | List[str]) -> str:
+        if isinstance(source, (list, tuple)):
+            return await self.extract_text_from_pages(list(source))
+        if self.page_parallel and source.lower().endswith(".pdf"):
+            return await self.extract_text_from_pdf_pages(source)
+        return await self.extract_text_from_file(source)
+
+    async def extract_text_from_file(self, file_path: str) -> str:
+        if self.api_key == "api필요":
+            return "api필요"
+        return await self._cached_async(
+            file_path,
+            ("text", self.api_url),
+            lambda: self._request_text_from_file(file_path),
+        )
+
+    async def extract_html_from_file(self, file_path: str) -> str:
+        if self.api_key == "api필요":
+            return "api필요"
+        return await self._cached_async(
+            file_path,
+            ("html", self.doc_parse_url, self.doc_parse_model, self.doc_parse_mode),
+            lambda: self._request_html_from_file(file_path),
+        )
+
+    async def extract_text_from_pages(self, file_paths: List[str]) -> str:
+        if self.api_key == "api필요":
+            return "api필요"
+        tasks = [
+            (lambda path=path: self.extract_text_from_file(path)) for path in file_paths
+        ]
+        return await self._run_chunks(tasks)
+
+    async def extract_text_from_pdf_pages(self, file_path: str) -> str:
+        if self.api_key == "api필요":
+            return "api필요"
+        return await self._cached_async(
+            file_path,
+            ("text-pages", self.api_url, str(self.pages_per_chunk)),
+            lambda: self._request_text_from_pdf_pages(file_path),
+        )
+
+    async def extract_text_from_url(self, url: str) -> str:
+        if self.api_key == "api필요":
+            return "api필요"
+        response = await self.http.post(
+            self.api_url,
+            json={"url": url},
+            headers=self._headers(),
+            timeout=60,
+        )
+        response.raise_for_status()
+        return self._extract_text(self._json_from_response(response))
+
+    async def extract_text_from_base64(self, base64_data: str) -> str:
+        if self.api_key == "api필요":
+            return "api필요"
+        response = await self.http.post(
+            self.api_url,
+            json={"base64": base64_data},
+            headers=self._headers(),
+            timeout=60,
+        )
+        response.raise_for_status()
+        return self._extract_text(self._json_from_response(response))
+
+    async def _cached_async(
+        self,
+        file_path: str,
+        key_parts: tuple,
+        fetch: Callable[[], Awaitable[str]],
+    ) -> str:
+        if self.cache is None:
+            return await fetch()
+        content_hash = await asyncio.to_thread(self.cache.hash_file, file_path)
+        return await self._cached_hash_async(content_hash, key_parts, fetch)
+
+    async def _cached_bytes_async(
+        self,
+        data: bytes,
+        key_parts: tuple,
+        fetch: Callable[[], Awaitable[str]],
+    ) -> str:
+        if self.cache is None:
+            return await fetch()
+        return await self._cached_hash_async(hashlib.sha256(data).hexdigest(), key_parts, fetch)
+
+    async def _cached_hash_async(
+        self,
+        content_hash: str,
+        key_parts: tuple,
+        fetch: Callable[[], Awaitable[str]],
+    ) -> str:
+        key = self.cache.build_key(content_hash, *key_parts)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        value = await fetch()
+        if value:
+            self.cache.set(key, value)
+        return value
+
+    async def _request_text_from_pdf_pages(self, file_path: str) -> str:
+        chunks = await asyncio.to_thread(self._split_pdf, file_path, self.pages_per_chunk)
+        if len(chunks) <= 1:
+            return await self._request_text_from_file(file_path)
+        tasks = [
+            (lambda idx=idx, data=data: self._post_text_document((f"pages_{idx}.pdf", data)))
+            for idx, data in enumerate(chunks)
+        ]
+        return await self._run_chunks(tasks)
+
+    async def _request_text_for_pdf_pages(
+        self, file_path: str, page_indexes: List[int]
+    ) -> Dict[int, str]:
+        page_bytes = await asyncio.to_thread(self._split_pdf, file_path, 1, page_indexes)
+        tasks = [
+            (lambda idx=idx, data=data: self._cached_bytes_async(
+                data,
+                ("text", self.api_url),
+                lambda: self._post_text_document((f"page_{idx}.pdf", data)),
+            ))
+            for idx, data in zip(page_indexes, page_bytes)
+        ]
+        return dict(zip(page_indexes, await self._run_tasks(tasks)))
+
+    async def _run_chunks(self, tasks: List[Callable[[], Awaitable[str]]]) -> str:
+        results = await self._run_tasks(tasks)
+        return "\n\n".join([text.strip() for text in results if text and text.strip()])
+
+    async def _run_tasks(self, tasks: List[Callable[[], Awaitable[str]]]) -> List[str]:
+        """OCR_PAGE_WORKERS개씩 동시에 실행하고, 실패한 구간만 재시도하며, 입력 순서를 유지한다."""
+        semaphore = asyncio.Semaphore(max(1, self.page_workers))
+
+        async def _run(task: Callable[[], Awaitable[str]]) -> str:
+            async with semaphore:
+                return await self._run_with_retry(task)
+
+        return list(await asyncio.gather(*[_run(task) for task in tasks]))
+
+    async def _run_with_retry(self, task: Callable[[], Awaitable[str]]) -> str:
+        attempt = 0
+        while True:
+            try:
+                return await task()
+            except Exception as exc:
+                if httpx is None or not isinstance(exc, httpx.HTTPError) or attempt >= self.page_retries:
+                    raise
+                await asyncio.sleep(self.page_retry_backoff * (2 ** attempt))
+                attempt += 1
+
+    async def _request_text_from_file(self, file_path: str) -> str:
+        data = await asyncio.to_thread(self._read_bytes, file_path)
+        return await self._post_text_document((os.path.basename(file_path), data))
+
+    async def _post_text_document(self, document: Any) -> str:
+        response = await self.http.post(
+            self.api_url,
+            files={"document": document},
+            headers=self._headers(),
+            timeout=60,
+        )
+        response.raise_for_status()
+        return self._extract_text(self._json_from_response(response))
+
+    async def _request_html_from_file(self, file_path: str) -> str:
+        data = await asyncio.to_thread(self._read_bytes, file_path)
+        response = await self.http.post(
+            self.doc_parse_url,
+            files={"document": (os.path.basename(file_path), data)},
+            headers=self._headers(),
+            data=self._doc_parse_form(),
+            timeout=120,
+        )
+        response.raise_for_status()
+        return self._extract_html(self._json_from_response(response))
+
+    @staticmethod
+    def _read_bytes(file_path: str) -> bytes:
+        with open(file_path, "rb") as file_handle:
+            return file_handle.read()
+
+
 def get_extracted_text(result: Any) -> str:
     """
     Normalize OCR results to plain text.
@@ -0,0 +1,124 @@
+"""
+OCR 결과 캐시 (문서 바이트 SHA-256 기반, 용량 제한 LRU)
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Dict, Optional
+
+
+class OCRResultCache:
+    """
+    동일한 문서 바이트 + OCR 설정(URL/model/mode)에 대한 결과를 SQLite 파일에 저장한다.
+    총 저장 용량이 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 제거한다.
+    """
+
+    def __init__(self, path: str | None = None, max_bytes: int | None = None) -> None:
+        self.path = path or os.getenv("OCR_CACHE_PATH") or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "cache", "ocr_cache.sqlite3"
+        )
+        self.max_bytes = (
+            max_bytes
+            if max_bytes is not None
+            else int(os.getenv("OCR_CACHE_MAX_BYTES") or str(256 * 1024 * 1024))
+        )
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+              cache_key TEXT PRIMARY KEY,
+              value TEXT NOT NULL,
+              size_bytes INTEGER NOT NULL,
+              last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ocr_cache_access ON ocr_cache (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file_handle:
+            for chunk in iter(lambda: file_handle.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def build_key(content_hash: str, *parts: str) -> str:
+        raw = "\x1f".join([content_hash, *[str(p or "") for p in parts]])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM ocr_cache WHERE cache_key=?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE ocr_cache SET last_access=? WHERE cache_key=?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        size_bytes = len(value.encode("utf-8"))
+        if self.max_bytes > 0 and size_bytes > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO ocr_cache (cache_key, value, size_bytes, last_access)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, value, size_bytes, time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        if self.max_bytes <= 0:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM ocr_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT cache_key, size_bytes FROM ocr_cache ORDER BY last_access ASC"
+        ).fetchall()
+        for cache_key, size_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM ocr_cache WHERE cache_key=?", (cache_key,))
+            total -= size_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM ocr_cache"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+        }
@@ -1,29 +1,243 @@
+"""
+공용 OpenAI 클라이언트 (keep-alive 커넥션 풀 공유, 풀/타임아웃 설정, 모델별 지연 히스토그램)
+"""
+
+import asyncio
 import os
+import weakref
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from llm_rate_limiter import (
+    call_with_rate_limit,
+    call_with_rate_limit_async,
+    estimate_tokens,
+    get_rate_limiter,
+)
+
+
+class LatencyHistogram:
+    """모델별 요청 지연(초) 히스토그램. 버킷 경계는 누적(le) 방식이다."""
+
+    def __init__(self, bounds: Optional[List[float]] = None) -> None:
+        raw = os.getenv("OPENAI_LATENCY_BUCKETS") or "0.25,0.5,1,2,4,8,16,32,64"
+        self.bounds = bounds or sorted(float(value) for value in raw.split(",") if value.strip())
+        self._lock = Lock()
+        self._models: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, model: str, latency: float, failed: bool) -> None:
+        with self._lock:
+            stats = self._models.get(model)
+            if stats is None:
+                stats = {
+                    "buckets": [0] * (len(self.bounds) + 1),
+                    "count": 0,
+                    "errors": 0,
+                    "sum": 0.0,
+                    "max": 0.0,
+                }
+                self._models[model] = stats
+            idx = next((i for i, bound in enumerate(self.bounds) if latency <= bound), len(self.bounds))
+            stats["buckets"][idx] += 1
+            stats["count"] += 1
+            stats["sum"] += latency
+            stats["max"] = max(stats["max"], latency)
+            if failed:
+                stats["errors"] += 1
 
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {model: self._summarize(stats) for model, stats in self._models.items()}
 
-def _get_client():
+    def _summarize(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        labels = [f"le_{bound:g}" for bound in self.bounds] + ["le_inf"]
+        return {
+            "count": stats["count"],
+            "errors": stats["errors"],
+            "avg": stats["sum"] / stats["count"] if stats["count"] else 0.0,
+            "max": stats["max"],
+            "p50": self._quantile(stats, 0.5),
+            "p95": self._quantile(stats, 0.95),
+            "buckets": dict(zip(labels, stats["buckets"])),
+        }
+
+    def _quantile(self, stats: Dict[str, Any], q: float) -> float:
+        # 해당 분위가 속한 버킷의 상한 (마지막 버킷은 관측 최대값)
+        target = q * stats["count"]
+        seen = 0
+        for idx, count in enumerate(stats["buckets"]):
+            seen += count
+            if count and seen >= target:
+                return self.bounds[idx] if idx < len(self.bounds) else stats["max"]
+        return 0.0
+
+
+_CLIENTS: Dict[str, Any] = {}
+# AsyncOpenAI의 커넥션 풀은 이벤트 루프에 묶이므로 루프별로 둔다.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+_CLIENT_LOCK = Lock()
+_LATENCY = LatencyHistogram()
+
+
+def _import_openai():
     try:
-        from openai import OpenAI
+        import openai
     except ImportError as exc:
         raise RuntimeError(
             "openai 패키지가 없습니다. `pip install openai`로 설치하세요."
         ) from exc
-    api_key = os.getenv("OPENAI_API_KEY")
+    return openai
+
+
+def _client_options(openai) -> Dict[str, Any]:
+    timeout = float(os.getenv("OPENAI_TIMEOUT_SEC") or "120")
+    connect_timeout = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SEC") or "10")
+    max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS") or "50")
+    max_keepalive = int(os.getenv("OPENAI_MAX_KEEPALIVE") or "20")
+    keepalive_expiry = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SEC") or "60")
+    # 제한기가 켜져 있으면 429(AIMD)와 연결 오류/타임아웃/5xx(백오프)를 모두 제한기가 재시도하므로 SDK 재시도는 끈다.
+    default_retries = "0" if get_rate_limiter().enabled else "2"
+    # SDK가 쓰는 httpx 구현의 Limits 타입을 그대로 사용한다.
+    limits_type = type(openai.DEFAULT_CONNECTION_LIMITS)
+    return {
+        "limits": limits_type(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        "timeout": openai.Timeout(timeout, connect=connect_timeout),
+        "max_retries": int(os.getenv("OPENAI_MAX_RETRIES") or default_retries),
+    }
+
+
+def _build_client(api_key: str):
+    openai = _import_openai()
+    options = _client_options(openai)
+    http_client = openai.DefaultHttpxClient(limits=options["limits"], timeout=options["timeout"])
+    return openai.OpenAI(api_key=api_key, http_client=http_client, max_retries=options["max_retries"])
+
+
+def _build_async_client(api_key: str):
+    openai = _import_openai()
+    options = _client_options(openai)
+    http_client = openai.DefaultAsyncHttpxClient(limits=options["limits"], timeout=options["timeout"])
+    return openai.AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=options["max_retries"])
+
+
+def get_openai_client(api_key: str | None = None):
+    """API 키별로 하나의 OpenAI 클라이언트(커넥션 풀)를 프로세스 전체에서 공유한다."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("환경 변수에 OPENAI_API_KEY가 설정되어 있지 않습니다.")
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        with _CLIENT_LOCK:
+            client = _CLIENTS.get(api_key)
+            if client is None:
+                client = _build_client(api_key)
+                _CLIENTS[api_key] = client
+    return client
+
+
+def get_async_openai_client(api_key: str | None = None):
+    """get_openai_client의 AsyncOpenAI 버전. 실행 중인 이벤트 루프마다 하나씩 공유한다."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("환경 변수에 OPENAI_API_KEY가 설정되어 있지 않습니다.")
-    return OpenAI(api_key=api_key)
+    loop = asyncio.get_running_loop()
+    with _CLIENT_LOCK:
+        clients = _ASYNC_CLIENTS.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None or client.is_closed():
+            client = _build_async_client(api_key)
+            clients[api_key] = client
+    return client
+
+
+def call_openai(
+    resource: Any,
+    model: str,
+    tokens: int,
+    priority: str = "interactive",
+    **kwargs: Any,
+) -> Any:
+    """요청 제한기를 거쳐 resource.create를 호출하고, 시도마다 모델별 지연을 기록한다."""
+    return call_with_rate_limit(
+        resource,
+        model=model,
+        tokens=tokens,
+        priority=priority,
+        observer=_LATENCY.record,
+        **kwargs,
+    )
+
+
+async def call_openai_async(
+    resource: Any,
+    model: str,
+    tokens: int,
+    priority: str = "interactive",
+    **kwargs: Any,
+) -> Any:
+    """call_openai의 asyncio 버전 (AsyncOpenAI 리소스용)"""
+    return await call_with_rate_limit_async(
+        resource,
+        model=model,
+        tokens=tokens,
+        priority=priority,
+        observer=_LATENCY.record,
+        **kwargs,
+    )
+
+
+def latency_stats() -> Dict[str, Dict[str, Any]]:
+    return _LATENCY.stats()
+
+
+def close_clients() -> None:
+    with _CLIENT_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+        _CLIENTS.clear()
 
 
 def chat_completion(
-    prompt: str, model: str = "gpt-4o", system_prompt: str | None = None
+    prompt: str,
+    model: str = "gpt-4o",
+    system_prompt: str | None = None,
+    priority: str = "interactive",
+) -> str:
+    client = get_openai_client()
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    response = call_openai(
+        client.chat.completions,
+        model=model,
+        tokens=estimate_tokens(prompt, system_prompt or ""),
+        priority=priority,
+        messages=messages,
+    )
+    return response.choices[0].message.content or ""
+
+
+async def chat_completion_async(
+    prompt: str,
+    model: str = "gpt-4o",
+    system_prompt: str | None = None,
+    priority: str = "interactive",
 ) -> str:
-    client = _get_client()
+    client = get_async_openai_client()
     messages = []
     if system_prompt:
         messages.append({"role": "system", "content": system_prompt})
     messages.append({"role": "user", "content": prompt})
-    response = client.chat.completions.create(
+    response = await call_openai_async(
+        client.chat.completions,
         model=model,
+        tokens=estimate_tokens(prompt, system_prompt or ""),
+        priority=priority,
         messages=messages,
     )
     return response.choices[0].message.content or ""
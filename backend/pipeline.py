@@ -2,26 +2,54 @@
 계약서 위험조항 분석 파이프라인 - 메인 파이프라인
 """
 
+import asyncio
 import os
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
-from dataclasses import asdict
+from dataclasses import asdict, dataclass, field
 
-from ocr import UpstageOCR, get_extracted_text
+from ocr import AsyncUpstageOCR, UpstageOCR, get_extracted_text
 from models import ContractAnalysisResult, Clause
+from clause_diff import ClauseDiff, PreviousAnalysis, carry_forward, diff_clauses, is_risky
 from text_processor import TextProcessor
-from risk_assessor import RiskAssessor
+from risk_assessor import AsyncRiskAssessor, RiskAssessor
 from precedent_fetcher import PrecedentFetcher
 from law_fetcher import LawFetcher
-from embedding_manager import EmbeddingManager
+from detail_hydration import DetailHydrationScope
+from embedding_manager import AsyncEmbeddingManager, EmbeddingManager
 from risk_mapper import RiskMapper
-from llm_summarizer import LLMSummarizer
-from debate_agents import DebateAgents
+from llm_summarizer import AsyncLLMSummarizer, LLMSummarizer
+from debate_agents import AsyncDebateAgents, DebateAgents
+from pipeline_steps import PipelineSteps
+from http_client import get_async_http_client
 
 
 # ==================== 메인 파이프라인 ====================
 
+# 증분 분석에서 변경 조항 토론 앞에 붙이는 구분 문구
+_DEBATE_SEGMENT_PREFIX = "변경된 조항 토론: "
+
+
+@dataclass
+class _AnalysisState:
+    """한 번의 분석에서 단계 사이에 넘기는 중간 결과"""
+    filename: str
+    raw_text: str
+    ocr_path: Optional[str]
+    layout: dict
+    clauses: List[Clause]
+    targets: List[Clause]                      # 3단계 이후를 수행할 조항 (증분 분석이면 변경분만)
+    previous: Optional[PreviousAnalysis] = None
+    diff: Optional[ClauseDiff] = None
+    carried_risky: List[Clause] = field(default_factory=list)
+    new_risky: List[Clause] = field(default_factory=list)
+    risky_clauses: List[Clause] = field(default_factory=list)
+    risk_stats: dict = field(default_factory=dict)
+    reference_stats: dict = field(default_factory=dict)
+
+
 class ContractAnalysisPipeline:
     """계약서 분석 전체 파이프라인"""
     
@@ -35,8 +63,31 @@ class ContractAnalysisPipeline:
         self.risk_mapper = RiskMapper()
         self.llm_summarizer = LLMSummarizer()
         self.debate_agents = DebateAgents()
+        # analyze_async용 비동기 구성 요소 (OCR 캐시, 판정 캐시/사전 필터는 동기 버전과 공유)
+        self.async_ocr = AsyncUpstageOCR(cache=self.ocr.cache)
+        self.async_risk_assessor = AsyncRiskAssessor(
+            cache=self.risk_assessor.cache, prefilter=self.risk_assessor.prefilter
+        )
+        self.async_embedding_manager = AsyncEmbeddingManager()
+        self.async_llm_summarizer = AsyncLLMSummarizer()
+        self.async_debate_agents = AsyncDebateAgents()
+        self.steps = PipelineSteps(
+            self.ocr,
+            self.text_processor,
+            self.risk_assessor,
+            self.precedent_fetcher,
+            self.law_fetcher,
+            self.embedding_manager,
+            self.risk_mapper,
+            self.llm_summarizer,
+            self.debate_agents,
+        )
     
-    def analyze(self, file_path: str) -> ContractAnalysisResult:
+    def analyze(
+        self,
+        file_path: str | List[str],
+        previous: Optional[PreviousAnalysis] = None,
+    ) -> ContractAnalysisResult:
         """
         계약서 분석 전체 파이프라인 실행
         
@@ -51,40 +102,407 @@ class ContractAnalysisPipeline:
         8. LLM 조항 요약
         
         Args:
-            file_path: 계약서 파일 경로 (PDF 또는 이미지)
+            file_path: 계약서 파일 경로 (PDF 또는 이미지), 또는 여러 장의 페이지 이미지 경로 목록
+            previous: 이전 분석 결과. 주어지면 내용이 바뀌지 않은 조항은 결과를 복사하고
+                추가/수정된 조항만 3~8단계를 다시 수행한다.
             
         Returns:
             분석 결과
         """
-        filename = os.path.basename(file_path)
+        state = self._extract_clauses(file_path, previous)
+        
+        # 3단계: 위험 조항 필터링
+        print("[3/8] 위험 조항 필터링...")
+        step_start = time.perf_counter()
+        cache_before = self.risk_assessor.cache_stats()
+        state.new_risky = self.risk_assessor.filter_risky_clauses(
+            state.targets, stats=state.risk_stats
+        )
+        self._finish_risk_step(state, cache_before, step_start)
         
-        # 1단계: OCR
-        print(f"[1/8] OCR 진행 중.. ({filename})")
+        # 4단계: 판례 데이터 수집
+        print("[4/8] 공공 판례 API 호출...")
         step_start = time.perf_counter()
-        ocr_result = self.ocr.extract_text_from_file(file_path)
-        raw_text = get_extracted_text(ocr_result)
+        if os.getenv("REFERENCE_FETCH_ASYNC", "").lower() in ("1", "true", "yes", "y"):
+            all_precedents, all_laws = self._run_coroutine(
+                self.steps.collect_references_async(state.new_risky, stats=state.reference_stats)
+            )
+        else:
+            all_precedents, all_laws = self._collect_references(
+                state.new_risky, stats=state.reference_stats
+            )
+        print(f"     precedents {len(all_precedents)}, laws {len(all_laws)} collected")
+        self._print_reference_stats(state)
+        print(f"     판례/법령 수집 완료 ({time.perf_counter() - step_start:.2f}s)")
+        
+        # 5단계: 임베딩 생성 및 유사도 검색
+        print("[5/8] 임베딩 생성 및 유사도 검색..")
+        step_start = time.perf_counter()
+        self.embedding_manager.attach_embeddings(all_laws, self._format_law_text)
+        for clause in state.new_risky:
+            clause_text = self._clause_similarity_text(clause)
+            similar_precedents = self.embedding_manager.find_similar_precedents(
+                clause_text, all_precedents
+            )
+            clause.related_precedents = similar_precedents
+            similar_laws = self.embedding_manager.find_similar_laws(
+                clause_text, all_laws
+            )
+            clause.related_laws = similar_laws
+        print("     유사도 검색 완료")
+        print(f"     임베딩/유사도 완료 ({time.perf_counter() - step_start:.2f}s)")
+        
+        # 6단계: 위험 유형 매핑
+        self._map_risk_types(state, all_precedents)
+        
+        # 7단계: 갑/을 토론 생성
+        print("[7/8] 갑/을 토론 생성...")
+        step_start = time.perf_counter()
+        contract_type = self.debate_agents.detect_contract_type(state.raw_text)
+        reuse_debate = self._can_reuse_debate(state)
+        if reuse_debate:
+            debate_transcript = self._previous_debate(state)
+        else:
+            debate_transcript = self.debate_agents.run(
+                self._debate_targets(state),
+                raw_text=state.raw_text,
+                contract_type=contract_type,
+            )
+        debate_transcript = self._finish_debate(state, debate_transcript, reuse_debate)
+        print(f"     토론 생성 완료 ({time.perf_counter() - step_start:.2f}s)")
+
+        # 8단계: LLM 요약 생성
+        print("[8/8] LLM 조항 요약 생성...")
+        step_start = time.perf_counter()
+        if self._can_reuse_previous(state) and state.previous.llm_summary:
+            llm_summary = state.previous.llm_summary
+        else:
+            llm_summary = self.llm_summarizer.generate_comprehensive_report(
+                self._format_clause_text(state.risky_clauses)
+            )
+        print(f"     요약 생성 완료 ({time.perf_counter() - step_start:.2f}s)")
+        
+        return self._build_result(
+            state, all_precedents, all_laws, debate_transcript, contract_type, llm_summary
+        )
+
+    async def analyze_async(
+        self,
+        file_path: str | List[str],
+        previous: Optional[PreviousAnalysis] = None,
+    ) -> ContractAnalysisResult:
+        """
+        analyze의 asyncio 버전.
+        OCR/조항 분리는 스레드에서 실행하고, 3~8단계의 LLM/판례 호출은 이벤트 루프에서 동시에 보낸다.
+        7단계(토론)와 8단계(요약)는 서로 독립적이므로 함께 실행한다.
+        """
+        ocr_result = await self._run_ocr_async(file_path)
+        state = await asyncio.to_thread(self._extract_clauses, file_path, previous, ocr_result)
+
+        print("[3/8] 위험 조항 필터링...")
+        step_start = time.perf_counter()
+        cache_before = self.async_risk_assessor.cache_stats()
+        state.new_risky = await self.async_risk_assessor.filter_risky_clauses(
+            state.targets, stats=state.risk_stats
+        )
+        self._finish_risk_step(state, cache_before, step_start, self.async_risk_assessor)
+
+        print("[4/8] 공공 판례 API 호출...")
+        step_start = time.perf_counter()
+        all_precedents, all_laws = await self.steps.collect_references_async(
+            state.new_risky, stats=state.reference_stats
+        )
+        print(f"     precedents {len(all_precedents)}, laws {len(all_laws)} collected")
+        self._print_reference_stats(state)
+        print(f"     판례/법령 수집 완료 ({time.perf_counter() - step_start:.2f}s)")
+
+        print("[5/8] 임베딩 생성 및 유사도 검색..")
+        step_start = time.perf_counter()
+        embeddings = self.async_embedding_manager
+        await embeddings.attach_embeddings(all_laws, self._format_law_text)
+
+        async def _attach_related(clause: Clause) -> None:
+            clause_text = self._clause_similarity_text(clause)
+            clause.related_precedents, clause.related_laws = await asyncio.gather(
+                embeddings.find_similar_precedents(clause_text, all_precedents),
+                embeddings.find_similar_laws(clause_text, all_laws),
+            )
+
+        await asyncio.gather(*[_attach_related(clause) for clause in state.new_risky])
+        print(f"     임베딩/유사도 완료 ({time.perf_counter() - step_start:.2f}s)")
+
+        self._map_risk_types(state, all_precedents)
+
+        print("[7-8/8] 갑/을 토론 및 LLM 요약 생성...")
+        step_start = time.perf_counter()
+        contract_type = self.async_debate_agents.detect_contract_type(state.raw_text)
+
+        reuse_debate = self._can_reuse_debate(state)
+
+        async def _debate() -> List[dict]:
+            if reuse_debate:
+                return self._previous_debate(state)
+            return await self.async_debate_agents.run(
+                self._debate_targets(state),
+                raw_text=state.raw_text,
+                contract_type=contract_type,
+            )
+
+        async def _summary() -> str:
+            if self._can_reuse_previous(state) and state.previous.llm_summary:
+                return state.previous.llm_summary
+            return await self.async_llm_summarizer.generate_comprehensive_report(
+                self._format_clause_text(state.risky_clauses)
+            )
+
+        debate_transcript, llm_summary = await asyncio.gather(_debate(), _summary())
+        debate_transcript = self._finish_debate(state, debate_transcript, reuse_debate)
+        print(f"     토론/요약 생성 완료 ({time.perf_counter() - step_start:.2f}s)")
+
+        return self._build_result(
+            state, all_precedents, all_laws, debate_transcript, contract_type, llm_summary
+        )
+
+    @staticmethod
+    def _filename(file_path: str | List[str]) -> str:
+        first_path = file_path[0] if isinstance(file_path, (list, tuple)) else file_path
+        return os.path.basename(first_path)
+
+    def _run_ocr(self, file_path: str | List[str]) -> dict:
+        """1단계: OCR"""
+        print(f"[1/8] OCR 진행 중.. ({self._filename(file_path)})")
+        step_start = time.perf_counter()
+        ocr_result = self.ocr.extract_document(file_path)
+        print(f"     OCR 경로: {ocr_result.get('ocr_path')}")
         print(f"     OCR 완료 ({time.perf_counter() - step_start:.2f}s)")
+        return ocr_result
+
+    async def _run_ocr_async(self, file_path: str | List[str]) -> dict:
+        print(f"[1/8] OCR 진행 중.. ({self._filename(file_path)})")
+        step_start = time.perf_counter()
+        ocr_result = await self.async_ocr.extract_document(file_path)
+        print(f"     OCR 경로: {ocr_result.get('ocr_path')}")
+        print(f"     OCR 완료 ({time.perf_counter() - step_start:.2f}s)")
+        return ocr_result
+
+    def _extract_clauses(
+        self,
+        file_path: str | List[str],
+        previous: Optional[PreviousAnalysis],
+        ocr_result: Optional[dict] = None,
+    ) -> "_AnalysisState":
+        """1~2단계: OCR(ocr_result가 없을 때), 텍스트 정제/조항 분리, (이전 분석이 있으면) 조항 비교"""
+        filename = self._filename(file_path)
+        if ocr_result is None:
+            ocr_result = self._run_ocr(file_path)
+        raw_text = get_extracted_text(ocr_result)
+        ocr_path = ocr_result.get("ocr_path")
         
         # 2단계: 텍스트 정제 및 조항 분리
         print("[2/8] 텍스트 정제 및 조항 분리...")
         step_start = time.perf_counter()
         clean_text = self.text_processor.clean_text(raw_text)
-        clauses = self.text_processor.split_clauses_with_fallback(clean_text)
+        layout = {"html": None}
+
+        def load_layout_html():
+            layout["html"] = self._load_layout_html(file_path)
+            return layout["html"]
+
+        clauses = self.text_processor.split_clauses_with_fallback(
+            clean_text, html_loader=load_layout_html
+        )
         print(f"     총 {len(clauses)}개 조항 추출")
         print(f"     텍스트 정제/분리 완료 ({time.perf_counter() - step_start:.2f}s)")
         
-        # 3단계: 위험 조항 필터링
-        print("[3/8] 위험 조항 필터링...")
-        step_start = time.perf_counter()
-        risky_clauses = self.risk_assessor.filter_risky_clauses(clauses)
-        print(f"     위험 조항 {len(risky_clauses)}개 발견")
+        state = _AnalysisState(
+            filename=filename,
+            raw_text=raw_text,
+            ocr_path=ocr_path,
+            layout=layout,
+            clauses=clauses,
+            targets=clauses,
+            previous=previous,
+        )
+        if previous is not None:
+            diff = diff_clauses(previous.clauses, clauses)
+            for clause, previous_clause in diff.unchanged:
+                carry_forward(clause, previous_clause)
+                if is_risky(clause):
+                    state.carried_risky.append(clause)
+            state.diff = diff
+            state.targets = diff.changed
+            print(
+                f"     증분 분석: 유지 {len(diff.unchanged)}개, "
+                f"추가/수정 {len(diff.changed)}개, 삭제 {len(diff.removed)}개"
+            )
+        return state
+
+    def _finish_risk_step(
+        self,
+        state: "_AnalysisState",
+        cache_before: dict,
+        step_start: float,
+        risk_assessor: Optional[RiskAssessor] = None,
+    ) -> None:
+        risk_assessor = risk_assessor or self.risk_assessor
+        risk_stats = state.risk_stats
+        cache_after = risk_assessor.cache_stats()
+        if cache_after:
+            hits = cache_after["hits"] - cache_before["hits"]
+            lookups = hits + cache_after["misses"] - cache_before["misses"]
+            risk_stats["cache"] = {"hits": hits, "lookups": lookups}
+            print(f"     판정 캐시 적중 {hits}/{lookups}")
+        if "prefilter" in risk_stats:
+            print(f"     사전 필터로 LLM 호출 {risk_stats['prefilter']['llm_calls_saved']}회 절약")
+        if "cascade" in risk_stats:
+            cascade = risk_stats["cascade"]
+            tiers = ", ".join(
+                f"{tier} {info['calls']}회 평균 {info['avg_latency']:.2f}s"
+                for tier, info in cascade["tiers"].items()
+            )
+            print(
+                f"     캐스케이드 상향 {cascade['escalated']}/{cascade['scored']} "
+                f"({cascade['escalation_rate']:.0%}) - {tiers}"
+            )
+        if state.diff is None:
+            state.risky_clauses = state.new_risky
+        else:
+            # 조항 ID는 중복될 수 있으므로 객체 기준으로 원래 순서를 유지한다.
+            risky = {id(clause) for clause in state.new_risky + state.carried_risky}
+            state.risky_clauses = [clause for clause in state.clauses if id(clause) in risky]
+        print(f"     위험 조항 {len(state.risky_clauses)}개 발견")
         print(f"     위험 조항 필터링 완료 ({time.perf_counter() - step_start:.2f}s)")
-        
-        # 4단계: 판례 데이터 수집
-        print("[4/8] 공공 판례 API 호출...")
+
+    def _map_risk_types(self, state: "_AnalysisState", all_precedents: list) -> None:
+        print("[6/8] 위험 유형 매핑...")
         step_start = time.perf_counter()
+        for clause in state.new_risky:
+            self.risk_mapper.map_risk_category(clause, all_precedents)
+        print("     위험 유형 분류 완료")
+        print(f"     위험 유형 매핑 완료 ({time.perf_counter() - step_start:.2f}s)")
+
+    def _clause_similarity_text(self, clause: Clause) -> str:
+        return self._format_clause_text([clause]) or (
+            f"{clause.title or clause.article_num}\n{clause.content}"
+        )
+
+    def _can_reuse_previous(self, state: "_AnalysisState") -> bool:
+        """위험 조항 구성이 이전 분석과 같으면 요약을 재사용한다."""
+        return state.diff is not None and not self._risky_set_changed(state.diff, state.new_risky)
+
+    @staticmethod
+    def _has_previous_debate(state: "_AnalysisState") -> bool:
+        # analysis_history에서 불러온 이전 분석에는 토론이 없으므로(None) 새로 생성해야 한다.
+        return state.diff is not None and bool(state.previous.debate_transcript)
+
+    def _can_reuse_debate(self, state: "_AnalysisState") -> bool:
+        """새로 위험 판정된 조항이 없으면(위험 조항 삭제만 있어도) 토론을 새로 만들지 않는다."""
+        return self._has_previous_debate(state) and not state.new_risky
+
+    def _debate_targets(self, state: "_AnalysisState") -> List[Clause]:
+        return state.new_risky if self._has_previous_debate(state) else state.risky_clauses
+
+    @staticmethod
+    def _previous_debate(state: "_AnalysisState") -> List[dict]:
+        """
+        이전 토론에서 삭제/수정된 위험 조항만 다룬 증분 구간을 빼고 제외 사실을 남긴다.
+        (최초 토론은 조항별로 나눌 수 없으므로 그대로 둔다)
+        """
+        transcript = [dict(turn) for turn in state.previous.debate_transcript or []]
+        removed = [clause.article_num for clause in state.diff.removed if is_risky(clause)]
+        if not removed:
+            return transcript
+        removed_nums = set(removed)
+        kept: List[dict] = []
+        skipping = False
+        for turn in transcript:
+            content = turn.get("content") or ""
+            if turn.get("speaker") == "system" and content.startswith(_DEBATE_SEGMENT_PREFIX):
+                nums = {num.strip() for num in content[len(_DEBATE_SEGMENT_PREFIX):].split(",")}
+                skipping = nums <= removed_nums
+            if not skipping:
+                kept.append(turn)
+        kept.append({"speaker": "system", "content": f"삭제/수정되어 토론에서 제외된 조항: {', '.join(removed)}"})
+        return kept
+
+    def _finish_debate(
+        self, state: "_AnalysisState", debate_transcript: List[dict], reused: bool = False
+    ) -> List[dict]:
+        if not reused and self._has_previous_debate(state):
+            # 유지된 조항의 이전 토론 뒤에 변경 조항 토론을 덧붙인다.
+            changed = ", ".join(clause.article_num for clause in state.new_risky) or "-"
+            debate_transcript = (
+                self._previous_debate(state)
+                + [{"speaker": "system", "content": f"{_DEBATE_SEGMENT_PREFIX}{changed}"}]
+                + debate_transcript
+            )
+        # Align legacy labels with the new judge role name.
+        for turn in debate_transcript:
+            if turn.get("speaker") in ("mediator", "중재자"):
+                turn["speaker"] = "판사"
+        return debate_transcript
+
+    def _build_result(
+        self,
+        state: "_AnalysisState",
+        all_precedents: list,
+        all_laws: list,
+        debate_transcript: List[dict],
+        contract_type: str,
+        llm_summary: str,
+    ) -> ContractAnalysisResult:
+        if state.diff is not None:
+            all_precedents = self._merge_carried(
+                all_precedents, state.carried_risky, "related_precedents", lambda p: p.case_id
+            )
+            all_laws = self._merge_carried(
+                all_laws, state.carried_risky, "related_laws", lambda l: (l.doc_type, l.doc_id)
+            )
+
+        # 결과 반환
+        result = ContractAnalysisResult(
+            filename=state.filename,
+            raw_text=state.raw_text,
+            raw_html=state.layout["html"],
+            clauses=state.clauses,
+            risky_clauses=state.risky_clauses,
+            precedents=all_precedents,
+            laws=all_laws,
+            llm_summary=llm_summary,
+            debate_transcript=debate_transcript,
+            contract_type=contract_type,
+            ocr_path=state.ocr_path,
+            incremental=(
+                state.diff.stats(state.previous.analysis_id) if state.diff is not None else None
+            ),
+            metrics={"risk": state.risk_stats, "references": state.reference_stats},
+        )
+        
+        print("\n분석 완료!")
+        return result
+
+    @staticmethod
+    def _print_reference_stats(state: "_AnalysisState") -> None:
+        queries = state.reference_stats.get("queries")
+        if queries and queries["coalesced"]:
+            print(f"     검색 {queries['queries']}건 중 {queries['coalesced']}건 병합")
+        ranking = state.reference_stats.get("ranking")
+        if ranking and ranking["searches"]:
+            print(
+                f"     순위 후 상세 조회: 요청 {ranking['ranked_requests']}건/문서 {ranking['ranked_documents']}건 "
+                f"(검색 순서 기준 {ranking['baseline_requests']}건/{ranking['baseline_documents']}건)"
+            )
+        details = state.reference_stats.get("details")
+        if details and details["requested"]:
+            print(
+                f"     상세 조회 {details['fetched']}건 (중복 {details['shared']}건 공유, 실패 {details['failed']}건)"
+            )
+
+    def _collect_references(self, risky_clauses: List[Clause], stats: Optional[dict] = None):
         all_precedents = []
         all_laws = []
+        # 같은 판례/법령의 상세 조회는 분석 전체에서 한 번만 한다.
+        hydration = DetailHydrationScope()
         min_precedent_results = int(os.getenv("PRECEDENT_MIN_RESULTS") or "3")
         min_law_results = int(os.getenv("LAW_MIN_RESULTS") or "3")
         domain_keywords = [
@@ -101,11 +519,12 @@ class ContractAnalysisPipeline:
             if category and category != "기타":
                 keywords.extend(self.risk_mapper.get_keywords_for_category(category))
             query = " ".join([kw for kw in keywords if kw])
-            precedents = self.precedent_fetcher.fetch_precedents(query)
+            options = {"hydration": hydration, "rank_text": self._clause_similarity_text(clause)}
+            precedents = self.precedent_fetcher.fetch_precedents(query, **options)
             if isinstance(precedents, str):
                 precedents = []
             if len(precedents) < min_precedent_results and clause.title:
-                fallback = self.precedent_fetcher.fetch_precedents(clause.title)
+                fallback = self.precedent_fetcher.fetch_precedents(clause.title, **options)
                 if isinstance(fallback, str):
                     fallback = []
                 # merge by case_id to avoid duplicates
@@ -115,11 +534,11 @@ class ContractAnalysisPipeline:
                         precedents.append(p)
                         seen.add(p.case_id)
             all_precedents.extend(precedents)
-            laws = self.law_fetcher.fetch_laws(query)
+            laws = self.law_fetcher.fetch_laws(query, **options)
             if isinstance(laws, str):
                 laws = []
             if len(laws) < min_law_results and clause.title:
-                fallback = self.law_fetcher.fetch_laws(clause.title)
+                fallback = self.law_fetcher.fetch_laws(clause.title, **options)
                 if isinstance(fallback, str):
                     fallback = []
                 seen = {(l.doc_type, l.doc_id) for l in laws}
@@ -130,76 +549,64 @@ class ContractAnalysisPipeline:
                         seen.add(key)
             all_laws.extend(laws)
         all_laws = self.law_fetcher._dedupe_laws(all_laws)
-        print(f"     precedents {len(all_precedents)}, laws {len(all_laws)} collected")
-        print(f"     판례/법령 수집 완료 ({time.perf_counter() - step_start:.2f}s)")
-        
-        # 5단계: 임베딩 생성 및 유사도 검색
-        print("[5/8] 임베딩 생성 및 유사도 검색..")
-        step_start = time.perf_counter()
-        self.embedding_manager.attach_embeddings(all_laws, self._format_law_text)
-        for clause in risky_clauses:
-            clause_text = self._format_clause_text([clause]) or (
-                f"{clause.title or clause.article_num}\n{clause.content}"
-            )
-            similar_precedents = self.embedding_manager.find_similar_precedents(
-                clause_text, all_precedents
-            )
-            clause.related_precedents = similar_precedents
-            similar_laws = self.embedding_manager.find_similar_laws(
-                clause_text, all_laws
-            )
-            clause.related_laws = similar_laws
-        print("     유사도 검색 완료")
-        print(f"     임베딩/유사도 완료 ({time.perf_counter() - step_start:.2f}s)")
-        
-        # 6단계: 위험 유형 매핑
-        print("[6/8] 위험 유형 매핑...")
-        step_start = time.perf_counter()
-        risk_mappings = {}
-        for clause in risky_clauses:
-            category = self.risk_mapper.map_risk_category(clause, all_precedents)
-            risk_mappings[clause.id] = category
-        print("     위험 유형 분류 완료")
-        print(f"     위험 유형 매핑 완료 ({time.perf_counter() - step_start:.2f}s)")
-        
-        # 7단계: 갑/을 토론 생성
-        print("[7/8] 갑/을 토론 생성...")
-        step_start = time.perf_counter()
-        contract_type = self.debate_agents.detect_contract_type(raw_text)
-        debate_transcript = self.debate_agents.run(
-            risky_clauses,
-            raw_text=raw_text,
-            contract_type=contract_type,
-        )
-        # Align legacy labels with the new judge role name.
-        for turn in debate_transcript:
-            if turn.get("speaker") in ("mediator", "중재자"):
-                turn["speaker"] = "판사"
-        print(f"     토론 생성 완료 ({time.perf_counter() - step_start:.2f}s)")
+        if stats is not None:
+            stats["details"] = hydration.stats()
+            stats["queries"] = hydration.query_stats()
+            stats["ranking"] = hydration.ranking_stats()
+        return all_precedents, all_laws
 
-        # 8단계: LLM 요약 생성
-        print("[8/8] LLM 조항 요약 생성...")
-        step_start = time.perf_counter()
-        llm_summary = self.llm_summarizer.generate_comprehensive_report(
-            self._format_clause_text(risky_clauses)
-        )
-        print(f"     요약 생성 완료 ({time.perf_counter() - step_start:.2f}s)")
-        
-        # 결과 반환
-        result = ContractAnalysisResult(
-            filename=filename,
-            raw_text=raw_text,
-            clauses=clauses,
-            risky_clauses=risky_clauses,
-            precedents=all_precedents,
-            laws=all_laws,
-            llm_summary=llm_summary,
-            debate_transcript=debate_transcript,
-            contract_type=contract_type
-        )
-        
-        print("\n분석 완료!")
-        return result
+    @staticmethod
+    def _risky_set_changed(diff, new_risky: List[Clause]) -> bool:
+        """새로 위험 판정된 조항이 있거나 이전 위험 조항이 삭제/수정되면 True"""
+        # 수정된 조항의 이전 버전은 diff.removed에 들어 있다.
+        return bool(new_risky) or any(is_risky(clause) for clause in diff.removed)
+
+    @staticmethod
+    def _merge_carried(items: list, carried: List[Clause], attr: str, key) -> list:
+        merged = list(items)
+        seen = {key(item) for item in merged}
+        for clause in carried:
+            related = getattr(clause, attr)
+            if not isinstance(related, list):
+                continue
+            for item in related:
+                item_key = key(item)
+                if item_key not in seen:
+                    merged.append(item)
+                    seen.add(item_key)
+        return merged
+
+    def _load_layout_html(self, file_path: str | List[str]) -> Optional[str]:
+        """조항 분리 보조용 Document Parse HTML (규칙 기반 분리 실패 시에만 호출, 문서 해시로 캐시됨)"""
+        if os.getenv("CLAUSE_LAYOUT_FALLBACK", "1").lower() not in ("1", "true", "yes", "y"):
+            return None
+        if isinstance(file_path, (list, tuple)):
+            return None
+        try:
+            html = self.ocr.extract_html_from_file(file_path)
+        except Exception as exc:
+            print(f"     Document Parse 실패: {exc!r}")
+            return None
+        return None if html == "api필요" else html
+
+    @staticmethod
+    def _run_coroutine(coro):
+        """
+        이벤트 루프 안/밖 어디서 호출되어도 코루틴을 끝까지 실행한다.
+        실행마다 새 루프를 쓰므로, 끝나면 그 루프에 묶인 공용 httpx 클라이언트를 닫아 커넥션을 남기지 않는다.
+        """
+        async def _run():
+            try:
+                return await coro
+            finally:
+                await get_async_http_client().aclose()
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(_run())
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, _run()).result()
 
     def analyze_only(self, file_path: str) -> ContractAnalysisResult:
         """Pipeline-only analysis helper (no negotiation)."""
@@ -217,7 +624,10 @@ class ContractAnalysisPipeline:
             "laws": [asdict(l) for l in result.laws],
             "summary": result.llm_summary,
             "debate_transcript": result.debate_transcript,
-            "contract_type": result.contract_type
+            "contract_type": result.contract_type,
+            "ocr_path": result.ocr_path,
+            "incremental": result.incremental,
+            "metrics": result.metrics,
         }
         
         # dataclass 직렬화 문제 해결
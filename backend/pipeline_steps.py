@@ -2,12 +2,16 @@
 Pipeline step implementations for contract analysis.
 """
 
+import asyncio
 import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List
 
+from detail_hydration import DetailHydrationScope
+from law_fetcher import AsyncLawFetcher
 from models import Clause
 from ocr import get_extracted_text
+from precedent_fetcher import AsyncPrecedentFetcher
 
 
 class PipelineSteps:
@@ -22,6 +26,8 @@ class PipelineSteps:
         risk_mapper,
         llm_summarizer,
         debate_agents,
+        async_precedent_fetcher=None,
+        async_law_fetcher=None,
     ) -> None:
         self.ocr = ocr
         self.text_processor = text_processor
@@ -32,19 +38,25 @@ class PipelineSteps:
         self.risk_mapper = risk_mapper
         self.llm_summarizer = llm_summarizer
         self.debate_agents = debate_agents
+        self.async_precedent_fetcher = async_precedent_fetcher
+        self.async_law_fetcher = async_law_fetcher
 
-    def run_ocr(self, file_path: str) -> str:
-        ocr_result = self.ocr.extract_text_from_file(file_path)
+    def run_ocr(self, file_path: str | List[str]) -> str:
+        ocr_result = self.ocr.extract_document(file_path)
         return get_extracted_text(ocr_result)
 
-    def prepare_clauses(self, raw_text: str) -> List[Clause]:
+    def prepare_clauses(self, raw_text: str, html_loader=None) -> List[Clause]:
         clean_text = self.text_processor.clean_text(raw_text)
-        return self.text_processor.split_clauses_with_fallback(clean_text)
+        return self.text_processor.split_clauses_with_fallback(clean_text, html_loader=html_loader)
 
-    def filter_risky_clauses(self, clauses: List[Clause]) -> List[Clause]:
-        return self.risk_assessor.filter_risky_clauses(clauses)
+    def filter_risky_clauses(self, clauses: List[Clause], stats=None) -> List[Clause]:
+        return self.risk_assessor.filter_risky_clauses(clauses, stats=stats)
 
-    def collect_references(self, risky_clauses: List[Clause]):
+    def collect_references(self, risky_clauses: List[Clause], stats: dict | None = None):
+        """
+        위험 조항별 판례/법령 수집.
+        상세 조회는 분석 전체에서 문서별로 한 번만 하며, stats가 주어지면 stats["details"]에 기록한다.
+        """
         all_precedents: list = []
         all_laws: list = []
         if not risky_clauses:
@@ -54,40 +66,23 @@ class PipelineSteps:
         min_law_results = int(os.getenv("LAW_MIN_RESULTS") or "3")
         domain_keywords = self._get_domain_keywords()
         workers = int(os.getenv("REFERENCE_FETCH_WORKERS", "4"))
+        hydration = DetailHydrationScope()
+        precedent_fetcher = self.precedent_fetcher
+        law_fetcher = self.law_fetcher
 
         def _fetch_for_clause(clause: Clause):
-            category = self.risk_mapper.map_risk_category(clause, all_precedents)
-            keywords = domain_keywords + [clause.title]
-            if category and category != "기타":
-                keywords.extend(self.risk_mapper.get_keywords_for_category(category))
-            query = " ".join([kw for kw in keywords if kw])
-
-            precedents = self.precedent_fetcher.fetch_precedents(query)
-            if isinstance(precedents, str):
-                precedents = []
+            query = self._build_reference_query(clause, domain_keywords, all_precedents)
+            options = {"hydration": hydration, "rank_text": self._clause_rank_text(clause)}
+
+            precedents = self._as_list(precedent_fetcher.fetch_precedents(query, **options))
             if len(precedents) < min_precedent_results and clause.title:
-                fallback = self.precedent_fetcher.fetch_precedents(clause.title)
-                if isinstance(fallback, str):
-                    fallback = []
-                seen = {p.case_id for p in precedents}
-                for p in fallback:
-                    if p.case_id and p.case_id not in seen:
-                        precedents.append(p)
-                        seen.add(p.case_id)
-
-            laws = self.law_fetcher.fetch_laws(query)
-            if isinstance(laws, str):
-                laws = []
+                fallback = self._as_list(precedent_fetcher.fetch_precedents(clause.title, **options))
+                precedents = self._merge_precedents(precedents, fallback)
+
+            laws = self._as_list(law_fetcher.fetch_laws(query, **options))
             if len(laws) < min_law_results and clause.title:
-                fallback = self.law_fetcher.fetch_laws(clause.title)
-                if isinstance(fallback, str):
-                    fallback = []
-                seen = {(l.doc_type, l.doc_id) for l in laws}
-                for law in fallback:
-                    key = (law.doc_type, law.doc_id)
-                    if law.doc_id and key not in seen:
-                        laws.append(law)
-                        seen.add(key)
+                fallback = self._as_list(law_fetcher.fetch_laws(clause.title, **options))
+                laws = self._merge_laws(laws, fallback)
             return precedents, laws
 
         if workers <= 1:
@@ -104,8 +99,107 @@ class PipelineSteps:
                     all_laws.extend(laws)
 
         all_laws = self.law_fetcher._dedupe_laws(all_laws)
+        if stats is not None:
+            stats["details"] = hydration.stats()
+            stats["queries"] = hydration.query_stats()
+            stats["ranking"] = hydration.ranking_stats()
         return all_precedents, all_laws
 
+    async def collect_references_async(self, risky_clauses: List[Clause], stats: dict | None = None):
+        """
+        collect_references의 asyncio 버전.
+        모든 조항의 검색/상세 호출을 하나의 이벤트 루프에서 동시에 실행한다.
+        """
+        all_precedents: list = []
+        all_laws: list = []
+        if not risky_clauses:
+            return all_precedents, all_laws
+
+        if self.async_precedent_fetcher is None:
+            self.async_precedent_fetcher = AsyncPrecedentFetcher()
+        if self.async_law_fetcher is None:
+            self.async_law_fetcher = AsyncLawFetcher()
+        precedent_fetcher = self.async_precedent_fetcher
+        law_fetcher = self.async_law_fetcher
+        min_precedent_results = int(os.getenv("PRECEDENT_MIN_RESULTS") or "3")
+        min_law_results = int(os.getenv("LAW_MIN_RESULTS") or "3")
+        domain_keywords = self._get_domain_keywords()
+        hydration = DetailHydrationScope()
+
+        async def _precedents_for_clause(clause: Clause, query: str):
+            options = {"hydration": hydration, "rank_text": self._clause_rank_text(clause)}
+            precedents = self._as_list(await precedent_fetcher.fetch_precedents(query, **options))
+            if len(precedents) < min_precedent_results and clause.title:
+                fallback = self._as_list(
+                    await precedent_fetcher.fetch_precedents(clause.title, **options)
+                )
+                precedents = self._merge_precedents(precedents, fallback)
+            return precedents
+
+        async def _laws_for_clause(clause: Clause, query: str):
+            options = {"hydration": hydration, "rank_text": self._clause_rank_text(clause)}
+            laws = self._as_list(await law_fetcher.fetch_laws(query, **options))
+            if len(laws) < min_law_results and clause.title:
+                fallback = self._as_list(await law_fetcher.fetch_laws(clause.title, **options))
+                laws = self._merge_laws(laws, fallback)
+            return laws
+
+        async def _fetch_for_clause(clause: Clause):
+            query = self._build_reference_query(clause, domain_keywords, all_precedents)
+            return await asyncio.gather(
+                _precedents_for_clause(clause, query),
+                _laws_for_clause(clause, query),
+            )
+
+        results = await asyncio.gather(*[_fetch_for_clause(c) for c in risky_clauses])
+        for precedents, laws in results:
+            all_precedents.extend(precedents)
+            all_laws.extend(laws)
+        all_laws = law_fetcher._dedupe_laws(all_laws)
+        if stats is not None:
+            stats["details"] = hydration.stats()
+            stats["queries"] = hydration.query_stats()
+            stats["ranking"] = hydration.ranking_stats()
+        return all_precedents, all_laws
+
+    def _build_reference_query(
+        self, clause: Clause, domain_keywords: List[str], precedents: list
+    ) -> str:
+        category = self.risk_mapper.map_risk_category(clause, precedents)
+        keywords = domain_keywords + [clause.title]
+        if category and category != "기타":
+            keywords.extend(self.risk_mapper.get_keywords_for_category(category))
+        return " ".join([kw for kw in keywords if kw])
+
+    @staticmethod
+    def _clause_rank_text(clause: Clause) -> str:
+        # 순위 후 상세 조회(REFERENCE_RANK_THEN_HYDRATE)에서 검색 목록과 비교할 조항 텍스트
+        return f"{clause.title or ''}\n{clause.content or ''}"
+
+    @staticmethod
+    def _as_list(result) -> list:
+        # 페처는 API 키가 없으면 "api필요" 문자열을 반환한다.
+        return [] if isinstance(result, str) else result
+
+    @staticmethod
+    def _merge_precedents(precedents: list, fallback: list) -> list:
+        seen = {p.case_id for p in precedents}
+        for p in fallback:
+            if p.case_id and p.case_id not in seen:
+                precedents.append(p)
+                seen.add(p.case_id)
+        return precedents
+
+    @staticmethod
+    def _merge_laws(laws: list, fallback: list) -> list:
+        seen = {(l.doc_type, l.doc_id) for l in laws}
+        for law in fallback:
+            key = (law.doc_type, law.doc_id)
+            if law.doc_id and key not in seen:
+                laws.append(law)
+                seen.add(key)
+        return laws
+
     def attach_similarities(
         self,
         risky_clauses: List[Clause],
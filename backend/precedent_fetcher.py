@@ -1,41 +1,142 @@
-﻿import os
+﻿import asyncio
+import os
+from functools import partial
 from typing import List, Optional
 
-try:
-    import requests
-except ImportError as exc:
-    raise ImportError(
-        "필수 패키지가 없습니다: requests. `pip install requests`로 설치하세요."
-    ) from exc
-
+from detail_hydration import DetailHydrationScope
+from drf_cache import DRFResponseCache, get_drf_cache
+from http_client import AsyncHttpClient, HttpClient, get_async_http_client, get_http_client
 from models import Precedent
+from reference_ranker import rank_candidates
+from reference_store import ReferenceStore, get_reference_store
+from single_flight import get_single_flight
 
 
 class PrecedentFetcher:
-    def __init__(self, api_url: str | None = None, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        api_url: str | None = None,
+        api_key: str | None = None,
+        http_client: HttpClient | None = None,
+        store: ReferenceStore | None = None,
+        response_cache: DRFResponseCache | None = None,
+    ) -> None:
         self.api_url = api_url or os.getenv("PRECEDENT_API_URL") or ""
         self.api_key = api_key or os.getenv("PRECEDENT_API_KEY") or "api필요"
         self.detail_limit = int(os.getenv("PRECEDENT_DETAIL_LIMIT") or "10")
         self._local_store: List[Precedent] = []
+        self.http = http_client or get_http_client()
+        # 로컬 FTS 저장소 (tools/sync_reference_store.py로 채운다)
+        self.store = store if store is not None else get_reference_store()
+        self.local_limit = int(os.getenv("REFERENCE_STORE_LIMIT") or "10")
+        self.local_min_hits = int(os.getenv("REFERENCE_STORE_MIN_HITS") or "1")
+        # DRF 검색/상세 응답 캐시 (메모리 LRU + SQLite)
+        self.response_cache = response_cache if response_cache is not None else get_drf_cache()
+        # 같은 검색어의 동시 호출은 프로세스 전체에서 하나로 합친다.
+        self.flights = get_single_flight()
+        # 순위 후 상세 조회: 검색 목록을 조항과 비교해 상위 N건만 상세 조회한다.
+        self.rank_then_hydrate = (os.getenv("REFERENCE_RANK_THEN_HYDRATE") or "").lower() in ("1", "true", "yes", "y")
+        self.hydrate_top_n = int(os.getenv("REFERENCE_HYDRATE_TOP_N") or "5")
+
+    def fetch_precedents(
+        self,
+        keyword: str,
+        hydration: DetailHydrationScope | None = None,
+        rank_text: str | None = None,
+    ) -> List[Precedent] | str:
+        """
+        hydration을 넘기면 같은 분석의 다른 검색과 판례 상세 조회를 공유한다.
+        rank_text(조항 텍스트)를 넘기고 REFERENCE_RANK_THEN_HYDRATE=1이면 상위 후보만 상세 조회한다.
+        """
+        if self.flights is None:
+            return self._fetch_precedents(keyword, hydration, rank_text)
+        result, coalesced = self.flights.do(
+            self._flight_key(keyword, rank_text),
+            partial(self._fetch_precedents, keyword, hydration, rank_text),
+        )
+        if hydration is not None:
+            hydration.record_query(coalesced)
+        return result
+
+    def _flight_key(self, keyword: str, rank_text: str | None) -> tuple:
+        # 순위를 매기면 조항마다 결과가 달라지므로 조항 텍스트도 키에 넣는다.
+        return ("prec", self.api_url, keyword, rank_text if self.rank_then_hydrate else None)
 
-    def fetch_precedents(self, keyword: str) -> List[Precedent] | str:
+    def _fetch_precedents(
+        self, keyword: str, hydration: DetailHydrationScope | None, rank_text: str | None
+    ) -> List[Precedent] | str:
+        local = self._search_local(keyword)
+        if local is not None:
+            return local
         if self.api_key == "api필요":
             return "api필요"
         if not self.api_url:
             return []
         # law.go.kr DRF uses OC/target/type/query parameters; it does not require Authorization header.
-        response = requests.get(
-            self.api_url,
-            params={"OC": self.api_key, "target": "prec", "type": "JSON", "query": keyword},
-            timeout=30,
+        payload = self._get_payload(self.api_url, self._search_params(keyword))
+        precedents = self._rank_for_hydration(self._parse_search_payload(payload), rank_text, hydration)
+        self._hydrate_precedent_details(precedents, hydration)
+        return self._remember(self._select_detailed(precedents))
+
+    def _rank_for_hydration(
+        self,
+        precedents: List[Precedent],
+        rank_text: str | None,
+        hydration: DetailHydrationScope | None,
+    ) -> List[Precedent]:
+        """검색 목록(사건명/판시사항)을 조항과 비교해 상위 hydrate_top_n건만 남긴다."""
+        if not (self.rank_then_hydrate and rank_text):
+            return precedents
+        ranked = rank_candidates(
+            rank_text,
+            precedents,
+            lambda p: f"{p.case_name} {p.summary} {p.key_paragraph}",
+            self.hydrate_top_n,
         )
-        try:
-            response.raise_for_status()
-        except requests.HTTPError:
-            return []
-        try:
-            payload = response.json() or {}
-        except ValueError:
+        if hydration is not None:
+            hydration.record_ranking(
+                [("prec", p.case_id) for p in self._precedents_to_hydrate(precedents)],
+                [("prec", p.case_id) for p in self._precedents_to_hydrate(ranked)],
+            )
+        return ranked
+
+    def _search_local(self, keyword: str) -> Optional[List[Precedent]]:
+        """
+        동기화 명령으로 받은 검색어만 로컬 저장소에서 찾는다. 결과가 local_min_hits 이상이면 반환하고,
+        아니면 None(DRF 조회). 분석 중 저장한 결과는 다른 검색어의 결과를 대신하지 못한다.
+        """
+        if self.store is None:
+            return None
+        if not self.store.is_synced("prec", "prec", keyword):
+            self.store.record_lookup(False)
+            return None
+        precedents = self._select_detailed(self.store.search_precedents(keyword, self.local_limit))
+        hit = len(precedents) >= max(1, self.local_min_hits)
+        self.store.record_lookup(hit)
+        return precedents if hit else None
+
+    def _remember(self, precedents: List[Precedent]) -> List[Precedent]:
+        # DRF에서 받은 본문을 저장해 두면 동기화 명령이 같은 판례의 상세 조회를 건너뛴다.
+        if self.store is not None and precedents:
+            self.store.upsert_precedents(precedents)
+        return precedents
+
+    def _search_params(self, keyword: str) -> dict:
+        return {"OC": self.api_key, "target": "prec", "type": "JSON", "query": keyword}
+
+    def _get_payload(self, url: str, params: dict) -> Optional[dict]:
+        def fetch() -> Optional[dict]:
+            return self._payload_from_response(self.http.get(url, params=params, timeout=30))
+
+        if self.response_cache is None:
+            return fetch()
+        return self.response_cache.get_or_fetch(url, params, fetch)
+
+    def _parse_search_response(self, response) -> List[Precedent]:
+        return self._parse_search_payload(self._payload_from_response(response))
+
+    def _parse_search_payload(self, payload: Optional[dict]) -> List[Precedent]:
+        if payload is None:
             return []
         items = payload.get("PrecSearch", {}).get("prec", []) or []
         precedents: List[Precedent] = []
@@ -52,13 +153,25 @@ class PrecedentFetcher:
                     key_paragraph=str(item.get("판결요지", "")),
                 )
             )
-        self._hydrate_precedent_details(precedents)
-        detailed = [
+        return precedents
+
+    @staticmethod
+    def _select_detailed(precedents: List[Precedent]) -> List[Precedent]:
+        return [
             p
             for p in precedents
             if (p.summary and p.summary.strip()) or (p.key_paragraph and p.key_paragraph.strip())
         ]
-        return detailed
+
+    @staticmethod
+    def _payload_from_response(response) -> Optional[dict]:
+        # requests/httpx 응답 모두 지원: 4xx/5xx 또는 JSON 파싱 실패 시 None
+        if response.status_code >= 400:
+            return None
+        try:
+            return response.json() or {}
+        except ValueError:
+            return None
 
     def _detail_base_url(self) -> str:
         if not self.api_url:
@@ -67,41 +180,134 @@ class PrecedentFetcher:
             return self.api_url.replace("lawSearch.do", "lawService.do")
         return self.api_url.rstrip("/") + "/lawService.do"
 
+    def _detail_params(self, case_id: str) -> dict:
+        return {"OC": self.api_key, "target": "prec", "type": "JSON", "ID": case_id}
+
     def _fetch_precedent_detail(self, case_id: str) -> Optional[dict]:
         if not case_id:
             return None
-        response = requests.get(
-            self._detail_base_url(),
-            params={"OC": self.api_key, "target": "prec", "type": "JSON", "ID": case_id},
-            timeout=30,
-        )
-        try:
-            response.raise_for_status()
-        except requests.HTTPError:
-            return None
-        try:
-            payload = response.json() or {}
-        except ValueError:
+        payload = self._get_payload(self._detail_base_url(), self._detail_params(case_id))
+        return self._detail_from_payload(payload)
+
+    @staticmethod
+    def _detail_from_payload(payload: Optional[dict]) -> Optional[dict]:
+        if payload is None:
             return None
         return payload.get("PrecService") or payload.get("PrecSearch") or None
 
-    def _hydrate_precedent_details(self, precedents: List[Precedent]) -> None:
+    def _precedents_to_hydrate(self, precedents: List[Precedent]) -> List[Precedent]:
         if self.detail_limit <= 0:
+            return []
+        return [
+            p for p in precedents[: self.detail_limit] if not (p.summary and p.key_paragraph)
+        ]
+
+    @staticmethod
+    def _apply_detail(precedent: Precedent, detail: Optional[dict]) -> None:
+        if not detail:
             return
-        for precedent in precedents[: self.detail_limit]:
-            if precedent.summary and precedent.key_paragraph:
-                continue
-            detail = self._fetch_precedent_detail(precedent.case_id)
-            if not detail:
-                continue
-            precedent.case_name = precedent.case_name or str(detail.get("사건명", ""))
-            precedent.court = precedent.court or str(detail.get("법원명", ""))
-            precedent.date = precedent.date or str(detail.get("선고일자", ""))
-            precedent.summary = precedent.summary or str(detail.get("판시사항", ""))
-            precedent.key_paragraph = precedent.key_paragraph or str(detail.get("판결요지", ""))
+        precedent.case_name = precedent.case_name or str(detail.get("사건명", ""))
+        precedent.court = precedent.court or str(detail.get("법원명", ""))
+        precedent.date = precedent.date or str(detail.get("선고일자", ""))
+        precedent.summary = precedent.summary or str(detail.get("판시사항", ""))
+        precedent.key_paragraph = precedent.key_paragraph or str(detail.get("판결요지", ""))
+
+    def _hydrate_precedent_details(
+        self, precedents: List[Precedent], hydration: DetailHydrationScope | None = None
+    ) -> None:
+        hydration = hydration or DetailHydrationScope()
+        pending = self._precedents_to_hydrate(precedents)
+        futures = [
+            hydration.submit(("prec", p.case_id), partial(self._fetch_precedent_detail, p.case_id))
+            for p in pending
+        ]
+        for precedent, future in zip(pending, futures):
+            self._apply_detail(precedent, future.result())
 
     def get_precedents_by_keyword(self, keyword: str) -> List[Precedent]:
         return [p for p in self._local_store if keyword in p.keywords]
 
     def add_precedent(self, precedent: Precedent) -> None:
         self._local_store.append(precedent)
+
+
+class AsyncPrecedentFetcher(PrecedentFetcher):
+    """
+    PrecedentFetcher의 asyncio 버전.
+    상세 조회를 동시에 실행하며, 동시 요청 수는 AsyncHttpClient의 세마포어로 제한된다.
+    """
+
+    def __init__(
+        self,
+        api_url: str | None = None,
+        api_key: str | None = None,
+        http_client: AsyncHttpClient | None = None,
+        store: ReferenceStore | None = None,
+        response_cache: DRFResponseCache | None = None,
+    ) -> None:
+        super().__init__(
+            api_url=api_url, api_key=api_key, store=store, response_cache=response_cache
+        )
+        self.http = http_client or get_async_http_client()
+
+    async def fetch_precedents(
+        self,
+        keyword: str,
+        hydration: DetailHydrationScope | None = None,
+        rank_text: str | None = None,
+    ) -> List[Precedent] | str:
+        if self.flights is None:
+            return await self._fetch_precedents(keyword, hydration, rank_text)
+        result, coalesced = await self.flights.do_async(
+            self._flight_key(keyword, rank_text),
+            partial(self._fetch_precedents, keyword, hydration, rank_text),
+        )
+        if hydration is not None:
+            hydration.record_query(coalesced)
+        return result
+
+    async def _fetch_precedents(
+        self, keyword: str, hydration: DetailHydrationScope | None, rank_text: str | None
+    ) -> List[Precedent] | str:
+        # 로컬 조회는 밀리초 단위라 이벤트 루프에서 바로 실행한다.
+        local = self._search_local(keyword)
+        if local is not None:
+            return local
+        if self.api_key == "api필요":
+            return "api필요"
+        if not self.api_url:
+            return []
+        payload = await self._get_payload(self.api_url, self._search_params(keyword))
+        precedents = self._rank_for_hydration(self._parse_search_payload(payload), rank_text, hydration)
+        await self._hydrate_precedent_details(precedents, hydration)
+        return self._remember(self._select_detailed(precedents))
+
+    async def _get_payload(self, url: str, params: dict) -> Optional[dict]:
+        async def fetch() -> Optional[dict]:
+            return self._payload_from_response(await self.http.get(url, params=params, timeout=30))
+
+        if self.response_cache is None:
+            return await fetch()
+        return await self.response_cache.get_or_fetch_async(url, params, fetch)
+
+    async def _fetch_precedent_detail(self, case_id: str) -> Optional[dict]:
+        if not case_id:
+            return None
+        payload = await self._get_payload(self._detail_base_url(), self._detail_params(case_id))
+        return self._detail_from_payload(payload)
+
+    async def _hydrate_precedent_details(
+        self, precedents: List[Precedent], hydration: DetailHydrationScope | None = None
+    ) -> None:
+        hydration = hydration or DetailHydrationScope()
+        pending = self._precedents_to_hydrate(precedents)
+        details = await asyncio.gather(
+            *[
+                hydration.fetch_async(
+                    ("prec", p.case_id), partial(self._fetch_precedent_detail, p.case_id)
+                )
+                for p in pending
+            ]
+        )
+        for precedent, detail in zip(pending, details):
+            self._apply_detail(precedent, detail)
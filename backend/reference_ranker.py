@@ -0,0 +1,38 @@
+"""
+판례/법령 검색 목록 후보의 사전 순위 (상세 조회 전, 문자 bigram 겹침 기반)
+"""
+
+import math
+import re
+from typing import Callable, List, Set, TypeVar
+
+
+T = TypeVar("T")
+
+
+def char_bigrams(text: str) -> Set[str]:
+    # 한국어는 띄어쓰기가 일정하지 않으므로 공백을 지우고 문자 bigram을 쓴다.
+    compact = re.sub(r"\s+", "", text or "").lower()
+    return {compact[i : i + 2] for i in range(len(compact) - 1)}
+
+
+def rank_candidates(
+    query_text: str,
+    items: List[T],
+    text_getter: Callable[[T], str],
+    top_n: int,
+) -> List[T]:
+    """
+    조항 텍스트와 후보(사건명/판시사항, 법령명 등)의 bigram 겹침으로 상위 top_n개를 고른다.
+    긴 후보가 유리하지 않도록 후보 bigram 수의 제곱근으로 나누고, 동점이면 검색 API 순서를 유지한다.
+    """
+    query = char_bigrams(query_text)
+    if not query or top_n <= 0 or len(items) <= top_n:
+        return list(items)
+    scored = []
+    for idx, item in enumerate(items):
+        grams = char_bigrams(text_getter(item))
+        score = len(query & grams) / math.sqrt(len(grams)) if grams else 0.0
+        scored.append((-score, idx, item))
+    scored.sort(key=lambda entry: (entry[0], entry[1]))
+    return [item for _, _, item in scored[:top_n]]
@@ -0,0 +1,431 @@
+"""
+판례/법령 로컬 전문 검색 저장소 (SQLite FTS5)
+
+tools/sync_reference_store.py로 law.go.kr DRF 결과를 채워 두면 페처가 동기화된 검색어에 한해 DRF보다 먼저 조회한다.
+"""
+
+import os
+import re
+import sqlite3
+import time
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from models import Law, Precedent
+
+
+class ReferenceStore:
+    """
+    Precedent/Law 레코드를 SQLite 파일에 저장하고 FTS5 색인으로 검색한다.
+    한국어는 띄어쓰기 단위 토큰화가 맞지 않으므로 trigram 토크나이저를 사용하고,
+    지원하지 않는 SQLite에서는 unicode61 + 접두어 검색으로 대체한다.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or os.getenv("REFERENCE_STORE_PATH") or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "cache", "reference_store.sqlite3"
+        )
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS precedents (
+              id INTEGER PRIMARY KEY,
+              case_id TEXT NOT NULL UNIQUE,
+              court TEXT NOT NULL,
+              date TEXT NOT NULL,
+              case_name TEXT NOT NULL,
+              summary TEXT NOT NULL,
+              key_paragraph TEXT NOT NULL,
+              updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS laws (
+              id INTEGER PRIMARY KEY,
+              doc_type TEXT NOT NULL,
+              doc_id TEXT NOT NULL,
+              title TEXT NOT NULL,
+              summary TEXT NOT NULL,
+              content TEXT NOT NULL,
+              date TEXT NOT NULL,
+              org TEXT NOT NULL,
+              url TEXT NOT NULL,
+              updated_at REAL NOT NULL,
+              UNIQUE (doc_type, doc_id)
+            );
+            CREATE TABLE IF NOT EXISTS law_articles (
+              id INTEGER PRIMARY KEY,
+              doc_type TEXT NOT NULL,
+              doc_id TEXT NOT NULL UNIQUE,
+              parent_id TEXT NOT NULL,
+              title TEXT NOT NULL,
+              content TEXT NOT NULL,
+              date TEXT NOT NULL,
+              org TEXT NOT NULL,
+              url TEXT NOT NULL,
+              updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_law_articles_parent ON law_articles (doc_type, parent_id);
+            CREATE TABLE IF NOT EXISTS sync_log (
+              kind TEXT NOT NULL,
+              target TEXT NOT NULL,
+              query TEXT NOT NULL,
+              fetched INTEGER NOT NULL,
+              synced_at REAL NOT NULL,
+              PRIMARY KEY (kind, target, query)
+            );
+            """
+        )
+        self.tokenizer = self._create_fts_tables()
+        self._conn.commit()
+
+    def _create_fts_tables(self) -> str:
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS precedents_fts USING fts5("
+                    f"case_name, summary, key_paragraph, tokenize='{tokenizer}')"
+                )
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS laws_fts USING fts5("
+                    f"title, summary, content, tokenize='{tokenizer}')"
+                )
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS law_articles_fts USING fts5("
+                    f"title, content, tokenize='{tokenizer}')"
+                )
+            except sqlite3.OperationalError:
+                continue
+            # 이미 만들어진 파일이면 생성 당시의 토크나이저를 따른다.
+            row = self._conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name='precedents_fts'"
+            ).fetchone()
+            return "trigram" if row and "trigram" in row[0] else "unicode61"
+        raise RuntimeError("SQLite FTS5를 사용할 수 없습니다.")
+
+    # ---------- 저장 ----------
+
+    def upsert_precedents(self, precedents: Iterable[Precedent]) -> int:
+        now = time.time()
+        stored = 0
+        with self._lock:
+            for p in precedents:
+                if not p.case_id:
+                    continue
+                self._conn.execute(
+                    """
+                    INSERT INTO precedents (case_id, court, date, case_name, summary, key_paragraph, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (case_id) DO UPDATE SET
+                      court=excluded.court, date=excluded.date, case_name=excluded.case_name,
+                      summary=excluded.summary, key_paragraph=excluded.key_paragraph,
+                      updated_at=excluded.updated_at
+                    """,
+                    (p.case_id, p.court or "", p.date or "", p.case_name or "",
+                     p.summary or "", p.key_paragraph or "", now),
+                )
+                row_id = self._conn.execute(
+                    "SELECT id FROM precedents WHERE case_id=?", (p.case_id,)
+                ).fetchone()[0]
+                self._conn.execute("DELETE FROM precedents_fts WHERE rowid=?", (row_id,))
+                self._conn.execute(
+                    "INSERT INTO precedents_fts (rowid, case_name, summary, key_paragraph) VALUES (?, ?, ?, ?)",
+                    (row_id, p.case_name or "", p.summary or "", p.key_paragraph or ""),
+                )
+                stored += 1
+            self._conn.commit()
+        return stored
+
+    def upsert_laws(self, laws: Iterable[Law]) -> int:
+        now = time.time()
+        stored = 0
+        with self._lock:
+            for law in laws:
+                if not law.doc_id:
+                    continue
+                self._conn.execute(
+                    """
+                    INSERT INTO laws (doc_type, doc_id, title, summary, content, date, org, url, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (doc_type, doc_id) DO UPDATE SET
+                      title=excluded.title, summary=excluded.summary, content=excluded.content,
+                      date=excluded.date, org=excluded.org, url=excluded.url,
+                      updated_at=excluded.updated_at
+                    """,
+                    (law.doc_type, law.doc_id, law.title or "", law.summary or "",
+                     law.content or "", law.date or "", law.org or "", law.url or "", now),
+                )
+                row_id = self._conn.execute(
+                    "SELECT id FROM laws WHERE doc_type=? AND doc_id=?", (law.doc_type, law.doc_id)
+                ).fetchone()[0]
+                self._conn.execute("DELETE FROM laws_fts WHERE rowid=?", (row_id,))
+                self._conn.execute(
+                    "INSERT INTO laws_fts (rowid, title, summary, content) VALUES (?, ?, ?, ?)",
+                    (row_id, law.title or "", law.summary or "", law.content or ""),
+                )
+                stored += 1
+            self._conn.commit()
+        return stored
+
+    def replace_law_articles(self, parent: Law, articles: List[Law]) -> int:
+        """법령 하나의 조문 레코드를 통째로 바꾼다 (개정으로 조문이 빠진 경우도 반영)."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM law_articles WHERE doc_type=? AND parent_id=?",
+                (parent.doc_type, parent.doc_id),
+            ).fetchall()
+            for (row_id,) in rows:
+                self._conn.execute("DELETE FROM law_articles_fts WHERE rowid=?", (row_id,))
+            self._conn.execute(
+                "DELETE FROM law_articles WHERE doc_type=? AND parent_id=?",
+                (parent.doc_type, parent.doc_id),
+            )
+            stored = 0
+            for article in articles:
+                cursor = self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO law_articles
+                      (doc_type, doc_id, parent_id, title, content, date, org, url, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (article.doc_type, article.doc_id, parent.doc_id, article.title or "",
+                     article.content or "", article.date or "", article.org or "",
+                     article.url or "", now),
+                )
+                self._conn.execute(
+                    "INSERT INTO law_articles_fts (rowid, title, content) VALUES (?, ?, ?)",
+                    (cursor.lastrowid, article.title or "", article.content or ""),
+                )
+                stored += 1
+            self._conn.commit()
+        return stored
+
+    # ---------- 검색 ----------
+
+    def search_precedents(self, query: str, limit: int = 10) -> List[Precedent]:
+        # bm25 가중치: 사건명 > 판시사항/판결요지
+        rows = self._search(
+            "precedents",
+            ["case_name", "summary", "key_paragraph"],
+            "p.case_id, p.court, p.date, p.case_name, p.summary, p.key_paragraph",
+            "bm25(precedents_fts, 3.0, 1.0, 1.0)",
+            query,
+            limit,
+        )
+        precedents = [
+            Precedent(
+                case_id=row[0],
+                court=row[1],
+                date=row[2],
+                case_name=row[3],
+                summary=row[4],
+                key_paragraph=row[5],
+            )
+            for row in rows
+        ]
+        return precedents
+
+    def search_laws(
+        self, query: str, targets: Optional[List[str]] = None, limit: int = 10
+    ) -> List[Law]:
+        rows = self._search(
+            "laws",
+            ["title", "summary", "content"],
+            "p.doc_id, p.doc_type, p.title, p.summary, p.content, p.date, p.org, p.url",
+            "bm25(laws_fts, 5.0, 1.0, 1.0)",
+            query,
+            limit,
+            targets,
+        )
+        laws = [
+            Law(
+                doc_id=row[0],
+                doc_type=row[1],
+                title=row[2],
+                summary=row[3],
+                content=row[4],
+                date=row[5],
+                org=row[6],
+                url=row[7],
+            )
+            for row in rows
+        ]
+        return laws
+
+    def search_law_articles(self, query: str, limit: int = 5) -> List[Law]:
+        # bm25 가중치: 조문 제목(예: "주택임대차보호법 제3조(대항력 등)") > 조문 내용
+        rows = self._search(
+            "law_articles",
+            ["title", "content"],
+            "p.doc_id, p.doc_type, p.title, p.content, p.date, p.org, p.url",
+            "bm25(law_articles_fts, 2.0, 1.0)",
+            query,
+            limit,
+        )
+        return [
+            Law(
+                doc_id=row[0],
+                doc_type=row[1],
+                title=row[2],
+                content=row[3],
+                date=row[4],
+                org=row[5],
+                url=row[6],
+            )
+            for row in rows
+        ]
+
+    def law_article_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM law_articles").fetchone()[0]
+
+    def _search(
+        self,
+        table: str,
+        columns: List[str],
+        select: str,
+        rank: str,
+        query: str,
+        limit: int,
+        targets: Optional[List[str]] = None,
+    ) -> List[tuple]:
+        terms = self._query_terms(query)
+        if not terms:
+            return []
+        where = ""
+        params: list = []
+        if targets:
+            where = f" AND p.doc_type IN ({','.join('?' * len(targets))})"
+            params.extend(targets)
+        match = self._match_expression(terms)
+        with self._lock:
+            if match:
+                return self._conn.execute(
+                    f"SELECT {select} FROM {table}_fts f JOIN {table} p ON p.id = f.rowid "
+                    f"WHERE {table}_fts MATCH ?{where} ORDER BY {rank} LIMIT ?",
+                    [match, *params, limit],
+                ).fetchall()
+            # trigram은 3글자 미만 검색어를 색인으로 찾지 못하므로 모든 검색어를 포함하는 행을 찾는다.
+            likes = " AND ".join(
+                "(" + " OR ".join(f"p.{column} LIKE ?" for column in columns) + ")" for _ in terms
+            )
+            like_params = [f"%{term}%" for term in terms for _ in columns]
+            return self._conn.execute(
+                f"SELECT {select} FROM {table} p WHERE {likes}{where} "
+                "ORDER BY p.updated_at DESC LIMIT ?",
+                [*like_params, *params, limit],
+            ).fetchall()
+
+    @staticmethod
+    def _query_terms(query: str) -> List[str]:
+        terms: List[str] = []
+        for term in re.split(r"[\s,]+", query or ""):
+            term = term.strip().strip('"')
+            if term and term not in terms:
+                terms.append(term)
+        return terms
+
+    def _match_expression(self, terms: List[str]) -> str:
+        # 검색어 중 하나라도 포함하면 후보로 두고 bm25로 순위를 매긴다.
+        if self.tokenizer == "trigram":
+            usable = [term for term in terms if len(term) >= 3]
+            return " OR ".join('"' + term.replace('"', '""') + '"' for term in usable)
+        return " OR ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+    def record_lookup(self, hit: bool) -> None:
+        """페처가 로컬 결과로 응답했는지(hit) DRF로 넘어갔는지(miss) 기록한다."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # ---------- 증분 동기화 ----------
+
+    def known_precedents(self, precedents: Iterable[Precedent]) -> Set[str]:
+        """본문(판시사항/판결요지)이 저장돼 있고 선고일자가 같은 case_id 집합"""
+        dates = {p.case_id: p.date or "" for p in precedents if p.case_id}
+        if not dates:
+            return set()
+        keys = list(dates)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT case_id, date FROM precedents WHERE case_id IN ({','.join('?' * len(keys))}) "
+                "AND (summary != '' OR key_paragraph != '')",
+                keys,
+            ).fetchall()
+        return {case_id for case_id, date in rows if not dates[case_id] or dates[case_id] == date}
+
+    def known_laws(self, laws: Iterable[Law]) -> Set[Tuple[str, str]]:
+        """본문이 저장돼 있고 시행일자가 같은 (doc_type, doc_id) 집합 (개정되면 다시 받는다)"""
+        dates = {(law.doc_type, law.doc_id): law.date or "" for law in laws if law.doc_id}
+        known: Set[Tuple[str, str]] = set()
+        if not dates:
+            return known
+        with self._lock:
+            for (doc_type, doc_id), date in dates.items():
+                row = self._conn.execute(
+                    "SELECT date FROM laws WHERE doc_type=? AND doc_id=? AND content != ''",
+                    (doc_type, doc_id),
+                ).fetchone()
+                if row is not None and (not date or row[0] == date):
+                    known.add((doc_type, doc_id))
+        return known
+
+    def last_synced(self, kind: str, target: str, query: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at FROM sync_log WHERE kind=? AND target=? AND query=?",
+                (kind, target, query),
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_synced(self, kind: str, target: str, query: str) -> bool:
+        return self.last_synced(kind, target, (query or "").strip()) is not None
+
+    def mark_synced(self, kind: str, target: str, query: str, fetched: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_log (kind, target, query, fetched, synced_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, target, query, fetched, time.time()),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            precedents = self._conn.execute("SELECT COUNT(*) FROM precedents").fetchone()[0]
+            laws = self._conn.execute("SELECT COUNT(*) FROM laws").fetchone()[0]
+            articles = self._conn.execute("SELECT COUNT(*) FROM law_articles").fetchone()[0]
+            last_sync = self._conn.execute("SELECT MAX(synced_at) FROM sync_log").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "precedents": precedents,
+            "laws": laws,
+            "law_articles": articles,
+            "last_sync": last_sync or 0.0,
+            "tokenizer": self.tokenizer,
+        }
+
+
+_STORE: Optional[ReferenceStore] = None
+_STORE_LOCK = Lock()
+
+
+def get_reference_store() -> Optional[ReferenceStore]:
+    """프로세스 전체에서 하나의 저장소를 공유한다. 동기화 후 REFERENCE_STORE_ENABLED=1로 켠다 (기본 None)."""
+    global _STORE
+    if (os.getenv("REFERENCE_STORE_ENABLED") or "0").lower() not in ("1", "true", "yes", "y"):
+        return None
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = ReferenceStore()
+    return _STORE
@@ -1,60 +1,452 @@
-﻿import json
+﻿import asyncio
+import json
 import os
+import re
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Optional, Tuple
+from threading import Lock
+from typing import Awaitable, Dict, List, Optional, Tuple
 
 
 
+from llm_rate_limiter import estimate_tokens
 from models import Clause, RiskType
+from openai_client import call_openai, call_openai_async, get_async_openai_client, get_openai_client
+from risk_cache import RiskVerdictCache
+from risk_prefilter import RiskPrefilter
+
+# (risk, rationale, confidence)
+Verdict = Tuple[Optional[RiskType], str, Optional[float]]
+
+
+class CascadeTracker:
+    """모델 계층(fast/strong)별 호출 수/지연과 상향 평가 비율"""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.tiers: Dict[str, Dict[str, float]] = {}
+        self.scored = 0
+        self.escalated = 0
+
+    def record_call(self, tier: str, latency: float) -> None:
+        with self._lock:
+            stats = self.tiers.setdefault(tier, {"calls": 0, "total_latency": 0.0, "max_latency": 0.0})
+            stats["calls"] += 1
+            stats["total_latency"] += latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+
+    def record_decision(self, escalated: bool, count: int = 1) -> None:
+        with self._lock:
+            self.scored += count
+            if escalated:
+                self.escalated += count
+
+    def merge(self, other: "CascadeTracker") -> None:
+        with self._lock:
+            for tier, stats in other.tiers.items():
+                mine = self.tiers.setdefault(tier, {"calls": 0, "total_latency": 0.0, "max_latency": 0.0})
+                mine["calls"] += stats["calls"]
+                mine["total_latency"] += stats["total_latency"]
+                mine["max_latency"] = max(mine["max_latency"], stats["max_latency"])
+            self.scored += other.scored
+            self.escalated += other.escalated
+
+    def as_dict(self) -> Dict[str, object]:
+        with self._lock:
+            tiers = {
+                tier: {
+                    "calls": stats["calls"],
+                    "avg_latency": stats["total_latency"] / stats["calls"] if stats["calls"] else 0.0,
+                    "max_latency": stats["max_latency"],
+                }
+                for tier, stats in self.tiers.items()
+            }
+            return {
+                "tiers": tiers,
+                "scored": self.scored,
+                "escalated": self.escalated,
+                "escalation_rate": self.escalated / self.scored if self.scored else 0.0,
+            }
 
 
 class RiskAssessor:
-    def __init__(self, model: Optional[str] = None) -> None:
+    # 단건/일괄 프롬프트나 판정 형식이 바뀌면 올려서 이전 캐시를 무효화한다.
+    PROMPT_VERSION = "1"
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        cache: RiskVerdictCache | None = None,
+        prefilter: RiskPrefilter | None = None,
+        priority: str = "interactive",
+    ) -> None:
         self.model = model or os.getenv("OPENAI_RISK_MODEL") or "gpt-4o"
+        self.priority = priority
         self.api_key = os.getenv("OPENAI_API_KEY") or "api필요"
         self._client = self._build_client() if self.api_key != "api필요" else None
+        cache_enabled = (os.getenv("RISK_CACHE_ENABLED") or "1").lower() in ("1", "true", "yes", "y")
+        self.cache = cache if cache is not None else (RiskVerdictCache() if cache_enabled else None)
+        self.prefilter = prefilter or RiskPrefilter()
+        self.batch_enabled = (os.getenv("RISK_BATCH_ENABLED") or "").lower() in ("1", "true", "yes", "y")
+        self.batch_size = int(os.getenv("RISK_BATCH_SIZE") or "8")
+        self.batch_token_budget = int(os.getenv("RISK_BATCH_TOKEN_BUDGET") or "3000")
+        self.max_workers = int(os.getenv("RISK_ASSESSOR_WORKERS") or "4")
+        self.batch_workers = int(os.getenv("RISK_BATCH_WORKERS") or os.getenv("RISK_ASSESSOR_WORKERS") or "4")
+        # 2단계 캐스케이드: fast 모델이 먼저 평가하고 경계/저신뢰 조항만 strong(self.model)으로 보낸다.
+        self.fast_model = os.getenv("OPENAI_RISK_FAST_MODEL") or None
+        self.escalate_levels = {
+            level.strip().lower()
+            for level in (os.getenv("RISK_CASCADE_ESCALATE_LEVELS") or "medium,high").split(",")
+            if level.strip()
+        }
+        self.min_confidence = float(os.getenv("RISK_CASCADE_MIN_CONFIDENCE") or "0.7")
+        self.cascade_stats = CascadeTracker()
+
+    @property
+    def cascade_enabled(self) -> bool:
+        return bool(self.fast_model) and self.fast_model != self.model
 
     def _build_client(self):
-        try:
-            from openai import OpenAI
-        except ImportError as exc:
-            raise RuntimeError(
-                "openai 패키지가 없습니다. `pip install openai`로 설치하세요."
-            ) from exc
-        return OpenAI(api_key=self.api_key)
-
-    def assess_clause(self, clause: Clause) -> Tuple[Optional[RiskType], str]:
+        return get_openai_client(self.api_key)
+
+    def cache_stats(self) -> Dict[str, float]:
+        if self.cache is None:
+            return {}
+        return self.cache.stats()
+
+    def assess_clause(
+        self, clause: Clause, tracker: CascadeTracker | None = None
+    ) -> Tuple[Optional[RiskType], str]:
         if self.api_key == "api필요":
             return None, "api필요"
-        prompt = (
+        cached = self._cached_verdict(clause)
+        if cached is not None:
+            return cached
+        risk, rationale = self._verdict_for(clause, tracker or self.cascade_stats)
+        self._store_verdict(clause, risk, rationale)
+        return risk, rationale
+
+    def _verdict_for(self, clause: Clause, tracker: CascadeTracker) -> Tuple[Optional[RiskType], str]:
+        if not self.cascade_enabled:
+            risk, rationale, _ = self._request_clause_verdict(clause, self.model, "strong", tracker)
+            return risk, rationale
+        fast = self._request_clause_verdict(clause, self.fast_model, "fast", tracker)
+        escalate = self._needs_escalation(fast)
+        tracker.record_decision(escalate)
+        if not escalate:
+            return fast[0], fast[1]
+        risk, rationale, _ = self._request_clause_verdict(clause, self.model, "strong", tracker)
+        return risk, rationale
+
+    def _needs_escalation(self, verdict: Verdict) -> bool:
+        risk, _, confidence = verdict
+        if risk is None or risk.value in self.escalate_levels:
+            return True
+        return confidence is None or confidence < self.min_confidence
+
+    def _cache_model_key(self) -> str:
+        return f"{self.fast_model}>{self.model}" if self.cascade_enabled else self.model
+
+    def _cached_verdict(self, clause: Clause) -> Optional[Tuple[Optional[RiskType], str]]:
+        if self.cache is None:
+            return None
+        key = self.cache.build_key(clause.content, self._cache_model_key(), self.PROMPT_VERSION)
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        return self._map_risk(cached[0]), cached[1]
+
+    def _store_verdict(self, clause: Clause, risk: Optional[RiskType], rationale: str) -> None:
+        # 판정 실패(None)는 저장하지 않는다.
+        if self.cache is None or risk is None:
+            return
+        key = self.cache.build_key(clause.content, self._cache_model_key(), self.PROMPT_VERSION)
+        self.cache.set(key, risk.value, rationale)
+
+    def _request_clause_verdict(
+        self, clause: Clause, model: str, tier: str, tracker: CascadeTracker
+    ) -> Verdict:
+        prompt = self._clause_prompt(clause, tier)
+        start = time.perf_counter()
+        response = call_openai(
+            self._client.chat.completions,
+            model=model,
+            tokens=estimate_tokens(prompt),
+            priority=self.priority,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        tracker.record_call(tier, time.perf_counter() - start)
+        return self._parse_clause_verdict(response.choices[0].message.content or "")
+
+    @staticmethod
+    def _clause_prompt(clause: Clause, tier: str) -> str:
+        schema = (
+            "{\"risk\": \"low|medium|high|critical\", \"rationale\": \"...\", \"confidence\": 0.0-1.0}"
+            if tier == "fast"
+            else "{\"risk\": \"low|medium|high|critical\", \"rationale\": \"...\"}"
+        )
+        return (
             "You are a legal risk assistant. Assess the risk level of the clause below.\n"
-            "Return JSON only: {\"risk\": \"low|medium|high|critical\", \"rationale\": \"...\"}\n"
+            f"Return JSON only: {schema}\n"
             "Write the rationale in Korean.\n"
             f"Clause:\n{clause.content}"
         )
-        response = self._client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-        )
-        content = response.choices[0].message.content or ""
+
+    def _parse_clause_verdict(self, content: str) -> Verdict:
         try:
             payload = json.loads(content)
             risk_raw = str(payload.get("risk", "")).lower()
             risk = self._map_risk(risk_raw)
             rationale = str(payload.get("rationale", "")).strip()
-            return risk, rationale
-        except json.JSONDecodeError:
+            return risk, rationale, self._parse_confidence(payload.get("confidence"))
+        except (json.JSONDecodeError, AttributeError):
             risk = self._map_risk(content.lower())
-            return risk, content.strip()
+            return risk, content.strip(), None
+
+    @staticmethod
+    def _parse_confidence(value) -> Optional[float]:
+        try:
+            confidence = float(value)
+        except (TypeError, ValueError):
+            return None
+        return min(1.0, max(0.0, confidence))
+
+    def assess_clauses_batched(
+        self, clauses: List[Clause], tracker: CascadeTracker | None = None
+    ) -> List[Tuple[Optional[RiskType], str]]:
+        """
+        여러 조항을 토큰 예산 안에서 한 요청으로 묶어 평가한다.
+        응답에서 빠지거나 형식이 잘못된 조항은 하나씩 다시 평가한다.
+        캐스케이드가 켜져 있으면 fast 모델 일괄 평가 후 상향 대상만 strong 모델로 다시 묶는다.
+        결과는 입력 순서를 따른다.
+        """
+        if self.api_key == "api필요":
+            return [(None, "api필요") for _ in clauses]
+        tracker = tracker or self.cascade_stats
+        verdicts, uncached = self._split_cached(clauses)
 
-    def filter_risky_clauses(self, clauses: list[Clause]) -> list[Clause]:
+        if self.cascade_enabled:
+            fast = self._run_batches(clauses, uncached, self.fast_model, "fast", tracker)
+            escalated = self._escalated_indexes(fast, tracker)
+            strong = self._run_batches(clauses, escalated, self.model, "strong", tracker)
+            for idx, verdict in fast.items():
+                if idx not in escalated:
+                    verdicts[idx] = verdict[:2]
+            for idx in escalated:
+                if idx in strong:
+                    verdicts[idx] = strong[idx][:2]
+            retry = [idx for idx in escalated if idx not in strong]
+            for idx, verdict in zip(
+                retry, self._assess_individually([clauses[i] for i in retry], tracker, strong_only=True)
+            ):
+                verdicts[idx] = verdict
+        else:
+            strong = self._run_batches(clauses, uncached, self.model, "strong", tracker)
+            for idx, verdict in strong.items():
+                verdicts[idx] = verdict[:2]
+        for idx in uncached:
+            if idx in verdicts:
+                self._store_verdict(clauses[idx], *verdicts[idx])
+
+        missing = [idx for idx in range(len(clauses)) if idx not in verdicts]
+        if missing:
+            print(f"RISK BATCH RETRY >>> {len(missing)} clauses assessed individually")
+            for idx, verdict in zip(
+                missing, self._assess_individually([clauses[i] for i in missing], tracker)
+            ):
+                verdicts[idx] = verdict
+        return [verdicts[idx] for idx in range(len(clauses))]
+
+    def _split_cached(
+        self, clauses: List[Clause]
+    ) -> Tuple[Dict[int, Tuple[Optional[RiskType], str]], List[int]]:
+        verdicts: Dict[int, Tuple[Optional[RiskType], str]] = {}
+        uncached: List[int] = []
+        for idx, clause in enumerate(clauses):
+            cached = self._cached_verdict(clause)
+            if cached is not None:
+                verdicts[idx] = cached
+            else:
+                uncached.append(idx)
+        return verdicts, uncached
+
+    def _escalated_indexes(self, fast: Dict[int, Verdict], tracker: CascadeTracker) -> List[int]:
+        escalated = [idx for idx, verdict in fast.items() if self._needs_escalation(verdict)]
+        tracker.record_decision(False, len(fast) - len(escalated))
+        tracker.record_decision(True, len(escalated))
+        return escalated
+
+    def _run_batches(
+        self,
+        clauses: List[Clause],
+        indexes: List[int],
+        model: str,
+        tier: str,
+        tracker: CascadeTracker,
+    ) -> Dict[int, Verdict]:
+        batches = self._pack_batches(clauses, indexes)
+        verdicts: Dict[int, Verdict] = {}
+        if not batches:
+            return verdicts
+        workers = max(1, min(self.batch_workers, len(batches)))
+        if workers <= 1:
+            for batch in batches:
+                verdicts.update(self._assess_batch(clauses, batch, model, tier, tracker))
+            return verdicts
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._assess_batch, clauses, batch, model, tier, tracker)
+                for batch in batches
+            ]
+            for future in as_completed(futures):
+                verdicts.update(future.result())
+        return verdicts
+
+    def _pack_batches(self, clauses: List[Clause], indexes: List[int]) -> List[List[int]]:
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_ids: set = set()
+        current_tokens = 0
+        for idx in indexes:
+            clause = clauses[idx]
+            tokens = estimate_tokens(clause.content)
+            if current and (
+                len(current) >= self.batch_size
+                or current_tokens + tokens > self.batch_token_budget
+                or clause.id in current_ids
+            ):
+                batches.append(current)
+                current, current_ids, current_tokens = [], set(), 0
+            current.append(idx)
+            current_ids.add(clause.id)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _assess_batch(
+        self,
+        clauses: List[Clause],
+        batch: List[int],
+        model: str,
+        tier: str,
+        tracker: CascadeTracker,
+    ) -> Dict[int, Verdict]:
+        prompt = self._batch_prompt(clauses, batch, tier)
+        start = time.perf_counter()
+        try:
+            response = call_openai(
+                self._client.chat.completions,
+                model=model,
+                tokens=estimate_tokens(prompt),
+                priority=self.priority,
+                messages=[{"role": "user", "content": prompt}],
+            )
+        except Exception as exc:
+            print("RISK BATCH ERROR >>>", repr(exc))
+            return {}
+        finally:
+            tracker.record_call(tier, time.perf_counter() - start)
+        return self._parse_batch_verdicts(clauses, batch, response.choices[0].message.content or "")
+
+    @staticmethod
+    def _batch_prompt(clauses: List[Clause], batch: List[int], tier: str) -> str:
+        parts = [f"[clause_id: {clauses[idx].id}]\n{clauses[idx].content}" for idx in batch]
+        confidence_field = ", \"confidence\": 0.0-1.0" if tier == "fast" else ""
+        return (
+            "You are a legal risk assistant. Assess the risk level of each clause below.\n"
+            "Return JSON only: a list of objects "
+            "[{\"clause_id\": \"...\", \"risk\": \"low|medium|high|critical\", \"rationale\": \"...\""
+            f"{confidence_field}}}], "
+            "one object per clause, using the clause_id exactly as given.\n"
+            "Write the rationale in Korean.\n"
+            "Clauses:\n" + "\n\n".join(parts)
+        )
+
+    def _parse_batch_verdicts(self, clauses: List[Clause], batch: List[int], content: str) -> Dict[int, Verdict]:
+        by_id = {clauses[idx].id: idx for idx in batch}
+        verdicts: Dict[int, Verdict] = {}
+        for item in self._parse_batch_payload(content):
+            idx = by_id.get(str(item.get("clause_id", "")).strip())
+            risk = self._map_risk(str(item.get("risk", "")).lower())
+            if idx is None or risk is None:
+                continue
+            verdicts[idx] = (
+                risk,
+                str(item.get("rationale", "")).strip(),
+                self._parse_confidence(item.get("confidence")),
+            )
+        return verdicts
+
+    @staticmethod
+    def _parse_batch_payload(content: str) -> List[dict]:
+        raw = content.strip()
+        if raw.startswith("```"):
+            raw = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", raw)
+        try:
+            payload = json.loads(raw)
+        except json.JSONDecodeError:
+            return []
+        if isinstance(payload, dict):
+            payload = payload.get("results") or payload.get("clauses") or []
+        if not isinstance(payload, list):
+            return []
+        return [item for item in payload if isinstance(item, dict)]
+
+    def _assess_individually(
+        self, clauses: List[Clause], tracker: CascadeTracker, strong_only: bool = False
+    ) -> List[Tuple[Optional[RiskType], str]]:
+        # 캐시는 이미 확인했으므로 바로 요청한다. strong_only면 상향된 조항이므로 fast 모델을 건너뛴다.
+        def _assess(clause: Clause) -> Tuple[Optional[RiskType], str]:
+            if strong_only:
+                risk, rationale, _ = self._request_clause_verdict(clause, self.model, "strong", tracker)
+            else:
+                risk, rationale = self._verdict_for(clause, tracker)
+            self._store_verdict(clause, risk, rationale)
+            return risk, rationale
+
+        workers = self.max_workers
+        if workers <= 1 or len(clauses) <= 1:
+            return [_assess(clause) for clause in clauses]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_assess, clauses))
+
+    def filter_risky_clauses(self, clauses: list[Clause], stats: Optional[dict] = None) -> list[Clause]:
+        """
+        stats가 주어지면 사전 필터 결과(건너뛴 조항 수 = 절약한 LLM 호출 수)와
+        캐스케이드 통계(계층별 지연, 상향 평가 비율)를 기록한다.
+        """
         risky: list[Clause] = []
         if not clauses:
             return risky
-        workers = int(os.getenv("RISK_ASSESSOR_WORKERS", "4"))
+        clauses = self._apply_prefilter(clauses, stats)
+        if not clauses:
+            return risky
+        tracker = CascadeTracker()
+        try:
+            return self._filter_with_llm(clauses, tracker)
+        finally:
+            self._record_tracker(tracker, stats)
+
+    def _record_tracker(self, tracker: CascadeTracker, stats: Optional[dict]) -> None:
+        self.cascade_stats.merge(tracker)
+        if stats is not None and tracker.tiers:
+            stats["cascade" if self.cascade_enabled else "llm"] = tracker.as_dict()
+
+    def _filter_with_llm(self, clauses: list[Clause], tracker: CascadeTracker) -> list[Clause]:
+        risky: list[Clause] = []
+        if self.batch_enabled:
+            verdicts = self.assess_clauses_batched(clauses, tracker)
+            for clause, (risk, rationale) in zip(clauses, verdicts):
+                clause.risk_level = risk
+                clause.risk_reason = rationale
+                if risk in (RiskType.MEDIUM, RiskType.HIGH, RiskType.CRITICAL):
+                    risky.append(clause)
+            return risky
+        workers = self.max_workers
         if workers <= 1:
             for clause in clauses:
-                risk, rationale = self.assess_clause(clause)
+                risk, rationale = self.assess_clause(clause, tracker)
                 clause.risk_level = risk
                 clause.risk_reason = rationale
                 if risk in (RiskType.MEDIUM, RiskType.HIGH, RiskType.CRITICAL):
@@ -62,7 +454,9 @@ class RiskAssessor:
             return risky
 
         with ThreadPoolExecutor(max_workers=workers) as executor:
-            future_map = {executor.submit(self.assess_clause, clause): clause for clause in clauses}
+            future_map = {
+                executor.submit(self.assess_clause, clause, tracker): clause for clause in clauses
+            }
             for future in as_completed(future_map):
                 clause = future_map[future]
                 risk, rationale = future.result()
@@ -72,6 +466,28 @@ class RiskAssessor:
                     risky.append(clause)
         return risky
 
+    def _apply_prefilter(self, clauses: List[Clause], stats: Optional[dict]) -> List[Clause]:
+        """명백한 저위험 조항은 LOW로 표시하고, LLM으로 보낼 조항만 반환한다."""
+        if not self.prefilter.enabled:
+            return clauses
+        remaining: List[Clause] = []
+        skipped = 0
+        for clause in clauses:
+            decision = self.prefilter.decide(clause)
+            if decision.skip:
+                clause.risk_level = RiskType.LOW
+                clause.risk_reason = f"사전 필터로 저위험 판정 ({decision.reason})"
+                skipped += 1
+            else:
+                remaining.append(clause)
+        if stats is not None:
+            stats["prefilter"] = {
+                "clauses": len(clauses),
+                "skipped": skipped,
+                "llm_calls_saved": skipped,
+            }
+        return remaining
+
     def _map_risk(self, value: str) -> Optional[RiskType]:
         if "critical" in value:
             return RiskType.CRITICAL
@@ -82,3 +498,190 @@ class RiskAssessor:
         if "low" in value:
             return RiskType.LOW
         return None
+
+
+class AsyncRiskAssessor(RiskAssessor):
+    """
+    RiskAssessor의 asyncio 버전 (AsyncOpenAI 기반).
+    조항/배치 요청을 스레드 없이 동시에 보내되 RISK_ASSESSOR_WORKERS / RISK_BATCH_WORKERS만큼만 동시에 진행하고,
+    속도는 공용 요청 제한기가 조절한다.
+    캐시/사전 필터/캐스케이드 동작은 동기 버전과 같다.
+    """
+
+    def _build_client(self):
+        # AsyncOpenAI 클라이언트는 호출 시점의 이벤트 루프에서 가져온다.
+        return None
+
+    async def assess_clause(
+        self, clause: Clause, tracker: CascadeTracker | None = None
+    ) -> Tuple[Optional[RiskType], str]:
+        if self.api_key == "api필요":
+            return None, "api필요"
+        cached = self._cached_verdict(clause)
+        if cached is not None:
+            return cached
+        risk, rationale = await self._verdict_for(clause, tracker or self.cascade_stats)
+        self._store_verdict(clause, risk, rationale)
+        return risk, rationale
+
+    async def _verdict_for(self, clause: Clause, tracker: CascadeTracker) -> Tuple[Optional[RiskType], str]:
+        if not self.cascade_enabled:
+            risk, rationale, _ = await self._request_clause_verdict(clause, self.model, "strong", tracker)
+            return risk, rationale
+        fast = await self._request_clause_verdict(clause, self.fast_model, "fast", tracker)
+        escalate = self._needs_escalation(fast)
+        tracker.record_decision(escalate)
+        if not escalate:
+            return fast[0], fast[1]
+        risk, rationale, _ = await self._request_clause_verdict(clause, self.model, "strong", tracker)
+        return risk, rationale
+
+    async def _request_clause_verdict(
+        self, clause: Clause, model: str, tier: str, tracker: CascadeTracker
+    ) -> Verdict:
+        prompt = self._clause_prompt(clause, tier)
+        start = time.perf_counter()
+        response = await call_openai_async(
+            get_async_openai_client(self.api_key).chat.completions,
+            model=model,
+            tokens=estimate_tokens(prompt),
+            priority=self.priority,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        tracker.record_call(tier, time.perf_counter() - start)
+        return self._parse_clause_verdict(response.choices[0].message.content or "")
+
+    async def assess_clauses_batched(
+        self, clauses: List[Clause], tracker: CascadeTracker | None = None
+    ) -> List[Tuple[Optional[RiskType], str]]:
+        if self.api_key == "api필요":
+            return [(None, "api필요") for _ in clauses]
+        tracker = tracker or self.cascade_stats
+        verdicts, uncached = self._split_cached(clauses)
+
+        if self.cascade_enabled:
+            fast = await self._run_batches(clauses, uncached, self.fast_model, "fast", tracker)
+            escalated = self._escalated_indexes(fast, tracker)
+            strong = await self._run_batches(clauses, escalated, self.model, "strong", tracker)
+            for idx, verdict in fast.items():
+                if idx not in escalated:
+                    verdicts[idx] = verdict[:2]
+            for idx in escalated:
+                if idx in strong:
+                    verdicts[idx] = strong[idx][:2]
+            retry = [idx for idx in escalated if idx not in strong]
+            for idx, verdict in zip(
+                retry,
+                await self._assess_individually([clauses[i] for i in retry], tracker, strong_only=True),
+            ):
+                verdicts[idx] = verdict
+        else:
+            strong = await self._run_batches(clauses, uncached, self.model, "strong", tracker)
+            for idx, verdict in strong.items():
+                verdicts[idx] = verdict[:2]
+        for idx in uncached:
+            if idx in verdicts:
+                self._store_verdict(clauses[idx], *verdicts[idx])
+
+        missing = [idx for idx in range(len(clauses)) if idx not in verdicts]
+        if missing:
+            print(f"RISK BATCH RETRY >>> {len(missing)} clauses assessed individually")
+            for idx, verdict in zip(
+                missing, await self._assess_individually([clauses[i] for i in missing], tracker)
+            ):
+                verdicts[idx] = verdict
+        return [verdicts[idx] for idx in range(len(clauses))]
+
+    async def _run_batches(
+        self,
+        clauses: List[Clause],
+        indexes: List[int],
+        model: str,
+        tier: str,
+        tracker: CascadeTracker,
+    ) -> Dict[int, Verdict]:
+        verdicts: Dict[int, Verdict] = {}
+        results = await self._gather_limited(
+            [
+                self._assess_batch(clauses, batch, model, tier, tracker)
+                for batch in self._pack_batches(clauses, indexes)
+            ],
+            self.batch_workers,
+        )
+        for result in results:
+            verdicts.update(result)
+        return verdicts
+
+    async def _assess_batch(
+        self,
+        clauses: List[Clause],
+        batch: List[int],
+        model: str,
+        tier: str,
+        tracker: CascadeTracker,
+    ) -> Dict[int, Verdict]:
+        prompt = self._batch_prompt(clauses, batch, tier)
+        start = time.perf_counter()
+        try:
+            response = await call_openai_async(
+                get_async_openai_client(self.api_key).chat.completions,
+                model=model,
+                tokens=estimate_tokens(prompt),
+                priority=self.priority,
+                messages=[{"role": "user", "content": prompt}],
+            )
+        except Exception as exc:
+            print("RISK BATCH ERROR >>>", repr(exc))
+            return {}
+        finally:
+            tracker.record_call(tier, time.perf_counter() - start)
+        return self._parse_batch_verdicts(clauses, batch, response.choices[0].message.content or "")
+
+    async def _assess_individually(
+        self, clauses: List[Clause], tracker: CascadeTracker, strong_only: bool = False
+    ) -> List[Tuple[Optional[RiskType], str]]:
+        # 캐시는 이미 확인했으므로 바로 요청한다. strong_only면 상향된 조항이므로 fast 모델을 건너뛴다.
+        async def _assess(clause: Clause) -> Tuple[Optional[RiskType], str]:
+            if strong_only:
+                risk, rationale, _ = await self._request_clause_verdict(clause, self.model, "strong", tracker)
+            else:
+                risk, rationale = await self._verdict_for(clause, tracker)
+            self._store_verdict(clause, risk, rationale)
+            return risk, rationale
+
+        return await self._gather_limited([_assess(clause) for clause in clauses], self.max_workers)
+
+    @staticmethod
+    async def _gather_limited(coros: List[Awaitable], workers: int) -> List:
+        """동기 버전의 스레드 수처럼 동시에 진행하는 요청 수를 workers로 제한한다."""
+        semaphore = asyncio.Semaphore(max(1, workers))
+
+        async def _run(coro: Awaitable):
+            async with semaphore:
+                return await coro
+
+        return list(await asyncio.gather(*[_run(coro) for coro in coros]))
+
+    async def filter_risky_clauses(self, clauses: list[Clause], stats: Optional[dict] = None) -> list[Clause]:
+        risky: list[Clause] = []
+        if not clauses:
+            return risky
+        clauses = self._apply_prefilter(clauses, stats)
+        if not clauses:
+            return risky
+        tracker = CascadeTracker()
+        try:
+            if self.batch_enabled:
+                verdicts = await self.assess_clauses_batched(clauses, tracker)
+            else:
+                verdicts = await self._gather_limited(
+                    [self.assess_clause(clause, tracker) for clause in clauses], self.max_workers
+                )
+        finally:
+            self._record_tracker(tracker, stats)
+        for clause, (risk, rationale) in zip(clauses, verdicts):
+            clause.risk_level = risk
+            clause.risk_reason = rationale
+            if risk in (RiskType.MEDIUM, RiskType.HIGH, RiskType.CRITICAL):
+                risky.append(clause)
+        return risky
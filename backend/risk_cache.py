@@ -0,0 +1,128 @@
+"""
+조항 위험 판정 캐시 (정규화된 조항 내용 + 모델 + 프롬프트 버전 기반, 항목 수 제한 LRU)
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from clause_diff import normalize_clause_text
+
+
+class RiskVerdictCache:
+    """
+    같은 문구의 조항(보증금/기간/원상복구 등 표준 조항)에 대한 판정을 SQLite 파일에 저장한다.
+    항목 수가 max_entries를 넘으면 가장 오래 사용되지 않은 항목부터 제거한다.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_entries: int | None = None,
+        ttl_seconds: int | None = None,
+    ) -> None:
+        self.path = path or os.getenv("RISK_CACHE_PATH") or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "cache", "risk_cache.sqlite3"
+        )
+        self.max_entries = (
+            max_entries
+            if max_entries is not None
+            else int(os.getenv("RISK_CACHE_MAX_ENTRIES") or "50000")
+        )
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else int(os.getenv("RISK_CACHE_TTL_SECONDS") or "0")
+        )
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS risk_cache (
+              cache_key TEXT PRIMARY KEY,
+              risk TEXT NOT NULL,
+              rationale TEXT NOT NULL,
+              created_at REAL NOT NULL,
+              last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_risk_cache_access ON risk_cache (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def build_key(clause_text: str, model: str, prompt_version: str) -> str:
+        content_hash = hashlib.sha256(normalize_clause_text(clause_text).encode("utf-8")).hexdigest()
+        raw = "\x1f".join([content_hash, model or "", prompt_version or ""])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT risk, rationale, created_at FROM risk_cache WHERE cache_key=?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl_seconds > 0 and row[2] < now - self.ttl_seconds):
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE risk_cache SET last_access=? WHERE cache_key=?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0], row[1]
+
+    def set(self, key: str, risk: str, rationale: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO risk_cache (cache_key, risk, rationale, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, risk, rationale, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        if self.max_entries <= 0:
+            return
+        total = self._conn.execute("SELECT COUNT(*) FROM risk_cache").fetchone()[0]
+        if total <= self.max_entries:
+            return
+        self._conn.execute(
+            """
+            DELETE FROM risk_cache WHERE cache_key IN (
+              SELECT cache_key FROM risk_cache ORDER BY last_access ASC LIMIT ?
+            )
+            """,
+            (total - self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM risk_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM risk_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,210 @@
+"""
+3단계 사전 필터: 키워드 규칙 + 문자 n-gram 선형 모델로 명백한 저위험 조항은 LLM 평가를 건너뛴다
+"""
+
+import json
+import math
+import os
+import random
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from clause_diff import normalize_clause_text
+from models import Clause
+
+
+@dataclass
+class PrefilterDecision:
+    """skip=True면 LLM 없이 저위험으로 처리한다."""
+    skip: bool
+    score: Optional[float]              # 선형 모델의 위험 확률 (모델이 없으면 None)
+    reason: str
+
+
+class CharNgramModel:
+    """
+    해시된 문자 n-gram 특징의 로지스틱 회귀 (CPU 전용, 외부 패키지 없음).
+    가중치는 0이 아닌 것만 JSON으로 저장한다.
+    """
+
+    def __init__(
+        self,
+        n_features: int = 1 << 18,
+        ngram_range: Tuple[int, int] = (2, 3),
+        weights: Optional[Dict[int, float]] = None,
+        bias: float = 0.0,
+    ) -> None:
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.weights: Dict[int, float] = weights or {}
+        self.bias = bias
+
+    def features(self, text: str) -> Dict[int, float]:
+        text = normalize_clause_text(text)
+        counts: Dict[int, float] = {}
+        low, high = self.ngram_range
+        for size in range(low, high + 1):
+            for start in range(0, max(0, len(text) - size + 1)):
+                gram = text[start : start + size]
+                idx = zlib.crc32(gram.encode("utf-8")) % self.n_features
+                counts[idx] = counts.get(idx, 0.0) + 1.0
+        norm = math.sqrt(sum(value * value for value in counts.values()))
+        if norm:
+            for idx in counts:
+                counts[idx] /= norm
+        return counts
+
+    def predict_proba(self, text: str) -> float:
+        return self._proba(self.features(text))
+
+    def _proba(self, features: Dict[int, float]) -> float:
+        z = self.bias + sum(self.weights.get(idx, 0.0) * value for idx, value in features.items())
+        z = max(-30.0, min(30.0, z))
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def fit(
+        self,
+        samples: List[Tuple[str, int]],
+        epochs: int = 10,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        seed: int = 13,
+    ) -> None:
+        """SGD 로지스틱 회귀. label 1 = 위험(medium 이상), 0 = 저위험."""
+        rows = [(self.features(text), label) for text, label in samples if text]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(rows)
+            rate = learning_rate / (1.0 + epoch)
+            for features, label in rows:
+                error = self._proba(features) - label
+                self.bias -= rate * error
+                for idx, value in features.items():
+                    weight = self.weights.get(idx, 0.0)
+                    self.weights[idx] = weight - rate * (error * value + l2 * weight)
+        self.weights = {idx: w for idx, w in self.weights.items() if abs(w) > 1e-6}
+
+    def to_dict(self) -> dict:
+        return {
+            "n_features": self.n_features,
+            "ngram_range": list(self.ngram_range),
+            "bias": self.bias,
+            "weights": {str(idx): weight for idx, weight in self.weights.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CharNgramModel":
+        return cls(
+            n_features=int(data.get("n_features") or 1 << 18),
+            ngram_range=tuple(data.get("ngram_range") or (2, 3)),
+            weights={int(idx): float(w) for idx, w in (data.get("weights") or {}).items()},
+            bias=float(data.get("bias") or 0.0),
+        )
+
+
+class RiskPrefilter:
+    """
+    1) 위험 키워드가 있으면 항상 LLM으로 보낸다.
+    2) 부동산의 표시/서명란 같은 규칙에 걸리면 건너뛴다.
+    3) 학습된 모델의 위험 확률이 skip_below 미만이면 건너뛴다.
+    """
+
+    RISK_KEYWORDS = (
+        "위약금", "배액", "몰취", "몰수", "포기", "일체", "책임지지", "책임을지지", "원상복구",
+        "원상회복", "즉시해지", "즉시해제", "손해배상", "임의로", "청구할수없", "이의를제기하지",
+        "반환하지", "지체상금", "연체", "가산", "공제", "귀속", "면책",
+    )
+    BENIGN_RULES = (
+        ("property_description", re.compile(r"^(?:부동산의?표시|임대할부분|소재지|토지|건물|지목|면적|구조|용도)")),
+        # 서명란은 조항 첫머리에서 시작하고 짧은 경우만 (본문에서 주소/연락처를 언급하는 조항은 LLM으로 보낸다)
+        (
+            "signature_block",
+            re.compile(
+                r"^(?=.{0,150}$)(?:임대인|임차인|개업공인중개사|중개업자|대리인)?"
+                r"(?:성명|주소|주민등록번호|연락처|전화|서명|날인|\(인\)|사업자등록번호)",
+                re.S,
+            ),
+        ),
+        ("contract_date", re.compile(r"^(?:계약일|작성일|\d{4}년\d{1,2}월\d{1,2}일)")),
+    )
+    OBLIGATION_PATTERN = re.compile(r"(?:하여야|해야|한다|할수|없다|아니한다|지급|부담|책임)")
+
+    def __init__(
+        self,
+        model_path: str | None = None,
+        skip_below: float | None = None,
+        enabled: bool | None = None,
+    ) -> None:
+        self.enabled = (
+            enabled
+            if enabled is not None
+            else (os.getenv("RISK_PREFILTER_ENABLED") or "").lower() in ("1", "true", "yes", "y")
+        )
+        self.model_path = model_path or os.getenv("RISK_PREFILTER_MODEL_PATH") or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "cache", "risk_prefilter.json"
+        )
+        self.skip_below = (
+            skip_below
+            if skip_below is not None
+            else float(os.getenv("RISK_PREFILTER_SKIP_BELOW") or "0.1")
+        )
+        self.model: Optional[CharNgramModel] = self._load_model() if self.enabled else None
+
+    def decide(self, clause: Clause) -> PrefilterDecision:
+        text = normalize_clause_text(f"{clause.title}\n{clause.content}")
+        if not self.enabled or not text:
+            return PrefilterDecision(skip=False, score=None, reason="disabled")
+        matched = next((kw for kw in self.RISK_KEYWORDS if kw in text), None)
+        if matched:
+            return PrefilterDecision(skip=False, score=None, reason=f"keyword:{matched}")
+        body = normalize_clause_text(clause.content)
+        for name, pattern in self.BENIGN_RULES:
+            if pattern.search(text) and not self.OBLIGATION_PATTERN.search(body):
+                return PrefilterDecision(skip=True, score=None, reason=f"rule:{name}")
+        if self.model is None:
+            return PrefilterDecision(skip=False, score=None, reason="no_model")
+        score = self.model.predict_proba(f"{clause.title}\n{clause.content}")
+        if score < self.skip_below:
+            return PrefilterDecision(skip=True, score=score, reason="model")
+        return PrefilterDecision(skip=False, score=score, reason="model")
+
+    def train(self, samples: Iterable[Tuple[str, int]], **fit_kwargs) -> dict:
+        samples = [(text, int(label)) for text, label in samples if text]
+        model = CharNgramModel()
+        model.fit(samples, **fit_kwargs)
+        self.model = model
+        positives = sum(label for _, label in samples)
+        return {
+            "samples": len(samples),
+            "positives": positives,
+            "negatives": len(samples) - positives,
+            "features": len(model.weights),
+        }
+
+    def save(self, path: str | None = None, metadata: Optional[dict] = None) -> str:
+        if self.model is None:
+            raise RuntimeError("학습된 사전 필터 모델이 없습니다.")
+        path = path or self.model_path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        payload = {"trained_at": time.time(), "metadata": metadata or {}, "model": self.model.to_dict()}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle)
+        os.replace(tmp_path, path)
+        return path
+
+    def _load_model(self) -> Optional[CharNgramModel]:
+        if not os.path.exists(self.model_path):
+            return None
+        try:
+            with open(self.model_path, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            return CharNgramModel.from_dict(payload.get("model") or {})
+        except (OSError, ValueError) as exc:
+            print("RISK PREFILTER LOAD ERROR >>>", repr(exc))
+            return None
@@ -0,0 +1,121 @@
+"""
+동일 요청 병합 (single-flight): 같은 키의 호출이 진행 중이면 새로 실행하지 않고 그 결과를 함께 받는다.
+"""
+
+import asyncio
+import copy
+import os
+import weakref
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    프로세스 전체에서 같은 키(예: 같은 판례 검색어)의 동시 호출을 하나로 합친다.
+    결과가 리스트면 먼저 온 호출을 포함한 모든 호출에 리스트와 항목을 얕은 복사해 넘겨,
+    호출부가 리스트에 항목을 덧붙이거나 항목 속성(embedding 등)을 바꿔도 서로 영향을 주지 않게 한다.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.coalesced = 0
+        self._calls: Dict[Hashable, Future] = {}
+        # asyncio Future는 이벤트 루프에 묶이므로 루프별로 둔다.
+        self._async_calls: "weakref.WeakKeyDictionary[Any, Dict[Hashable, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(결과, 병합 여부)를 반환한다. 먼저 온 호출의 예외는 기다리던 호출에도 전달된다."""
+        with self._lock:
+            self.calls += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.coalesced += 1
+        if not leader:
+            return self._copy_result(future.result()), True
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            # 기다리는 호출은 future의 원본을 복사하므로 먼저 온 호출도 복사본을 받는다.
+            return self._copy_result(result), False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """do의 asyncio 버전"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._async_calls.setdefault(loop, {})
+            self.calls += 1
+            future = calls.get(key)
+            leader = future is None
+            if leader:
+                future = loop.create_future()
+                # 기다리는 호출이 없을 때 예외 미확인 경고가 나지 않도록 한다.
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                calls[key] = future
+            else:
+                self.coalesced += 1
+        if not leader:
+            return self._copy_result(await asyncio.shield(future)), True
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            # 기다리는 호출은 future의 원본을 복사하므로 먼저 온 호출도 복사본을 받는다.
+            return self._copy_result(result), False
+        finally:
+            with self._lock:
+                calls.pop(key, None)
+
+    @staticmethod
+    def _copy_result(result: Any) -> Any:
+        if isinstance(result, list):
+            return [copy.copy(item) for item in result]
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            calls, coalesced = self.calls, self.coalesced
+            in_flight = len(self._calls) + sum(len(c) for c in self._async_calls.values())
+        return {
+            "calls": calls,
+            "coalesced": coalesced,
+            "coalesced_rate": coalesced / calls if calls else 0.0,
+            "in_flight": in_flight,
+        }
+
+
+_FLIGHTS: Optional[SingleFlight] = None
+_FLIGHTS_LOCK = Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """판례/법령 검색용 공용 SingleFlight. REFERENCE_SINGLE_FLIGHT_ENABLED=0이면 None."""
+    global _FLIGHTS
+    if (os.getenv("REFERENCE_SINGLE_FLIGHT_ENABLED") or "1").lower() not in ("1", "true", "yes", "y"):
+        return None
+    if _FLIGHTS is None:
+        with _FLIGHTS_LOCK:
+            if _FLIGHTS is None:
+                _FLIGHTS = SingleFlight()
+    return _FLIGHTS
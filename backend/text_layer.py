@@ -0,0 +1,99 @@
+"""
+1단계 전처리: 디지털 PDF의 내장 텍스트 레이어 추출 및 품질 판정
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass
+class PageText:
+    """페이지별 텍스트 레이어 추출 결과"""
+    index: int
+    text: str
+    usable: bool
+    has_images: bool = False
+    reason: str = ""
+
+
+class TextLayerExtractor:
+    """
+    pypdf로 페이지별 텍스트를 추출하고, 한글 비율/깨진 문자 수를 기준으로
+    OCR 없이 사용할 수 있는지 판정한다.
+    """
+
+    CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+    def __init__(self) -> None:
+        self.enabled = (os.getenv("OCR_TEXT_LAYER_ENABLED") or "1").lower() in (
+            "1",
+            "true",
+            "yes",
+            "y",
+        )
+        self.min_chars = int(os.getenv("OCR_TEXT_LAYER_MIN_CHARS") or "30")
+        self.min_hangul_ratio = float(os.getenv("OCR_TEXT_LAYER_MIN_HANGUL_RATIO") or "0.3")
+        self.max_broken_ratio = float(os.getenv("OCR_TEXT_LAYER_MAX_BROKEN_RATIO") or "0.02")
+
+    def extract_pages(self, file_path: str) -> Optional[List[PageText]]:
+        """
+        PDF가 아니거나 pypdf가 없거나 파일을 읽을 수 없으면 None을 반환한다.
+        """
+        if not self.enabled or not file_path.lower().endswith(".pdf"):
+            return None
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            return None
+        try:
+            reader = PdfReader(file_path)
+            pages: List[PageText] = []
+            for idx, page in enumerate(reader.pages):
+                text = page.extract_text() or ""
+                usable, reason = self.assess_quality(text)
+                pages.append(
+                    PageText(
+                        index=idx,
+                        text=text,
+                        usable=usable,
+                        has_images=self._has_images(page),
+                        reason=reason,
+                    )
+                )
+            return pages
+        except Exception:
+            return None
+
+    def assess_quality(self, text: str) -> tuple[bool, str]:
+        stripped = re.sub(r"\s+", "", text or "")
+        if len(stripped) < self.min_chars:
+            return False, "too_short"
+        broken = stripped.count("\ufffd") + len(self.CID_PATTERN.findall(stripped))
+        broken += sum(1 for ch in stripped if "\ue000" <= ch <= "\uf8ff")
+        if broken / len(stripped) > self.max_broken_ratio:
+            return False, "broken_chars"
+        letters = [ch for ch in stripped if ch.isalpha()]
+        if not letters:
+            return False, "no_letters"
+        hangul = sum(1 for ch in letters if "가" <= ch <= "힣")
+        if hangul / len(letters) < self.min_hangul_ratio:
+            return False, "low_hangul_ratio"
+        return True, ""
+
+    @staticmethod
+    def _has_images(page) -> bool:
+        try:
+            resources = page.get("/Resources")
+            resources = resources.get_object() if resources is not None else None
+            xobjects = resources.get("/XObject") if resources else None
+            xobjects = xobjects.get_object() if xobjects is not None else None
+            if not xobjects:
+                return False
+            for ref in xobjects.values():
+                if ref.get_object().get("/Subtype") == "/Image":
+                    return True
+        except Exception:
+            return True
+        return False
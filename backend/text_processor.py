@@ -2,16 +2,20 @@
 2단계: 텍스트 정제 및 조항 분리
 """
 
-import json
 import re
-from typing import List
+from typing import Callable, List, Optional
 
-from openai_client import chat_completion
+from clause_tokenizer import ArticleNode, ClauseTokenizer
+from layout_clause_extractor import LayoutClauseExtractor
+from llm_clause_splitter import LLMClauseSplitter
 from models import Clause
 
 
 class TextProcessor:
     """텍스트 정제 및 조항 분리"""
+
+    tokenizer = ClauseTokenizer()
+    layout_extractor = LayoutClauseExtractor()
     
     @staticmethod
     def clean_text(text: str) -> str:
@@ -33,79 +37,56 @@ class TextProcessor:
     def split_clauses(text: str) -> List[Clause]:
         """
         조항 분리
-        
+
         예상 형식:
         제1조 제목
         조항 내용...
-        
-        제2조 제목
-        조항 내용...
+
+        제2조(제목) 조항 내용...
+        ① 항 내용 1. 호 내용
+
+        단일 패스 토크나이저(ClauseTokenizer)로 "제n조"/"제n조의m" 경계를 찾는다.
         """
-        clauses = []
-        
-        # "제n조" 패턴으로 분리 (괄호 제목/공백 변형 허용)
-        clause_pattern = r'제\s*(\d+)\s*조\s*(?:\((.*?)\))?\s*(.+?)(?=제\s*\d+\s*조|$)'
-        matches = re.finditer(clause_pattern, text, re.DOTALL)
-        
-        for match in matches:
-            clause_num = match.group(1)
-            title_raw = (match.group(2) or "").strip()
-            body_raw = match.group(3).strip()
+        return TextProcessor.tokenizer.to_clauses(text)
 
-            # 괄호 제목이 없으면 첫 줄을 제목 후보로 사용
-            title = title_raw
-            content = body_raw
-            if not title:
-                lines = body_raw.split('\n', 1)
-                title = lines[0].strip()
-                content = lines[1].strip() if len(lines) > 1 else ""
-            
-            clause = Clause(
-                id=f"clause_{clause_num}",
-                article_num=f"제{clause_num}조",
-                title=title,
-                content=content
-            )
-            clauses.append(clause)
-        
-        return clauses
+    @staticmethod
+    def tokenize_clauses(text: str) -> List[ArticleNode]:
+        """조 → 항 → 호 트리 (문자 오프셋 포함)"""
+        return TextProcessor.tokenizer.tokenize(text)
 
-    def split_clauses_with_fallback(self, text: str) -> List[Clause]:
+    def split_clauses_with_fallback(
+        self,
+        text: str,
+        html_loader: Optional[Callable[[], Optional[str]]] = None,
+    ) -> List[Clause]:
         """
-        규칙 기반 분리가 실패하거나 품질이 낮을 때 LLM 보정 분리를 시도한다.
+        규칙 기반 분리가 실패하거나 품질이 낮을 때
+        1) Document Parse HTML 구조(제목/표/읽기 순서) 기반 분리
+        2) LLM 보정 분리
+        순서로 시도한다. html_loader는 필요할 때만 호출된다.
         """
         clauses = self.split_clauses(text)
-        if clauses and not (len(clauses) == 1 and len(text) > 1000):
+        if self._is_acceptable(clauses, text):
             return clauses
+        if html_loader is not None:
+            html = html_loader()
+            layout_clauses = self.layout_extractor.extract_from_html(html or "")
+            if self._is_acceptable(layout_clauses, text):
+                return layout_clauses
         return self._split_clauses_with_llm(text, fallback=clauses)
 
+    @staticmethod
+    def _is_acceptable(clauses: List[Clause], text: str) -> bool:
+        return bool(clauses) and not (len(clauses) == 1 and len(text) > 1000)
+
     def _split_clauses_with_llm(
         self,
         text: str,
         fallback: List[Clause],
     ) -> List[Clause]:
-        prompt = (
-            "Split the following Korean contract into clauses. "
-            "Return JSON only as a list of objects with keys: article_num, title, content. "
-            "article_num should be like '제1조' if present, otherwise use '조항N'. "
-            "Do not omit any content. Respond in Korean.\n\n"
-            f"{text}"
-        )
+        """긴 계약서는 겹치는 청크로 나눠 병렬 분리한다 (LLMClauseSplitter)."""
         try:
-            content = chat_completion(prompt=prompt, model="gpt-4o")
-            payload = json.loads(content)
-            clauses: List[Clause] = []
-            for idx, item in enumerate(payload, start=1):
-                article_num = str(item.get("article_num") or f"조항{idx}").strip()
-                title = str(item.get("title") or "무제").strip()
-                body = str(item.get("content") or "").strip()
-                clause = Clause(
-                    id=f"clause_{idx}",
-                    article_num=article_num,
-                    title=title,
-                    content=body,
-                )
-                clauses.append(clause)
-            return clauses or fallback
-        except Exception:
+            return LLMClauseSplitter().split(text) or fallback
+        except Exception as exc:
+            print("CLAUSE LLM SPLIT ERROR >>>", repr(exc))
             return fallback
@@ -0,0 +1,98 @@
+"""
+조항 분리 벤치마크: 기존 lazy 정규식 vs ClauseTokenizer
+
+backend 폴더에서 실행:
+    python -m tools.bench_clause_tokenizer
+"""
+
+import os
+import random
+import re
+import time
+from pathlib import Path
+
+from clause_tokenizer import ClauseTokenizer
+from text_layer import TextLayerExtractor
+
+# 토크나이저 도입 전 TextProcessor.split_clauses의 패턴
+LEGACY_PATTERN = r'제\s*(\d+)\s*조\s*(?:\((.*?)\))?\s*(.+?)(?=제\s*\d+\s*조|$)'
+
+NOISE = ["", " ", "  ", "\n", "·", "ㅡ", "(인)", "  |  ", "○○"]
+SENTENCES = [
+    "임차인은 임대인의 동의 없이 목적물을 전대할 수 없다.",
+    "보증금은 계약 종료 후 7일 이내에 반환한다.",
+    "임대인은 제3조에 따라 수선 의무를 부담한다.",
+    "차임은 매월 말일까지 지정 계좌로 지급한다.",
+    "원상복구 비용은 실제 발생한 금액으로 한다.",
+]
+
+
+def legacy_split(text: str) -> int:
+    return sum(1 for _ in re.finditer(LEGACY_PATTERN, text, re.DOTALL))
+
+
+def synthetic_contract(num_clauses: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    parts = ["부동산 임대차 계약서\n"]
+    for idx in range(1, num_clauses + 1):
+        suffix = f"의{rng.randint(2, 3)}" if idx % 25 == 0 else ""
+        parts.append(f"제{idx}조{suffix}(조항 {idx}) {rng.choice(SENTENCES)}{rng.choice(NOISE)}\n")
+        for para in "①②③"[: rng.randint(1, 3)]:
+            parts.append(f"{para} {rng.choice(SENTENCES)}{rng.choice(NOISE)}\n")
+            for item in range(1, rng.randint(1, 4)):
+                parts.append(f"{item}. {rng.choice(SENTENCES)}{rng.choice(NOISE)}\n")
+    return "".join(parts)
+
+
+def sample_texts() -> dict:
+    texts = {}
+    extractor = TextLayerExtractor()
+    for path in sorted(Path(".").glob("*.pdf")):
+        pages = extractor.extract_pages(str(path))
+        if pages:
+            texts[path.name] = "\n".join(page.text for page in pages)
+    return texts
+
+
+def timed(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    tokenizer = ClauseTokenizer()
+    repeat = int(os.getenv("BENCH_REPEAT", "5"))
+
+    print("== sample contracts ==")
+    for name, text in sample_texts().items():
+        legacy = timed(legacy_split, text, repeat)
+        new = timed(tokenizer.tokenize, text, repeat)
+        print(
+            f"{name[:40]:40s} chars={len(text):6d} "
+            f"clauses={len(tokenizer.tokenize(text)):3d} "
+            f"legacy={legacy * 1000:8.3f}ms tokenizer={new * 1000:8.3f}ms"
+        )
+
+    print("== synthetic contracts ==")
+    print(
+        f"{'clauses':>8s} {'chars':>9s} {'legacy_n':>9s} {'tok_n':>6s} "
+        f"{'legacy_ms':>10s} {'tok_ms':>9s} {'tok_us/kchar':>13s}"
+    )
+    for num_clauses in (50, 100, 250, 500, 1000):
+        text = synthetic_contract(num_clauses)
+        legacy = timed(legacy_split, text, repeat)
+        new = timed(tokenizer.tokenize, text, repeat)
+        per_kchar = new * 1e6 / (len(text) / 1000)
+        print(
+            f"{num_clauses:8d} {len(text):9d} {legacy_split(text):9d} "
+            f"{len(tokenizer.tokenize(text)):6d} {legacy * 1000:10.2f} "
+            f"{new * 1000:9.2f} {per_kchar:13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
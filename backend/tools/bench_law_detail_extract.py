@@ -0,0 +1,150 @@
+"""
+법령 상세 본문 추출 벤치마크: 기존 재귀 수집 후 자르기 vs 스택 순회 + 조기 종료
+
+backend 폴더에서 실행:
+    python -m tools.bench_law_detail_extract [--cache-limit 5]
+
+DRF 응답 캐시(DRF_CACHE_PATH)에 저장된 법령 상세 payload 중 큰 것부터, 그리고 합성 법령(조문 수별)을
+대상으로 추출 시간(최소값)과 tracemalloc 최대 메모리를 잰다. payload JSON 디코딩 시간은 따로 표시한다.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+import tracemalloc
+from typing import List
+
+from law_fetcher import LawFetcher
+
+# 조기 종료 도입 전 LawFetcher._extract_detail_text
+LEGACY_KEYS = {
+    "조문내용",
+    "내용",
+    "본문",
+    "조문제목",
+    "법령명",
+    "법령명한글",
+    "행정규칙명",
+    "자치법규명",
+    "규칙명",
+}
+SENTENCE = "임차인은 임대인의 동의 없이 목적물을 전대할 수 없으며, 보증금은 계약 종료 후 반환한다."
+
+
+def legacy_extract(payload: dict, max_text_chars: int) -> str:
+    texts: List[str] = []
+
+    def walk(obj: object) -> None:
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                if key in LEGACY_KEYS and isinstance(value, str):
+                    texts.append(value)
+                else:
+                    walk(value)
+        elif isinstance(obj, list):
+            for item in obj:
+                walk(item)
+
+    walk(payload)
+    merged = "\n".join([t.strip() for t in texts if t and t.strip()])
+    merged = LawFetcher._clean_text(merged)
+    if max_text_chars > 0 and len(merged) > max_text_chars:
+        return merged[:max_text_chars]
+    return merged
+
+
+def synthetic_statute(num_articles: int) -> dict:
+    units = []
+    for idx in range(1, num_articles + 1):
+        units.append(
+            {
+                "조문번호": str(idx),
+                "조문여부": "조문",
+                "조문제목": f"조문 {idx}",
+                "조문내용": f"제{idx}조(조문 {idx})",
+                "항": [
+                    {
+                        "항번호": para,
+                        "항내용": f"{para} {SENTENCE}",
+                        "호": [{"호번호": f"{item}.", "호내용": f"{item}. {SENTENCE}"} for item in range(1, 4)],
+                    }
+                    for para in "①②③"
+                ],
+            }
+        )
+    return {"법령": {"기본정보": {"법령명_한글": "합성법"}, "조문": {"조문단위": units}}}
+
+
+def cached_payloads(limit: int) -> List[tuple]:
+    path = os.getenv("DRF_CACHE_PATH") or os.path.join("cache", "drf_cache.sqlite3")
+    if limit <= 0 or not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT cache_key, payload FROM drf_cache WHERE payload LIKE '%조문단위%' "
+            "ORDER BY LENGTH(payload) DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [(f"cache:{key[:10]}", raw) for key, raw in rows]
+
+
+def timed(func, payload: dict, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_kib(func, payload: dict) -> float:
+    tracemalloc.start()
+    try:
+        func(payload)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cache-limit", type=int, default=5, help="DRF 캐시에서 가져올 큰 법령 payload 수")
+    parser.add_argument("--repeat", type=int, default=int(os.getenv("BENCH_REPEAT", "5")))
+    args = parser.parse_args()
+
+    fetcher = LawFetcher(store=None, response_cache=None)
+    limit = fetcher.max_text_chars
+
+    def legacy(payload: dict) -> str:
+        return legacy_extract(payload, limit)
+
+    samples = cached_payloads(args.cache_limit)
+    for num_articles in (100, 500, 2000, 5000):
+        samples.append((f"synthetic:{num_articles}", json.dumps(synthetic_statute(num_articles), ensure_ascii=False)))
+
+    print(f"LAW_DETAIL_TEXT_LIMIT={limit}")
+    print(
+        f"{'payload':>18s} {'json_kb':>8s} {'decode_ms':>10s} {'legacy_ms':>10s} {'new_ms':>8s} "
+        f"{'legacy_kib':>11s} {'new_kib':>8s} {'same':>5s}"
+    )
+    for name, raw in samples:
+        start = time.perf_counter()
+        payload = json.loads(raw)
+        decode = time.perf_counter() - start
+        legacy_ms = timed(legacy, payload, args.repeat) * 1000
+        new_ms = timed(fetcher._extract_detail_text, payload, args.repeat) * 1000
+        same = legacy(payload) == fetcher._extract_detail_text(payload)
+        print(
+            f"{name:>18s} {len(raw.encode('utf-8')) / 1024:8.0f} {decode * 1000:10.2f} "
+            f"{legacy_ms:10.3f} {new_ms:8.3f} {peak_kib(legacy, payload):11.1f} "
+            f"{peak_kib(fetcher._extract_detail_text, payload):8.1f} {str(same):>5s}"
+        )
+
+
+if __name__ == "__main__":
+    main()
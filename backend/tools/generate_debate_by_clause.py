@@ -1,16 +1,11 @@
 ﻿import json
 import os
-import time
 from pathlib import Path
 
 from debate_agents import DebateAgents
+from llm_rate_limiter import get_rate_limiter
 from models import Clause
 
-try:
-    from openai import RateLimitError
-except Exception:  # pragma: no cover
-    RateLimitError = Exception
-
 
 def _build_clauses(risky_items):
     clauses = []
@@ -49,48 +44,40 @@ def main():
     if not clauses:
         raise SystemExit('no risky clauses')
 
-    batch_size = int(os.getenv('DEBATE_BATCH_SIZE', '2'))
-    sleep_sec = float(os.getenv('DEBATE_SLEEP_SEC', '2'))
-    retry_sleep = float(os.getenv('DEBATE_RETRY_SLEEP_SEC', '5'))
-
-    agents = DebateAgents()
+    # 429 대기/재시도와 속도 조절은 공용 요청 제한기가 맡는다 (분석 요청보다 뒤에 처리).
+    agents = DebateAgents(priority='batch')
     contract_type = agents.detect_contract_type(raw_text)
 
     results = []
-    for i, clause in enumerate(clauses, start=1):
-        while True:
-            try:
-                transcript = agents.run(
-                    [clause],
-                    raw_text=raw_text,
-                    contract_type=contract_type,
-                )
-                results.append(
-                    {
-                        'clause_id': clause.id,
-                        'article_num': clause.article_num,
-                        'title': clause.title,
-                        'transcript': transcript,
-                    }
-                )
-                break
-            except RateLimitError:
-                time.sleep(retry_sleep)
-            except Exception as exc:  # keep moving; store error marker
-                results.append(
-                    {
-                        'clause_id': clause.id,
-                        'article_num': clause.article_num,
-                        'title': clause.title,
-                        'transcript': [
-                            {
-                                'speaker': 'system',
-                                'content': f'error: {exc}',
-                            }
-                        ],
-                    }
-                )
-                break
+    for clause in clauses:
+        try:
+            transcript = agents.run(
+                [clause],
+                raw_text=raw_text,
+                contract_type=contract_type,
+            )
+            results.append(
+                {
+                    'clause_id': clause.id,
+                    'article_num': clause.article_num,
+                    'title': clause.title,
+                    'transcript': transcript,
+                }
+            )
+        except Exception as exc:  # keep moving; store error marker
+            results.append(
+                {
+                    'clause_id': clause.id,
+                    'article_num': clause.article_num,
+                    'title': clause.title,
+                    'transcript': [
+                        {
+                            'speaker': 'system',
+                            'content': f'error: {exc}',
+                        }
+                    ],
+                }
+            )
 
         # periodic save
         data['debate_by_clause'] = results
@@ -100,10 +87,8 @@ def main():
             encoding='utf-8',
         )
 
-        if i % batch_size == 0:
-            time.sleep(sleep_sec)
-
     print('UPDATED', analysis_path)
+    print('RATE LIMITER', json.dumps(get_rate_limiter().stats(), ensure_ascii=False))
 
 
 if __name__ == '__main__':
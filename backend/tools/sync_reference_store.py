@@ -0,0 +1,195 @@
+"""
+law.go.kr DRF 판례/법령을 로컬 전문 검색 저장소(reference_store)로 동기화한다.
+
+backend 폴더에서 실행:
+    python -m tools.sync_reference_store [--query 보증금 --query 원상복구] [--pages 3] [--max-age-days 7] [--full]
+    python -m tools.sync_reference_store --articles   # LAW_TITLE_MUST_KEYWORDS 법령 조문 코퍼스만 다시 받기
+
+검색어 기본값: LAW_BASE_QUERY + LAW_DOMAIN_KEYWORDS + RiskMapper 카테고리 키워드 (REFERENCE_SYNC_QUERIES로 변경)
+증분 동기화: max-age 안에 동기화한 검색어는 건너뛰고, 본문이 이미 저장된 판례(선고일자 동일)/
+법령(시행일자 동일)은 상세 조회를 생략한다. --full이면 모두 다시 받는다.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from law_fetcher import LawFetcher
+from precedent_fetcher import PrecedentFetcher
+from reference_store import ReferenceStore
+from risk_mapper import RiskMapper
+
+
+def default_queries() -> List[str]:
+    raw = os.getenv("REFERENCE_SYNC_QUERIES")
+    if raw:
+        candidates = raw.split(",")
+    else:
+        candidates = [LawFetcher._get_base_query(), *LawFetcher._get_include_terms()]
+        for category in RiskMapper.get_all_categories():
+            candidates.extend(RiskMapper.get_keywords_for_category(category))
+    queries: List[str] = []
+    for query in candidates:
+        query = query.strip()
+        if query and query not in queries:
+            queries.append(query)
+    return queries
+
+
+def _is_fresh(store: ReferenceStore, kind: str, target: str, query: str, max_age: float) -> bool:
+    synced_at = store.last_synced(kind, target, query)
+    return synced_at is not None and max_age > 0 and synced_at >= time.time() - max_age
+
+
+def sync_precedents(
+    fetcher: PrecedentFetcher,
+    store: ReferenceStore,
+    query: str,
+    pages: int,
+    display: int,
+    max_age: float,
+    full: bool,
+) -> dict:
+    if not full and _is_fresh(store, "prec", "prec", query, max_age):
+        return {"query": query, "skipped": True}
+    fetched = hydrated = stored = 0
+    for page in range(1, pages + 1):
+        response = fetcher.http.get(
+            fetcher.api_url,
+            params={**fetcher._search_params(query), "display": display, "page": page},
+            timeout=30,
+        )
+        precedents = fetcher._parse_search_response(response)
+        fetched += len(precedents)
+        known = set() if full else store.known_precedents(precedents)
+        pending = [p for p in precedents if p.case_id not in known]
+        # 동기화에서는 상세 조회 수를 제한하지 않는다.
+        fetcher.detail_limit = len(pending)
+        fetcher._hydrate_precedent_details(pending)
+        hydrated += len(pending)
+        stored += store.upsert_precedents(fetcher._select_detailed(pending))
+        if len(precedents) < display:
+            break
+    store.mark_synced("prec", "prec", query, fetched)
+    return {"query": query, "fetched": fetched, "hydrated": hydrated, "stored": stored}
+
+
+def sync_laws(
+    fetcher: LawFetcher,
+    store: ReferenceStore,
+    target: str,
+    query: str,
+    pages: int,
+    display: int,
+    max_age: float,
+    full: bool,
+) -> dict:
+    if not full and _is_fresh(store, "law", target, query, max_age):
+        return {"query": query, "target": target, "skipped": True}
+    fetched = hydrated = stored = 0
+    for page in range(1, pages + 1):
+        response = fetcher.http.get(
+            fetcher.api_url,
+            params={**fetcher._search_params(target, query), "display": display, "page": page},
+            timeout=30,
+        )
+        laws = fetcher._parse_search_response(response, target)
+        fetched += len(laws)
+        # 페처와 같은 필터(LAW_TITLE_MUST_KEYWORDS/LAW_DOMAIN_KEYWORDS)를 통과한 문서만 저장한다.
+        candidates = fetcher._filter_search_results(laws)
+        known = set() if full else store.known_laws(candidates)
+        pending = [law for law in candidates if (law.doc_type, law.doc_id) not in known]
+        fetcher.detail_limit = len(pending)
+        fetcher._hydrate_law_details(pending)
+        hydrated += len(pending)
+        stored += store.upsert_laws([law for law in pending if law.content])
+        if len(laws) < display:
+            break
+    store.mark_synced("law", target, query, fetched)
+    return {"query": query, "target": target, "fetched": fetched, "hydrated": hydrated, "stored": stored}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--query", action="append", help="검색어 (여러 번 지정 가능, 기본: default_queries())")
+    parser.add_argument("--targets", default=None, help="법령 target 목록 (기본: LAW_TARGETS)")
+    parser.add_argument("--pages", type=int, default=3, help="검색어당 최대 페이지 수")
+    parser.add_argument("--display", type=int, default=100, help="페이지당 결과 수 (DRF 최대 100)")
+    parser.add_argument(
+        "--max-age-days",
+        type=float,
+        default=float(os.getenv("REFERENCE_SYNC_MAX_AGE_DAYS") or "7"),
+        help="이 기간 안에 동기화한 검색어는 건너뜀 (0이면 항상 동기화)",
+    )
+    parser.add_argument("--full", action="store_true", help="저장된 본문도 모두 다시 받기")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 동기화할 검색어 수")
+    parser.add_argument("--path", default=None, help="저장소 파일 경로 (기본: REFERENCE_STORE_PATH)")
+    parser.add_argument(
+        "--articles", action="store_true", help="LAW_TITLE_MUST_KEYWORDS 법령을 조문 단위로 다시 받아 저장"
+    )
+    args = parser.parse_args()
+
+    store = ReferenceStore(path=args.path)
+    precedent_fetcher = PrecedentFetcher(store=store)
+    law_fetcher = LawFetcher(store=store)
+    if precedent_fetcher.api_key == "api필요" or not precedent_fetcher.api_url:
+        print("PRECEDENT_API_URL/PRECEDENT_API_KEY가 필요합니다.")
+        return
+
+    if args.articles:
+        start = time.perf_counter()
+        fetcher = LawFetcher(store=store)
+        fetcher.response_cache = None
+        stored = fetcher.build_article_corpus(force=True)
+        print(f"조문 {stored}건 저장됨 ({time.perf_counter() - start:.1f}s)")
+        return
+
+    queries = args.query or default_queries()
+    targets = [t.strip() for t in args.targets.split(",")] if args.targets else law_fetcher.targets
+    max_age = args.max_age_days * 86400
+    start = time.perf_counter()
+
+    # 페처는 호출마다 detail_limit을 바꾸므로 작업마다 새로 만든다.
+    # --full이면 DRF 응답 캐시도 거치지 않는다.
+    def _precedent_job(query: str) -> dict:
+        fetcher = PrecedentFetcher(store=store)
+        if args.full:
+            fetcher.response_cache = None
+        return sync_precedents(fetcher, store, query, args.pages, args.display, max_age, args.full)
+
+    def _law_job(target: str, query: str) -> dict:
+        fetcher = LawFetcher(store=store)
+        if args.full:
+            fetcher.response_cache = None
+        return sync_laws(fetcher, store, target, query, args.pages, args.display, max_age, args.full)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = [executor.submit(_precedent_job, query) for query in queries]
+        futures += [
+            executor.submit(_law_job, target, query) for target in targets for query in queries
+        ]
+        for future in futures:
+            try:
+                result = future.result()
+            except Exception as exc:
+                print("SYNC ERROR >>>", exc)
+                continue
+            label = f"{result.get('target', 'prec')}:{result['query']}"
+            if result.get("skipped"):
+                print(f"  {label} (최근 동기화됨, 건너뜀)")
+            else:
+                print(
+                    f"  {label} 검색 {result['fetched']}, 상세 {result['hydrated']}, 저장 {result['stored']}"
+                )
+
+    stats = store.stats()
+    print(
+        f"판례 {stats['precedents']}건, 법령 {stats['laws']}건, 조문 {stats['law_articles']}건 저장됨 "
+        f"(tokenizer={stats['tokenizer']}, {time.perf_counter() - start:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
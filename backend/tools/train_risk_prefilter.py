@@ -0,0 +1,104 @@
+"""
+analysis_history에 저장된 조항 판정으로 위험 사전 필터(문자 n-gram 선형 모델)를 학습한다.
+
+backend 폴더에서 실행:
+    python -m tools.train_risk_prefilter [--limit 5000] [--output cache/risk_prefilter.json]
+
+label: risk_level이 medium/high/critical이면 1, low면 0 (판정 없음/사전 필터 판정은 제외)
+"""
+
+import argparse
+import json
+import os
+import random
+
+import mysql.connector
+
+from risk_prefilter import RiskPrefilter
+
+RISKY_LEVELS = {"medium", "high", "critical"}
+PREFILTER_REASON_PREFIX = "사전 필터"
+
+
+def load_samples(limit: int):
+    conn = mysql.connector.connect(
+        host=os.getenv("DB_HOST", "db"),
+        port=int(os.getenv("DB_PORT", "3306")),
+        user=os.getenv("DB_USER", "app_user"),
+        password=os.getenv("DB_PASSWORD", "app_pass"),
+        database=os.getenv("DB_NAME", "app_db"),
+    )
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """
+            SELECT clauses_json
+            FROM analysis_history
+            WHERE clauses_json IS NOT NULL
+            ORDER BY created_at DESC
+            LIMIT %s
+            """,
+            (limit,),
+        )
+        rows = cur.fetchall() or []
+    finally:
+        cur.close()
+        conn.close()
+
+    samples = []
+    seen = set()
+    for (clauses_raw,) in rows:
+        try:
+            clauses = json.loads(clauses_raw) if clauses_raw else []
+        except (TypeError, json.JSONDecodeError):
+            continue
+        for clause in clauses:
+            if not isinstance(clause, dict):
+                continue
+            level = str(clause.get("risk_level") or "").lower()
+            reason = str(clause.get("risk_reason") or "")
+            # 사전 필터가 직접 낸 판정으로 다시 학습하지 않는다.
+            if level not in RISKY_LEVELS | {"low"} or reason.startswith(PREFILTER_REASON_PREFIX):
+                continue
+            text = f"{clause.get('title') or ''}\n{clause.get('content') or ''}"
+            if text in seen:
+                continue
+            seen.add(text)
+            samples.append((text, 1 if level in RISKY_LEVELS else 0))
+    return samples
+
+
+def evaluate(prefilter: RiskPrefilter, samples, skip_below: float):
+    skipped = sum(1 for text, _ in samples if prefilter.model.predict_proba(text) < skip_below)
+    missed = sum(
+        1 for text, label in samples if label == 1 and prefilter.model.predict_proba(text) < skip_below
+    )
+    return {"holdout": len(samples), "would_skip": skipped, "risky_skipped": missed}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=5000, help="최근 분석 건수")
+    parser.add_argument("--output", default=None, help="모델 저장 경로 (기본 RISK_PREFILTER_MODEL_PATH)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="검증용 비율")
+    parser.add_argument("--epochs", type=int, default=10)
+    args = parser.parse_args()
+
+    samples = load_samples(args.limit)
+    if not samples:
+        raise SystemExit("학습할 판정이 없습니다.")
+    random.Random(7).shuffle(samples)
+    cut = int(len(samples) * (1 - args.holdout)) if len(samples) > 10 else len(samples)
+    train, holdout = samples[:cut], samples[cut:]
+
+    prefilter = RiskPrefilter(model_path=args.output, enabled=True)
+    summary = prefilter.train(train, epochs=args.epochs)
+    if holdout:
+        summary.update(evaluate(prefilter, holdout, prefilter.skip_below))
+    path = prefilter.save(args.output, metadata=summary)
+    print(json.dumps(summary, ensure_ascii=False))
+    print(f"saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+업로드 파일 저장소 (스트리밍 저장, SHA-256 기반 샤딩, 참조 카운트)
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+from typing import Optional
+from uuid import uuid4
+
+
+# 파일 앞부분으로 형식을 판별한다. 텍스트 레이어/페이지 병렬 OCR은 .pdf 경로에서만 동작하므로
+# 같은 내용이 다른 확장자로 먼저 올라와도 저장 경로의 확장자는 내용 기준으로 정한다.
+_SIGNATURES = (
+    (b"%PDF-", (".pdf",)),
+    (b"\x89PNG\r\n\x1a\n", (".png",)),
+    (b"\xff\xd8\xff", (".jpg", ".jpeg")),
+    (b"II*\x00", (".tif", ".tiff")),
+    (b"MM\x00*", (".tif", ".tiff")),
+)
+
+
+def _sniff_suffix(head: bytes, suffix: str = "") -> str:
+    """내용으로 판별한 확장자 (판별한 형식의 확장자면 업로드 확장자를 그대로 쓰고, 판별 불가면 업로드 확장자)"""
+    for magic, suffixes in _SIGNATURES:
+        matched = magic in head[:1024] if magic == b"%PDF-" else head.startswith(magic)
+        if matched:
+            return suffix if suffix in suffixes else suffixes[0]
+    return suffix
+
+
+class UploadTooLargeError(Exception):
+    """업로드 크기 제한 초과"""
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class StoredUpload:
+    """저장된 업로드 파일 정보"""
+    sha256: str
+    path: str
+    size_bytes: int
+    deduplicated: bool
+
+
+class UploadStore:
+    """
+    업로드를 청크 단위로 디스크에 쓰면서 해시를 계산하고,
+    `<root>/<hash[:2]>/<hash[2:4]>/<hash><suffix>` 경로에 한 번만 저장한다.
+    suffix는 내용으로 판별한 형식을 우선하고, 판별할 수 없으면 이번 업로드의 확장자를 쓴다.
+    참조 카운트가 0이 된 뒤 유예 시간이 지난 파일은 정리 스레드가 삭제한다.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int | None = None,
+        chunk_bytes: int | None = None,
+        orphan_grace_seconds: int | None = None,
+    ) -> None:
+        self.root = root
+        self.max_bytes = (
+            max_bytes
+            if max_bytes is not None
+            else int(os.getenv("UPLOAD_MAX_BYTES") or str(50 * 1024 * 1024))
+        )
+        self.chunk_bytes = chunk_bytes or int(os.getenv("UPLOAD_CHUNK_BYTES") or str(1024 * 1024))
+        self.orphan_grace_seconds = (
+            orphan_grace_seconds
+            if orphan_grace_seconds is not None
+            else int(os.getenv("UPLOAD_ORPHAN_GRACE_SECONDS") or "3600")
+        )
+        self._tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        self._lock = Lock()
+        self._stop = Event()
+        self._cleaner: Optional[Thread] = None
+        self._conn = sqlite3.connect(
+            os.path.join(self.root, "blobs.sqlite3"), check_same_thread=False
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+              sha256 TEXT PRIMARY KEY,
+              path TEXT NOT NULL,
+              size_bytes INTEGER NOT NULL,
+              ref_count INTEGER NOT NULL DEFAULT 0,
+              updated_at REAL NOT NULL
+            )
+            """
+        )
+        # 확장자가 바뀌어 교체된 이전 경로 (사용 중일 수 있으므로 유예 시간 뒤에 지운다)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stale_blobs (
+              path TEXT PRIMARY KEY,
+              updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    async def save_upload(self, upload, suffix: str = "") -> StoredUpload:
+        """
+        FastAPI UploadFile(비동기 read 지원 객체)을 스트리밍으로 저장하고 참조를 1 증가시킨다.
+        디스크 쓰기와 저장소 갱신은 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+        """
+        digest = hashlib.sha256()
+        size_bytes = 0
+        head = b""
+        tmp_path = os.path.join(self._tmp_dir, f"{uuid4().hex}.part")
+        try:
+            out = await asyncio.to_thread(open, tmp_path, "wb")
+            try:
+                while True:
+                    chunk = await upload.read(self.chunk_bytes)
+                    if not chunk:
+                        break
+                    size_bytes += len(chunk)
+                    if self.max_bytes > 0 and size_bytes > self.max_bytes:
+                        raise UploadTooLargeError(self.max_bytes)
+                    if len(head) < 1024:
+                        head += chunk[: 1024 - len(head)]
+                    digest.update(chunk)
+                    await asyncio.to_thread(out.write, chunk)
+            finally:
+                await asyncio.to_thread(out.close)
+        except BaseException:
+            self._remove_quietly(tmp_path)
+            raise
+        return await asyncio.to_thread(
+            self._commit, tmp_path, digest.hexdigest(), size_bytes, _sniff_suffix(head, suffix)
+        )
+
+    def _commit(self, tmp_path: str, sha256: str, size_bytes: int, suffix: str) -> StoredUpload:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path FROM blobs WHERE sha256=?", (sha256,)
+            ).fetchone()
+            path = self._blob_path(sha256, suffix)
+            if row and row[0] == path and os.path.exists(path):
+                self._remove_quietly(tmp_path)
+                deduplicated = True
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+                deduplicated = False
+                if row and row[0] != path:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO stale_blobs (path, updated_at) VALUES (?, ?)",
+                        (row[0], time.time()),
+                    )
+            self._conn.execute(
+                """
+                INSERT INTO blobs (sha256, path, size_bytes, ref_count, updated_at)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(sha256) DO UPDATE SET
+                  path=excluded.path,
+                  ref_count=blobs.ref_count + 1,
+                  updated_at=excluded.updated_at
+                """,
+                (sha256, path, size_bytes, time.time()),
+            )
+            self._conn.commit()
+        return StoredUpload(
+            sha256=sha256, path=path, size_bytes=size_bytes, deduplicated=deduplicated
+        )
+
+    def release(self, sha256: str) -> None:
+        """참조를 1 감소시킨다. 파일 삭제는 정리 작업에서 유예 시간 이후 수행한다."""
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE blobs
+                SET ref_count=MAX(ref_count - 1, 0), updated_at=?
+                WHERE sha256=?
+                """,
+                (time.time(), sha256),
+            )
+            self._conn.commit()
+
+    def cleanup_orphans(self) -> int:
+        """참조가 없고 유예 시간이 지난 파일과 남은 임시 파일을 삭제한다."""
+        cutoff = time.time() - self.orphan_grace_seconds
+        removed = 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sha256, path FROM blobs WHERE ref_count<=0 AND updated_at<?",
+                (cutoff,),
+            ).fetchall()
+            for sha256, path in rows:
+                self._remove_quietly(path)
+                self._conn.execute("DELETE FROM blobs WHERE sha256=?", (sha256,))
+                removed += 1
+            stale = self._conn.execute(
+                "SELECT path FROM stale_blobs WHERE updated_at<?", (cutoff,)
+            ).fetchall()
+            for (path,) in stale:
+                self._remove_quietly(path)
+                self._conn.execute("DELETE FROM stale_blobs WHERE path=?", (path,))
+                removed += 1
+            self._conn.commit()
+        for name in os.listdir(self._tmp_dir):
+            tmp_path = os.path.join(self._tmp_dir, name)
+            try:
+                if os.path.getmtime(tmp_path) < cutoff:
+                    os.remove(tmp_path)
+            except OSError:
+                continue
+        return removed
+
+    def start_cleaner(self, interval_seconds: int | None = None) -> None:
+        if self._cleaner is not None:
+            return
+        interval = interval_seconds or int(os.getenv("UPLOAD_CLEANUP_INTERVAL_SECONDS") or "600")
+
+        def _loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.cleanup_orphans()
+                except Exception as exc:
+                    print("UPLOAD CLEANUP ERROR >>>", repr(exc))
+
+        self._cleaner = Thread(target=_loop, name="upload-cleaner", daemon=True)
+        self._cleaner.start()
+
+    def stop_cleaner(self) -> None:
+        self._stop.set()
+
+    def _blob_path(self, sha256: str, suffix: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], f"{sha256}{suffix}")
+
+    @staticmethod
+    def _remove_quietly(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass